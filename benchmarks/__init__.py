@@ -0,0 +1,29 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Benchmarks of the etee driver data path, from the serial bytes to the controller events. Run them from the repository
+root with:
+
+    python -m benchmarks --output results.json
+
+"""
+
+from .stages import *
+from .latency import *
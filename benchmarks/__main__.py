@@ -0,0 +1,98 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Runs the driver benchmarks, prints their results and optionally writes them to a JSON file.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import etee
+
+from .stages import run_stages, DEFAULT_FRAMES, DEFAULT_REPEATS
+from .latency import run_end_to_end, DEFAULT_LATENCY_FRAMES, DEFAULT_SPEED
+
+
+def print_table(title, results, columns):
+    """
+    Prints benchmark results as a table.
+
+    :param str title: table title.
+    :param dict results: dictionary of result dictionaries by row name.
+    :param list[str] columns: result keys printed as columns.
+    """
+    print(title)
+    print("{:<24}".format("") + "".join("{:>20}".format(column) for column in columns))
+    for name, result in results.items():
+        cells = ["{:>20.1f}".format(result[c]) if result.get(c) is not None else "{:>20}".format("-")
+                 for c in columns]
+        print("{:<24}".format(name) + "".join(cells))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="etee driver benchmarks.")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="data frames per stage benchmark")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="runs per stage benchmark")
+    parser.add_argument("--latency-frames", type=int, default=DEFAULT_LATENCY_FRAMES,
+                        help="data frames per end-to-end benchmark")
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED,
+                        help="playback speed factor of the latency benchmark, 1 for real time")
+    parser.add_argument("--pty", action="store_true", help="also run the end-to-end benchmarks through a pseudo-terminal")
+    parser.add_argument("--output", default=None, help="JSON file to which the results are written")
+    args = parser.parse_args()
+
+    stages = run_stages(args.frames, args.repeats)
+    print_table("Stages", stages, ["frames_per_second", "cpu_us_per_frame", "wall_us_per_frame"])
+
+    transports = ["fake"]
+    if args.pty and os.name == "posix":
+        transports.append("pty")
+    end_to_end = dict()
+    for transport in transports:
+        end_to_end[transport + "_latency"] = run_end_to_end(args.latency_frames, args.speed, transport)
+        end_to_end[transport + "_throughput"] = run_end_to_end(args.latency_frames, None, transport)
+    print_table("End to end", end_to_end, ["frames_per_second", "cpu_us_per_frame", "latency_us_p50",
+                                           "latency_us_p99"])
+
+    if args.output is not None:
+        results = {
+            "metadata": {
+                "etee_version": etee.__version__,
+                "python_version": sys.version,
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "arguments": vars(args),
+            },
+            "stages": stages,
+            "end_to_end": end_to_end,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
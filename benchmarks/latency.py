@@ -0,0 +1,138 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+End-to-end latency and throughput of EteeController, from the data becoming available on the serial port to the data
+event callback.
+
+"""
+
+import time
+
+import numpy as np
+
+from etee import EteeController, FakeDongle, synthetic_stream
+
+DEFAULT_LATENCY_FRAMES = 2000
+DEFAULT_SPEED = 10.0
+LOOP_STOP_TIMEOUT = 2.0
+
+
+def timed_stream(stream, sent_times, speed=DEFAULT_SPEED):
+    """
+    Paces a data stream and stores the time at which each data frame is sent. The stream is paced here rather than
+    by the dongle, so that the stored times are taken after the pacing delay, right before the frame becomes
+    available to be read.
+
+    :param stream: iterable of (timestamp, bytes) tuples, in which every data frame is different.
+    :param dict sent_times: dictionary in which the monotonic clock time is stored when each data frame is sent,
+                            by raw data frame without end bytes.
+    :param float speed: playback speed factor, 1 for real time. If None, data is sent as fast as it is read.
+    :return: generator of (timestamp, bytes) tuples.
+    """
+    start_time = first_timestamp = None
+    for timestamp, data in stream:
+        if speed is not None:
+            if start_time is None:
+                start_time = time.monotonic()
+                first_timestamp = timestamp
+            delay = start_time + (timestamp - first_timestamp) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if data.endswith(b"\xff\xff"):
+            sent_times[data[:-2]] = time.monotonic()
+        yield timestamp, data
+
+
+def run_end_to_end(frames=DEFAULT_LATENCY_FRAMES, speed=DEFAULT_SPEED, transport="fake", timeout=30):
+    """
+    Streams synthetic data to an EteeController and measures, for each data frame, the time from the frame being
+    available to be read to the hand_received event callback. Each callback is paired with the frame it was emitted
+    for by the raw data of the frame, so that a frame lost or not parsed does not shift the other latencies.
+
+    :param int frames: number of data frames.
+    :param float speed: playback speed factor, 1 for real time (97 frames per second per hand). If None, frames are
+                    sent as fast as they are read, which measures the throughput instead of the latency.
+    :param str transport: "fake" to read from a FakeDongle, or "pty" to read through a pseudo-terminal, using the
+                        serial port path.
+    :param float timeout: maximum time to wait for the frames, in seconds.
+    :return: dictionary with the frames received, frames per second, CPU time per frame, and latency percentiles in
+            microseconds.
+    :raises Exception: if the data loop of the controller does not stop.
+    """
+    sent_times = dict()
+    received_times = list()
+    stream = timed_stream(synthetic_stream(count=frames), sent_times, speed)
+    emulator = None
+    if transport == "pty":
+        from etee.dongle_emulator import DongleEmulator
+        emulator = DongleEmulator(stream, speed=None)
+        port = emulator.start()
+    elif transport == "fake":
+        # Short read timeout, so that the data loop stops soon after the controller is stopped
+        port = FakeDongle(stream, speed=None, timeout=0.05)
+    else:
+        raise ValueError("Transport must be: 'fake' or 'pty'")
+
+    controller = EteeController()
+    controller.hand_received.connect(lambda: received_times.append(
+        (time.monotonic(), bytes(controller.driver.serial_reader.last_frame))))
+    controller.connect_port(port)
+    if transport == "pty":
+        controller.driver.serial_reader.serial.timeout = 0.05
+    controller.run()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    controller.start_data()
+    deadline = time.monotonic() + timeout
+    while len(received_times) < frames and time.monotonic() < deadline:
+        time.sleep(0.01)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    controller.stop()
+    # Waits for the data loop to finish its current read, which takes up to the 0.05 s read timeout, so that the port
+    # is not closed during it
+    if controller.driver.thread is not None:
+        controller.driver.thread.join(LOOP_STOP_TIMEOUT)
+        if controller.driver.thread.is_alive():
+            raise Exception("The data loop did not stop within {} s".format(LOOP_STOP_TIMEOUT))
+    controller.disconnect()
+    if emulator is not None:
+        emulator.stop()
+
+    received = len(received_times)
+    latencies = 1e6 * np.array([received_time - sent_times[frame] for received_time, frame in received_times
+                                if frame in sent_times])
+    result = {
+        "transport": transport,
+        "speed": speed,
+        "frames": frames,
+        "frames_received": received,
+        "frames_unmatched": received - len(latencies),
+        "frames_per_second": received / wall if wall > 0 else None,
+        "cpu_us_per_frame": 1e6 * cpu / received if received else None,
+    }
+    if len(latencies):
+        result.update({
+            "latency_us_p50": float(np.percentile(latencies, 50)),
+            "latency_us_p90": float(np.percentile(latencies, 90)),
+            "latency_us_p99": float(np.percentile(latencies, 99)),
+            "latency_us_max": float(latencies.max()),
+        })
+    return result
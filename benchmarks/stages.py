@@ -0,0 +1,205 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Throughput and CPU time of each stage of the driver data path, measured on synthetic data frames.
+
+"""
+
+import time
+
+from etee import EteeController, EteeControllerEvent, Ahrs, FakeDongle, synthetic_stream
+from etee.tangio_for_etee import FrameSynchronizer, FRAME_DATA
+
+DEFAULT_FRAMES = 20000
+DEFAULT_REPEATS = 3
+
+
+def measure(run, frames, repeats=DEFAULT_REPEATS):
+    """
+    Measures the time taken to process a number of frames, keeping the fastest of several runs.
+
+    :param run: function processing all the frames, called without arguments.
+    :param int frames: number of frames processed by each call.
+    :param int repeats: number of runs.
+    :return: dictionary with the number of frames, frames per second, and CPU and wall time per frame in microseconds.
+    """
+    best_cpu = best_wall = None
+    for _ in range(repeats):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        run()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+        best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+    return {
+        "frames": frames,
+        "frames_per_second": frames / best_wall if best_wall > 0 else None,
+        "cpu_us_per_frame": 1e6 * best_cpu / frames,
+        "wall_us_per_frame": 1e6 * best_wall / frames,
+    }
+
+
+def synthetic_packets(frames):
+    """
+    Returns synthetic data packets for both hands.
+
+    :param int frames: number of data packets.
+    :return: list of data packets, including their end bytes.
+    """
+    return [data for _, data in synthetic_stream(count=frames) if data.endswith(b"\xff\xff")]
+
+
+def connected_controller(compact_frames=False):
+    """
+    Returns an EteeController connected to a FakeDongle which is not streaming, so that its stages can be called
+    directly.
+
+    :param bool compact_frames: if true, the controller parses data packets into WidgetFrame objects.
+    :return: connected controller.
+    :rtype: EteeController
+    """
+    controller = EteeController(compact_frames=compact_frames)
+    controller.connect_port(FakeDongle())
+    return controller
+
+
+def bench_framing(packets, repeats=DEFAULT_REPEATS):
+    """
+    Splits a received byte stream into data frames with the frame synchronizer.
+
+    :param list[bytes] packets: data packets.
+    :param int repeats: number of runs.
+    :return: measurement dictionary.
+    """
+    stream = b"".join(packets)
+    data_bytes = len(packets[0]) - 2
+
+    def run():
+        frame_sync = FrameSynchronizer(data_bytes, 2)
+        frame_sync.feed(stream)
+        pop = frame_sync.pop
+        while pop()[0] == FRAME_DATA:
+            pass
+    return measure(run, len(packets), repeats)
+
+
+def bench_decoding(controller, packets, repeats=DEFAULT_REPEATS):
+    """
+    Parses data frames with SerialReader.raw2data.
+
+    :param EteeController controller: connected controller, whose serial reader parses the frames.
+    :param list[bytes] packets: data packets.
+    :param int repeats: number of runs.
+    :return: measurement dictionary.
+    """
+    raw2data = controller.driver.serial_reader.raw2data
+    raws = [packet[:-2] for packet in packets]
+
+    def run():
+        for raw in raws:
+            raw2data(raw)
+    return measure(run, len(raws), repeats)
+
+
+def bench_api_data_callback(controller, frames, repeats=DEFAULT_REPEATS):
+    """
+    Passes parsed data frames to EteeController._api_data_callback, which includes the AHRS update and the event
+    emission.
+
+    :param EteeController controller: connected controller.
+    :param list frames: parsed data frames.
+    :param int repeats: number of runs.
+    :return: measurement dictionary.
+    """
+    driver = controller.driver
+    callback = controller._api_data_callback
+    period = 1 / (2 * 97)
+
+    def run():
+        for frameno, data in enumerate(frames):
+            driver.current_timestamp = frameno * period
+            callback(frameno, data)
+    return measure(run, len(frames), repeats)
+
+
+def bench_ahrs(frames, repeats=DEFAULT_REPEATS):
+    """
+    Updates the orientation filter with the IMU data of each data frame.
+
+    :param list frames: parsed data frames.
+    :param int repeats: number of runs.
+    :return: measurement dictionary.
+    """
+    imu = [([data["gyro_x"], data["gyro_y"], data["gyro_z"]], [data["accel_x"], data["accel_y"], data["accel_z"]])
+           for data in frames]
+    period = 1 / 97
+
+    def run():
+        ahrs = Ahrs()
+        for i, (gyro, accel) in enumerate(imu):
+            ahrs.get_quaternion(gyro, accel, None, i * period)
+    return measure(run, len(imu), repeats)
+
+
+def bench_events(frames, callbacks=1, repeats=DEFAULT_REPEATS):
+    """
+    Emits the two events of each data frame, the hand received and the data received events.
+
+    :param int frames: number of frames.
+    :param int callbacks: number of callbacks connected to each event.
+    :param int repeats: number of runs.
+    :return: measurement dictionary.
+    """
+    hand_received = EteeControllerEvent()
+    data_received = EteeControllerEvent()
+    for _ in range(callbacks):
+        hand_received.connect(lambda: None)
+        data_received.connect(lambda: None)
+
+    def run():
+        for _ in range(frames):
+            hand_received.emit()
+            data_received.emit()
+    return measure(run, frames, repeats)
+
+
+def run_stages(frames=DEFAULT_FRAMES, repeats=DEFAULT_REPEATS):
+    """
+    Runs the benchmarks of all the data path stages.
+
+    :param int frames: number of data frames processed by each benchmark.
+    :param int repeats: number of runs of each benchmark, of which the fastest is kept.
+    :return: dictionary of measurements by stage name.
+    """
+    packets = synthetic_packets(frames)
+    results = dict()
+    results["framing"] = bench_framing(packets, repeats)
+    for compact_frames in (False, True):
+        controller = connected_controller(compact_frames)
+        suffix = "_compact" if compact_frames else ""
+        results["decoding" + suffix] = bench_decoding(controller, packets, repeats)
+        parsed = [controller.driver.serial_reader.raw2data(packet[:-2]) for packet in packets]
+        results["api_data_callback" + suffix] = bench_api_data_callback(controller, parsed, repeats)
+        if not compact_frames:
+            results["ahrs"] = bench_ahrs(parsed, repeats)
+        controller.disconnect()
+    results["events"] = bench_events(len(packets), repeats=repeats)
+    return results
@@ -4,5 +4,9 @@ from .tangio_for_etee import *
 # Import main package methods
 from .quaternion import *
 from .ahrs import *
+from .frame_history import *
 from .driver_eteecontroller import *
+from .driver_eteecontroller_async import *
+from .selector import *
+from .fake_dongle import *
 from ._version import __version__
@@ -24,13 +24,14 @@ Includes methods to set the IMU sensor offsets, update the AHRS or calculate the
 """
 
 import math
-from queue import Queue
 import time
 import warnings
 
 import numpy as np
 from numpy.linalg import norm
-from etee import Quaternion
+from etee import Quaternion, QuaternionArray
+
+SAMPLE_PERIOD_WINDOW = 100
 
 
 class Ahrs:
@@ -45,19 +46,21 @@ class Ahrs:
     @staticmethod
     def _current_seconds_time():
         """
-        Get current time.
+        Get current time from a monotonic clock.
 
         :return: current time as float
         """
-        return time.time()
+        return time.monotonic()
 
-    def __init__(self, sampleperiod=None, quaternion=None, beta=None):
+    def __init__(self, sampleperiod=None, quaternion=None, beta=None, fast=True):
         """
         Initialize the class with the given parameters.
 
         :param float sampleperiod: the sample period
         :param list[float] quaternion: initial quaternion
         :param float beta: algorithm gain beta
+        :param bool fast: if true, get_quaternion() uses the scalar filter implementation, which gives the same results
+                    as update() and update_imu() without creating NumPy arrays on every step.
         """
         if sampleperiod is not None:
             self.samplePeriod = sampleperiod
@@ -68,11 +71,28 @@ class Ahrs:
 
         self.samplePeriod = 1/97
         self.quaternion = Quaternion(1, 0, 0, 0)
-        self.euler = [0, 0, 0]
-        self.dynamicFrequencyQueue = Queue(100)
+        self._euler = None
+        self._euler_quaternion = None
+        self._sample_times = [0.0] * SAMPLE_PERIOD_WINDOW
+        self._sample_times_index = 0
+        self._sample_times_count = 0
 
         self.gyro_offset = [0, 0, 0]
         self.mag_offset = [0, 0, 0]
+        self.fast = fast
+
+    @property
+    def euler(self):
+        """
+        Euler angles (roll, pitch, yaw) of the current quaternion. They are only calculated when requested, once per
+        filter update.
+
+        :return: roll, pitch, yaw in radians.
+        """
+        if self._euler_quaternion is not self.quaternion:
+            self._euler = self.quaternion.to_euler()
+            self._euler_quaternion = self.quaternion
+        return self._euler
 
     def set_gyro_offset(self, value):
         """
@@ -187,7 +207,27 @@ class Ahrs:
         q += qdot * self.samplePeriod
         self.quaternion = Quaternion(q / norm(q))  # normalise quaternion
 
-    def get_quaternion(self, gyroscope, accelerometer, magnetometer=None):
+    def update_sample_period(self, timestamp=None):
+        """
+        Update the sample period with the time of a new sample. Once SAMPLE_PERIOD_WINDOW samples have been received,
+        the sample period is the average time between the last samples, which smooths out the jitter of the times at
+        which samples are received.
+
+        :param float timestamp: time of the sample in seconds, from a monotonic clock (e.g. the time at which it was
+                    read from the serial port). If None, the current time is used.
+        """
+        if timestamp is None:
+            timestamp = self._current_seconds_time()
+        index = self._sample_times_index
+        if self._sample_times_count == SAMPLE_PERIOD_WINDOW:
+            # The oldest time in the ring buffer is the one of the sample received SAMPLE_PERIOD_WINDOW samples ago
+            self.samplePeriod = (timestamp - self._sample_times[index]) / SAMPLE_PERIOD_WINDOW
+        else:
+            self._sample_times_count += 1
+        self._sample_times[index] = timestamp
+        self._sample_times_index = (index + 1) % SAMPLE_PERIOD_WINDOW
+
+    def get_quaternion(self, gyroscope, accelerometer, magnetometer=None, timestamp=None):
         """
         Calculate and return the quaternion values given the IMU sensors values.
 
@@ -196,15 +236,15 @@ class Ahrs:
                                         Can be any unit since a normalized value is used.
         :param list[float] magnetometer: A three-element array containing the magnetometer data.
                                         Can be any unit since a normalized value is used.
+        :param float timestamp: time at which the data was received, in seconds from a monotonic clock.
+                    If None, the current time is used.
         :return: Quaternion calculated from the given data.
         """
-        if self.dynamicFrequencyQueue.full():
-            start_time = self.dynamicFrequencyQueue.get()
-            current_time = self._current_seconds_time()
-            self.dynamicFrequencyQueue.put(current_time)
-            self.samplePeriod = (current_time - start_time)/100
-        else:
-            self.dynamicFrequencyQueue.put(self._current_seconds_time())
+        self.update_sample_period(timestamp)
+
+        if self.fast:
+            self._get_quaternion_fast(gyroscope, accelerometer, magnetometer)
+            return self.quaternion
 
         gyroscope = np.array(gyroscope) - np.array(self.gyro_offset)
         gyroscope = gyroscope * self.gyro_sensitivity
@@ -218,17 +258,421 @@ class Ahrs:
             self.update(gyroscope, accelerometer, magnetometer)
         return self.quaternion
 
-    def get_euler(self, gyroscope, accelerometer, magnetometer=None):
+    def _get_quaternion_fast(self, gyroscope, accelerometer, magnetometer=None):
+        """
+        Scale the IMU sensor values and perform one update step with the scalar filter implementation.
+
+        :param list[float] gyroscope: A three-element array containing the raw gyroscope data.
+        :param list[float] accelerometer: A three-element array containing the raw accelerometer data.
+        :param list[float] magnetometer: A three-element array containing the raw magnetometer data, or None.
+        """
+        gyro_offset = self.gyro_offset
+        gyro_sensitivity = self.gyro_sensitivity
+        accel_sensitivity = self.accel_sensitivity
+        q = self.quaternion
+        if magnetometer is None:
+            mx = my = mz = None
+        else:
+            mag_offset = self.mag_offset
+            mag_sensitivity = self.mag_sensitivity
+            mx = (magnetometer[0] - mag_offset[0]) * mag_sensitivity[0]
+            my = (magnetometer[1] - mag_offset[1]) * mag_sensitivity[1]
+            mz = (magnetometer[2] - mag_offset[2]) * mag_sensitivity[2]
+        result = madgwick_step(
+            q.w, q.x, q.y, q.z,
+            (gyroscope[0] - gyro_offset[0]) * gyro_sensitivity,
+            (gyroscope[1] - gyro_offset[1]) * gyro_sensitivity,
+            (gyroscope[2] - gyro_offset[2]) * gyro_sensitivity,
+            accelerometer[0] * accel_sensitivity,
+            accelerometer[1] * accel_sensitivity,
+            accelerometer[2] * accel_sensitivity,
+            mx, my, mz, self.beta, self.samplePeriod)
+        if result is not None:
+            self.quaternion = Quaternion(result[0], result[1], result[2], result[3])
+
+    def process_batch(self, gyroscope, accelerometer, magnetometer=None, timestamps=None):
+        """
+        Run the filter over recorded IMU sensor values, e.g. to process a recorded session again with a different beta
+        or different offsets. The current quaternion, offsets and beta are used, and the filter state is not modified.
+
+        :param gyroscope: [N, 3] array containing the raw gyroscope data.
+        :param accelerometer: [N, 3] array containing the raw accelerometer data.
+        :param magnetometer: [N, 3] array containing the raw magnetometer data, or None to run the filter without
+                    magnetometer.
+        :param timestamps: [N] array of sample times in seconds. The sample period of each step is the time elapsed
+                    since the previous sample, and the first step uses the current sample period. If None, all the steps
+                    use the current sample period.
+        :return: [N, 4] array of quaternions and [N, 3] array of euler angles (roll, pitch, yaw) after each step.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        gyroscope = (np.asarray(gyroscope, dtype=float) - np.asarray(self.gyro_offset, dtype=float)) \
+            * self.gyro_sensitivity
+        accelerometer = np.asarray(accelerometer, dtype=float) * self.accel_sensitivity
+        n = len(gyroscope)
+        if gyroscope.shape != (n, 3) or accelerometer.shape != (n, 3):
+            raise ValueError("Expecting [N, 3] gyroscope and accelerometer arrays of the same length")
+        if magnetometer is not None:
+            magnetometer = (np.asarray(magnetometer, dtype=float) - np.asarray(self.mag_offset, dtype=float)) \
+                * np.asarray(self.mag_sensitivity, dtype=float)
+            if magnetometer.shape != (n, 3):
+                raise ValueError("Expecting a [N, 3] magnetometer array of the same length as the gyroscope array")
+        if timestamps is None:
+            sample_periods = [self.samplePeriod] * n
+        else:
+            timestamps = np.asarray(timestamps, dtype=float)
+            if timestamps.shape != (n,):
+                raise ValueError("Expecting [N] timestamps of the same length as the gyroscope array")
+            sample_periods = np.diff(timestamps, prepend=timestamps[:1]).tolist()
+            if n > 0:
+                sample_periods[0] = self.samplePeriod
+
+        q = self.quaternion
+        q = (q.w, q.x, q.y, q.z)
+        beta = self.beta
+        gyro = gyroscope.tolist()
+        accel = accelerometer.tolist()
+        mag = magnetometer.tolist() if magnetometer is not None else None
+        result_rows = [None] * n
+        for i in range(n):
+            g = gyro[i]
+            a = accel[i]
+            if mag is None:
+                result = madgwick_step(q[0], q[1], q[2], q[3], g[0], g[1], g[2], a[0], a[1], a[2],
+                                       beta=beta, sample_period=sample_periods[i])
+            else:
+                m = mag[i]
+                result = madgwick_step(q[0], q[1], q[2], q[3], g[0], g[1], g[2], a[0], a[1], a[2], m[0], m[1], m[2],
+                                       beta, sample_periods[i])
+            if result is not None:
+                q = result
+            result_rows[i] = q
+        quaternions = np.array(result_rows, dtype=float).reshape(n, 4)
+        return quaternions, quaternions_to_euler(quaternions)
+
+    def get_euler(self, gyroscope, accelerometer, magnetometer=None, timestamp=None):
         """
         Estimate and return the euler angles for the given IMU sensor values.
+        This performs a filter update step. To get the euler angles of the last update without a new step, use the
+        euler property instead.
 
         :param list[float] gyroscope: A three-element array containing the gyroscope data in radians per second.
         :param list[float] accelerometer: A three-element array containing the accelerometer data.
                                         Can be any unit since a normalized value is used.
         :param list[float] magnetometer: A three-element array containing the magnetometer data.
                                         Can be any unit since a normalized value is used.
+        :param float timestamp: time at which the data was received, in seconds from a monotonic clock.
+                    If None, the current time is used.
         :return: Euler angles estimated from the given data.
         """
-        self.get_quaternion(gyroscope, accelerometer, magnetometer)
-        self.euler = self.quaternion.to_euler()
+        self.get_quaternion(gyroscope, accelerometer, magnetometer, timestamp)
         return self.euler
+
+
+class AhrsBank:
+    """
+    Class implementing the AHRS calculations of several devices at once. The quaternions of all the devices are kept in
+    a single [K, 4] array, and any subset of the devices is updated in a single vectorized step, with the per-device
+    offsets, sample periods and algorithm gains.
+    """
+    def __init__(self, size, sampleperiod=1/97, beta=Ahrs.beta):
+        """
+        Initialize the class with the given parameters.
+
+        :param int size: number of devices K.
+        :param float sampleperiod: the sample period used by the devices without timestamps.
+        :param float beta: algorithm gain beta of all the devices.
+        """
+        self.size = size
+        self.quaternions = np.zeros((size, 4))
+        self.quaternions[:, 0] = 1
+        self.betas = np.full(size, beta, dtype=float)
+        self.sample_periods = np.full(size, sampleperiod, dtype=float)
+        self.gyro_offsets = np.zeros((size, 3))
+        self.mag_offsets = np.zeros((size, 3))
+        self.last_timestamps = np.full(size, np.nan)
+
+        self.accel_sensitivity = Ahrs.accel_sensitivity
+        self.gyro_sensitivity = Ahrs.gyro_sensitivity
+        self.mag_sensitivity = np.array(Ahrs.mag_sensitivity, dtype=float)
+
+    def set_gyro_offset(self, index, value):
+        """
+        Set the gyroscope offsets of a device to given values.
+
+        :param int index: device index.
+        :param list[float] value: New gyroscope offset values
+        """
+        self.gyro_offsets[index] = value
+
+    def set_mag_offset(self, index, value):
+        """
+        Set the magnetometer offsets of a device to given values.
+
+        :param int index: device index.
+        :param list[float] value: New magnetometer offset values
+        """
+        self.mag_offsets[index] = value
+
+    def set_beta(self, index, value):
+        """
+        Set the algorithm gain beta of a device.
+
+        :param int index: device index.
+        :param float value: New algorithm gain.
+        """
+        self.betas[index] = value
+
+    def reset(self, index=None):
+        """
+        Reset the quaternion and the last timestamp of a device.
+
+        :param int index: device index. If None, all the devices are reset.
+        """
+        if index is None:
+            index = slice(None)
+        self.quaternions[index] = (1, 0, 0, 0)
+        self.last_timestamps[index] = np.nan
+
+    def step(self, indices, gyroscope, accelerometer, magnetometer=None, timestamps=None):
+        """
+        Perform one update step for the given devices with their raw IMU sensor values.
+        Devices whose accelerometer or magnetometer values are zero keep their quaternion.
+
+        :param indices: [M] array of distinct device indices to update. If None, all K devices are updated.
+        :param gyroscope: [M, 3] array containing the raw gyroscope data.
+        :param accelerometer: [M, 3] array containing the raw accelerometer data.
+        :param magnetometer: [M, 3] array containing the raw magnetometer data, or None to update without magnetometer.
+        :param timestamps: [M] array of sample times in seconds. The sample period of each device is the time elapsed
+                    since its previous timestamp. If None, or for the first sample of a device, the device sample
+                    period is used.
+        :return: [M, 4] array of the updated quaternions.
+        :rtype: numpy.ndarray
+        """
+        if indices is None:
+            indices = np.arange(self.size)
+        else:
+            indices = np.asarray(indices, dtype=np.intp)
+        gyroscope = (np.asarray(gyroscope, dtype=float) - self.gyro_offsets[indices]) * self.gyro_sensitivity
+        accelerometer = np.asarray(accelerometer, dtype=float) * self.accel_sensitivity
+        if magnetometer is not None:
+            magnetometer = (np.asarray(magnetometer, dtype=float) - self.mag_offsets[indices]) * self.mag_sensitivity
+
+        sample_periods = self.sample_periods[indices]
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps, dtype=float)
+            elapsed = timestamps - self.last_timestamps[indices]
+            known = np.isfinite(elapsed)
+            sample_periods[known] = elapsed[known]
+            self.last_timestamps[indices] = timestamps
+
+        quaternions = madgwick_step_array(self.quaternions[indices], gyroscope, accelerometer, magnetometer,
+                                          self.betas[indices], sample_periods)
+        self.quaternions[indices] = quaternions
+        return quaternions
+
+    def get_quaternion(self, index):
+        """
+        Return the current quaternion of a device.
+
+        :param int index: device index.
+        :return: current quaternion
+        :rtype: Quaternion
+        """
+        return Quaternion(self.quaternions[index].copy())
+
+    def get_euler(self, indices=None):
+        """
+        Return the euler angles (roll, pitch, yaw) of the current quaternions.
+
+        :param indices: [M] array of device indices. If None, the euler angles of all K devices are returned.
+        :return: [M, 3] array of euler angles in radians.
+        :rtype: numpy.ndarray
+        """
+        if indices is None:
+            return quaternions_to_euler(self.quaternions)
+        return quaternions_to_euler(self.quaternions[np.asarray(indices, dtype=np.intp)])
+
+
+def madgwick_step(q0, q1, q2, q3, gx, gy, gz, ax, ay, az, mx=None, my=None, mz=None, beta=Ahrs.beta,
+                  sample_period=1/97):
+    """
+    Perform one Madgwick filter update step with scalar values. This gives the same results as Ahrs.update() and
+    Ahrs.update_imu(), written out in closed form so that no arrays or quaternion objects are created.
+
+    :param float q0: Real part of the current quaternion.
+    :param float q1: First imaginary part of the current quaternion.
+    :param float q2: Second imaginary part of the current quaternion.
+    :param float q3: Third imaginary part of the current quaternion.
+    :param float gx: Gyroscope x-axis value in radians per second.
+    :param float gy: Gyroscope y-axis value in radians per second.
+    :param float gz: Gyroscope z-axis value in radians per second.
+    :param float ax: Accelerometer x-axis value. Can be any unit since a normalized value is used.
+    :param float ay: Accelerometer y-axis value.
+    :param float az: Accelerometer z-axis value.
+    :param float mx: Magnetometer x-axis value, or None to perform an IMU update step without magnetometer.
+                Can be any unit since a normalized value is used.
+    :param float my: Magnetometer y-axis value, or None.
+    :param float mz: Magnetometer z-axis value, or None.
+    :param float beta: algorithm gain beta
+    :param float sample_period: the sample period
+    :return: updated quaternion (w, x, y, z), or None if the accelerometer or magnetometer values are zero.
+    """
+    # Normalise accelerometer measurement
+    a_norm = math.sqrt(ax*ax + ay*ay + az*az)
+    if a_norm == 0:
+        if mx is not None:
+            warnings.warn("accelerometer is zero")
+        return None
+    ax /= a_norm
+    ay /= a_norm
+    az /= a_norm
+
+    # Objective function and its Jacobian for the gravity direction
+    f0 = 2*(q1*q3 - q0*q2) - ax
+    f1 = 2*(q0*q1 + q2*q3) - ay
+    f2 = 2*(0.5 - q1*q1 - q2*q2) - az
+    s0 = -2*q2*f0 + 2*q1*f1
+    s1 = 2*q3*f0 + 2*q0*f1 - 4*q1*f2
+    s2 = -2*q0*f0 + 2*q3*f1 - 4*q2*f2
+    s3 = 2*q1*f0 + 2*q2*f1
+
+    if mx is not None:
+        # Normalise magnetometer measurement
+        m_norm = math.sqrt(mx*mx + my*my + mz*mz)
+        if m_norm == 0:
+            warnings.warn("magnetometer is zero")
+            return None
+        mx /= m_norm
+        my /= m_norm
+        mz /= m_norm
+
+        # Reference direction of Earth's magnetic field, h = q * m * q.conj()
+        pw = mx*q1 + my*q2 + mz*q3
+        px = mx*q0 - my*q3 + mz*q2
+        py = mx*q3 + my*q0 - mz*q1
+        pz = -mx*q2 + my*q1 + mz*q0
+        hx = q0*px + q1*pw + q2*pz - q3*py
+        hy = q0*py - q1*pz + q2*pw + q3*px
+        hz = q0*pz + q1*py - q2*px + q3*pw
+        bx = math.sqrt(hx*hx + hy*hy)
+        bz = hz
+
+        # Objective function and its Jacobian for the magnetic field direction
+        f3 = 2*bx*(0.5 - q2*q2 - q3*q3) + 2*bz*(q1*q3 - q0*q2) - mx
+        f4 = 2*bx*(q1*q2 - q0*q3) + 2*bz*(q0*q1 + q2*q3) - my
+        f5 = 2*bx*(q0*q2 + q1*q3) + 2*bz*(0.5 - q1*q1 - q2*q2) - mz
+        s0 += -2*bz*q2*f3 + (-2*bx*q3 + 2*bz*q1)*f4 + 2*bx*q2*f5
+        s1 += 2*bz*q3*f3 + (2*bx*q2 + 2*bz*q0)*f4 + (2*bx*q3 - 4*bz*q1)*f5
+        s2 += (-4*bx*q2 - 2*bz*q0)*f3 + (2*bx*q1 + 2*bz*q3)*f4 + (2*bx*q0 - 4*bz*q2)*f5
+        s3 += (-4*bx*q3 + 2*bz*q1)*f3 + (-2*bx*q0 + 2*bz*q2)*f4 + 2*bx*q1*f5
+
+    # Normalise step magnitude
+    s_norm = math.sqrt(s0*s0 + s1*s1 + s2*s2 + s3*s3)
+    if s_norm != 0:
+        s0 /= s_norm
+        s1 /= s_norm
+        s2 /= s_norm
+        s3 /= s_norm
+
+    # Compute rate of change of quaternion
+    qdot0 = (-q1*gx - q2*gy - q3*gz) * 0.5 - beta*s0
+    qdot1 = (q0*gx + q2*gz - q3*gy) * 0.5 - beta*s1
+    qdot2 = (q0*gy - q1*gz + q3*gx) * 0.5 - beta*s2
+    qdot3 = (q0*gz + q1*gy - q2*gx) * 0.5 - beta*s3
+
+    # Integrate to yield quaternion
+    q0 += qdot0 * sample_period
+    q1 += qdot1 * sample_period
+    q2 += qdot2 * sample_period
+    q3 += qdot3 * sample_period
+    q_norm = math.sqrt(q0*q0 + q1*q1 + q2*q2 + q3*q3)
+    return q0 / q_norm, q1 / q_norm, q2 / q_norm, q3 / q_norm
+
+
+def quaternions_to_euler(quaternions):
+    """
+    Convert an array of quaternions into euler angles (roll, pitch, yaw), in the same way as Quaternion.to_euler().
+
+    :param quaternions: [N, 4] array of quaternions.
+    :return: [N, 3] array of euler angles in radians.
+    :rtype: numpy.ndarray
+    """
+    return QuaternionArray(quaternions).to_euler()
+
+
+def madgwick_step_array(quaternions, gyroscope, accelerometer, magnetometer=None, beta=Ahrs.beta, sample_period=1/97):
+    """
+    Perform one Madgwick filter update step for several independent quaternions at once. Each row gives the same
+    result as madgwick_step().
+
+    :param quaternions: [M, 4] array of current quaternions.
+    :param gyroscope: [M, 3] array containing the gyroscope data in radians per second.
+    :param accelerometer: [M, 3] array containing the accelerometer data. Can be any unit since normalized values are
+                    used.
+    :param magnetometer: [M, 3] array containing the magnetometer data, or None to perform IMU update steps without
+                    magnetometer. Can be any unit since normalized values are used.
+    :param beta: algorithm gain beta, either a float or a [M] array.
+    :param sample_period: the sample period, either a float or a [M] array.
+    :return: [M, 4] array of updated quaternions. Rows whose accelerometer or magnetometer values are zero are not
+            updated.
+    :rtype: numpy.ndarray
+    """
+    quaternions = np.asarray(quaternions, dtype=float)
+    q0, q1, q2, q3 = quaternions[:, 0], quaternions[:, 1], quaternions[:, 2], quaternions[:, 3]
+    gx, gy, gz = gyroscope[:, 0], gyroscope[:, 1], gyroscope[:, 2]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Normalise accelerometer measurement
+        a_norm = np.sqrt(np.einsum("ij,ij->i", accelerometer, accelerometer))
+        valid = a_norm != 0
+        ax, ay, az = (accelerometer / a_norm[:, None]).T
+
+        # Objective function and its Jacobian for the gravity direction
+        f0 = 2*(q1*q3 - q0*q2) - ax
+        f1 = 2*(q0*q1 + q2*q3) - ay
+        f2 = 2*(0.5 - q1*q1 - q2*q2) - az
+        s0 = -2*q2*f0 + 2*q1*f1
+        s1 = 2*q3*f0 + 2*q0*f1 - 4*q1*f2
+        s2 = -2*q0*f0 + 2*q3*f1 - 4*q2*f2
+        s3 = 2*q1*f0 + 2*q2*f1
+
+        if magnetometer is not None:
+            # Normalise magnetometer measurement
+            m_norm = np.sqrt(np.einsum("ij,ij->i", magnetometer, magnetometer))
+            valid &= m_norm != 0
+            mx, my, mz = (magnetometer / m_norm[:, None]).T
+
+            # Reference direction of Earth's magnetic field, h = q * m * q.conj()
+            pw = mx*q1 + my*q2 + mz*q3
+            px = mx*q0 - my*q3 + mz*q2
+            py = mx*q3 + my*q0 - mz*q1
+            pz = -mx*q2 + my*q1 + mz*q0
+            hx = q0*px + q1*pw + q2*pz - q3*py
+            hy = q0*py - q1*pz + q2*pw + q3*px
+            bz = q0*pz + q1*py - q2*px + q3*pw
+            bx = np.sqrt(hx*hx + hy*hy)
+
+            # Objective function and its Jacobian for the magnetic field direction
+            f3 = 2*bx*(0.5 - q2*q2 - q3*q3) + 2*bz*(q1*q3 - q0*q2) - mx
+            f4 = 2*bx*(q1*q2 - q0*q3) + 2*bz*(q0*q1 + q2*q3) - my
+            f5 = 2*bx*(q0*q2 + q1*q3) + 2*bz*(0.5 - q1*q1 - q2*q2) - mz
+            s0 = s0 + (-2*bz*q2*f3 + (-2*bx*q3 + 2*bz*q1)*f4 + 2*bx*q2*f5)
+            s1 = s1 + (2*bz*q3*f3 + (2*bx*q2 + 2*bz*q0)*f4 + (2*bx*q3 - 4*bz*q1)*f5)
+            s2 = s2 + ((-4*bx*q2 - 2*bz*q0)*f3 + (2*bx*q1 + 2*bz*q3)*f4 + (2*bx*q0 - 4*bz*q2)*f5)
+            s3 = s3 + ((-4*bx*q3 + 2*bz*q1)*f3 + (-2*bx*q0 + 2*bz*q2)*f4 + 2*bx*q1*f5)
+
+        # Normalise step magnitude
+        s_norm = np.sqrt(s0*s0 + s1*s1 + s2*s2 + s3*s3)
+        s_norm[s_norm == 0] = 1
+
+        # Compute rate of change of quaternion and integrate to yield quaternion
+        beta = beta / s_norm
+        result = np.empty_like(quaternions)
+        result[:, 0] = q0 + ((-q1*gx - q2*gy - q3*gz) * 0.5 - beta*s0) * sample_period
+        result[:, 1] = q1 + ((q0*gx + q2*gz - q3*gy) * 0.5 - beta*s1) * sample_period
+        result[:, 2] = q2 + ((q0*gy - q1*gz + q3*gx) * 0.5 - beta*s2) * sample_period
+        result[:, 3] = q3 + ((q0*gz + q1*gy - q2*gx) * 0.5 - beta*s3) * sample_period
+        result /= np.sqrt(np.einsum("ij,ij->i", result, result))[:, None]
+
+    result[~valid] = quaternions[~valid]
+    return result
@@ -0,0 +1,143 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+eteeDongle emulator on a POSIX pseudo-terminal, which can be connected to as a serial port. Run it as a standalone
+process with:
+
+    python -m etee.dongle_emulator --hands both --rate 97
+
+and connect to the printed port with EteeController.connect_port().
+
+"""
+
+from builtins import object
+import argparse
+import os
+import pty
+import select
+import threading
+import time
+import tty
+
+from .fake_dongle import FakeDongle, synthetic_stream, session_stream, DEFAULT_RATE
+from .tangio_for_etee import SessionReader
+
+HANDS = {"left": (0,), "right": (1,), "both": (0, 1)}
+
+
+class DongleEmulator(object):
+    """
+    This class serves a FakeDongle through a pseudo-terminal, so that the driver reads it through the real serial port
+    path. The bytes sent by the dongle are written to the pseudo-terminal, and the commands written to it by the
+    driver are passed to the dongle.
+    """
+
+    def __init__(self, stream=None, speed=1.0):
+        """
+        Initializes the DongleEmulator class with the given parameters.
+
+        :param stream: iterable of (timestamp, bytes) tuples to be sent. If None, synthetic_stream() is used.
+        :param float speed: playback speed factor, 1 for real time. If None, data is sent as fast as it is read.
+        """
+        self.dongle = FakeDongle(stream, speed=speed, timeout=0.1)
+        self.port = None
+        self.run_mode = False
+        self.threads = list()
+        self._master = None
+        self._slave = None
+
+    def start(self):
+        """
+        Creates the pseudo-terminal and launches the threads that serve the dongle through it.
+
+        :return: pseudo-terminal port name.
+        :rtype: str
+        """
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        # The slave end is kept open, so that the pseudo-terminal outlives the connections to it
+        self.port = os.ttyname(self._slave)
+        self.dongle.port = self.port
+        self.run_mode = True
+        self.threads = [threading.Thread(target=self._send_loop), threading.Thread(target=self._receive_loop)]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+        return self.port
+
+    def stop(self):
+        """
+        Stops serving the dongle and closes the pseudo-terminal.
+        """
+        self.run_mode = False
+        self.dongle.close()
+        for thread in self.threads:
+            thread.join(1)
+        os.close(self._master)
+        os.close(self._slave)
+
+    def _send_loop(self):
+        """
+        Method that writes the bytes sent by the dongle to the pseudo-terminal.
+        """
+        while self.run_mode:
+            data = memoryview(self.dongle.read(self.dongle.in_waiting or 1))
+            # The pseudo-terminal may take only part of the bytes, so the rest is written until all are sent
+            while data and self.run_mode:
+                data = data[os.write(self._master, data):]
+
+    def _receive_loop(self):
+        """
+        Method that passes the bytes written to the pseudo-terminal to the dongle.
+        """
+        while self.run_mode:
+            readable, _, _ = select.select([self._master], [], [], 0.1)
+            if readable:
+                self.dongle.write(os.read(self._master, 1024))
+
+
+def main():
+    """
+    Runs the emulator until it is interrupted.
+    """
+    parser = argparse.ArgumentParser(description="eteeDongle emulator on a pseudo-terminal.")
+    parser.add_argument("--hands", choices=sorted(HANDS), default="both", help="connected controllers")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="data frames per second per controller")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="number of data frames sent before the controllers disconnect")
+    parser.add_argument("--session", default=None, help="recorded session file to replay instead of synthetic data")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed factor, 0 to send as fast as read")
+    args = parser.parse_args()
+
+    if args.session is not None:
+        stream = session_stream(SessionReader(args.session))
+    else:
+        stream = synthetic_stream(rate=args.rate, hands=HANDS[args.hands], count=args.frames)
+    emulator = DongleEmulator(stream, speed=args.speed or None)
+    print(emulator.start(), flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
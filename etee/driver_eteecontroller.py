@@ -23,11 +23,13 @@ Classes and methods for eteeController events, communication and data retrieval.
 
 """
 
+from enum import IntEnum
 import os
 import time
+from types import MappingProxyType
 
-from .tangio_for_etee import TG0Driver, serial_ports, parse_utf8
-from . import Ahrs
+from .tangio_for_etee import TG0Driver, PortMonitor, WidgetFrame, parse_utf8
+from . import Ahrs, FrameHistory, Quaternion
 
 ETEE_CONTROLLER_DATA_CONFIG = os.path.join(os.path.dirname(__file__), "config", "etee_controller.yaml")
 
@@ -66,6 +68,122 @@ class EteeControllerEvent:
             cb()
 
 
+class EteeControllerSnapshot:
+    """
+    This class holds an immutable copy of the state of one eteeController for a single data frame: all the widget
+    values, the orientation computed from them, the frame number and the time at which the frame was received.
+    The values of a WidgetFrame are copied to a read-only record, and the quaternion is copied, so that they are not
+    changed by the frames received later.
+    """
+    __slots__ = ("data", "quaternion", "frameno", "timestamp", "_euler")
+
+    def __init__(self, data, quaternion, frameno, timestamp):
+        """
+        Class constructor method.
+
+        :param dict data: Dictionary or WidgetFrame of the parsed controller data. It must not be modified after the
+                        snapshot is made.
+        :param Quaternion quaternion: Controller's quaternion computed from the frame.
+        :param int frameno: Controller's frame number.
+        :param float timestamp: Time at which the frame was received, in seconds from a monotonic clock.
+        """
+        if isinstance(data, WidgetFrame):
+            record = data.record
+            data = WidgetFrame(memoryview(record.tobytes()).cast(record.typecode), MappingProxyType(data.layout))
+        else:
+            data = MappingProxyType(data)
+        object.__setattr__(self, "data", data)
+        object.__setattr__(self, "quaternion", None if quaternion is None else Quaternion(quaternion))
+        object.__setattr__(self, "frameno", frameno)
+        object.__setattr__(self, "timestamp", timestamp)
+        object.__setattr__(self, "_euler", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EteeControllerSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("EteeControllerSnapshot is immutable")
+
+    @property
+    def euler(self):
+        """
+        Controller's euler angles (roll, pitch, yaw) computed from the frame. They are only calculated when requested.
+
+        :return: roll, pitch, yaw in radians, or None if no quaternion was computed.
+        """
+        if self._euler is None and self.quaternion is not None:
+            object.__setattr__(self, "_euler", self.quaternion.to_euler())
+        return self._euler
+
+    def __getitem__(self, w):
+        """
+        Get a widget value from the frame.
+
+        :param str w: Key for the device data to be retrieved, as defined in the YAML file.
+        :return: Controller's value for the key provided.
+        """
+        return self.data[w]
+
+    def __contains__(self, w):
+        return w in self.data
+
+    def keys(self):
+        """
+        Get the widget names in the frame.
+
+        :return: widget names, as defined in the YAML file.
+        """
+        return self.data.keys()
+
+
+class Hand(IntEnum):
+    """
+    eteeController hands, with the values of the "hand" key in the controller data.
+    Methods with a dev parameter accept either these values or the "left" and "right" strings.
+    """
+    LEFT = 0
+    RIGHT = 1
+
+
+_HAND_INDICES = {"left": Hand.LEFT.value, "right": Hand.RIGHT.value, Hand.LEFT: Hand.LEFT.value,
+                 Hand.RIGHT: Hand.RIGHT.value}
+
+
+def _hand_index(dev):
+    """
+    Returns the index of the selected controller hand.
+
+    :param dev: Selected controller hand. Possible values: "left", "right", Hand.LEFT, Hand.RIGHT, 0, 1.
+    :return: 0 for the left hand and 1 for the right hand.
+    :rtype: int
+    :raises ValueError: if the dev input is not a valid hand
+    """
+    try:
+        return _HAND_INDICES[dev]
+    except (KeyError, TypeError):
+        raise ValueError("Input must be: 'left' or 'right'")
+
+
+def _widget_getter(w, doc):
+    """
+    Creates an EteeController getter method which returns the value of a widget for the selected controller.
+
+    :param str w: Widget name, as defined in the YAML file.
+    :param str doc: Docstring of the getter method.
+    :return: getter method, taking the dev parameter.
+    """
+    def getter(self, dev):
+        try:
+            data = self._api_data[_HAND_INDICES[dev]]
+        except (KeyError, TypeError):
+            raise ValueError("Input must be: 'left' or 'right'")
+        if data is None:
+            return None
+        return data[w]
+    getter.__doc__ = doc
+    return getter
+
+
 class EteeController:
     """
     This class manages the communication between the driver and the eteeControllers, through the eteeDongle.
@@ -74,32 +192,42 @@ class EteeController:
     """
     ETEE_DONGLE_VID = 9114
     ETEE_DONGLE_PID = None
+    DRIVER_CLASS = TG0Driver
+    _IMU_OFFSET_COMMANDS = [[b"BL+gf\r\n", b"BL+mf\r\n"], [b"BR+gf\r\n", b"BR+mf\r\n"]]
 
-    def __init__(self):
+    def __init__(self, compact_frames=False, history_size=0):
         """
         Class constructor method.
+
+        :param bool compact_frames: if true, the controllers data is stored in array-backed WidgetFrame objects instead
+                                    of a dictionary per data packet. Getter methods work in the same way.
+        :param int history_size: number of frames kept for each controller and returned by the history() method.
+                                If 0, no history is kept.
         """
         self._hand_last_on_left = 0
         self._hand_last_on_right = 0
-        self._api_data_left = None
-        self._api_data_right = None
+        self._api_data = [None, None]
         self._frameno_left = 0
         self._frameno_right = 0
+        self._timestamp_left = None
+        self._timestamp_right = None
+        self._snapshots = [None, None]
+        self._history_size = history_size
+        self._histories = [None, None]
         self._ahrs_left = Ahrs()
         self._ahrs_right = Ahrs()
         self._quaternion_left = None
         self._quaternion_right = None
         self._absolute_imu_on = False
-        self._euler_left = None
-        self._euler_right = None
 
-        self.driver = TG0Driver(ETEE_CONTROLLER_DATA_CONFIG)
+        self.driver = self.DRIVER_CLASS(ETEE_CONTROLLER_DATA_CONFIG, compact_frames=compact_frames)
         self.driver.add_callback(self._api_data_callback)
         self.driver.add_print_callback(self._print_callback)
         self.driver.add_serial_exception_callbacks(self._serial_exception_callback)
 
         self.connection_port = None
         self.dongle_connection = False
+        self.port_monitor = PortMonitor(self.ETEE_DONGLE_VID, self.ETEE_DONGLE_PID)
 
         # ---------------- Events ----------------
         self.left_hand_received = EteeControllerEvent()
@@ -163,10 +291,12 @@ class EteeController:
         Attempt to establish serial connection to an etee dongle port. Supports both Windows (COMx)
         and Unix-style (/dev/...) port names.
 
-        :param str or None port: etee dongle port name.
+        :param str or None port: etee dongle port name. A software dongle, such as FakeDongle, can also be passed.
         :return: Success flag - True if the connection is successful, False if otherwise
         :rtype: bool
         """
+        if not isinstance(port, str):
+            return self.driver.connect(port)
         # Accept both Windows-style COM ports and Unix-style device ports
         if port.startswith('COM') or port.startswith('/dev/'):
             return self.driver.connect(port)
@@ -204,15 +334,17 @@ class EteeController:
         available_ports = self.get_available_etee_ports()
         return len(available_ports)
 
-    def get_available_etee_ports(self):
+    def get_available_etee_ports(self, refresh=False):
         """
         Get all available etee dongle COM ports. Other devices are automatically filtered out through a
-        VID and PID filtering method.
+        VID and PID filtering method. The ports are cached by the port monitor, so this can be called on every
+        iteration of an application loop.
 
+        :param bool refresh: If True, the COM ports are enumerated again instead of using the cached ports.
         :return: List of COM port names with etee dongles connected.
         :rtype: list[str]
         """
-        return [x[0] for x in serial_ports(self.ETEE_DONGLE_VID, self.ETEE_DONGLE_PID)]
+        return self.port_monitor.get_port_names(refresh)
 
     def disconnect(self):
         """
@@ -248,6 +380,23 @@ class EteeController:
         """
         self.driver.send_command(b"BP+AS\r\n")
 
+    def start_recording(self, path):
+        """
+        Starts recording the raw data received from the eteeDongle to a session file, which can be decoded again
+        later. Data frames are recorded with their receive time and controller hand, together with the text lines.
+
+        :param str path: path of the session file. If it exists, it is overwritten.
+        :return: session recorder.
+        :rtype: SessionRecorder
+        """
+        return self.driver.start_recording(path)
+
+    def stop_recording(self):
+        """
+        Stops recording, once all the received data has been written to the session file.
+        """
+        self.driver.stop_recording()
+
     def _api_data_callback(self, frameno, data):
         """
         Manages part of the data loop. Parses the argument data and stores it in the corresponding hand's
@@ -256,33 +405,62 @@ class EteeController:
         :param dict data: Dictionary of the parsed controller data.
         """
         if data["hand"] == 0:
-            self._api_data_left = data
+            self._api_data[Hand.LEFT] = data
             self._hand_last_on_left = time.time()
+            self._timestamp_left = self.driver.current_timestamp
             self._frameno_left += 1
             self._update_quaternion_left()
+            self._snapshots[Hand.LEFT] = EteeControllerSnapshot(data, self._quaternion_left, self._frameno_left,
+                                                                self._timestamp_left)
+            if self._history_size:
+                self._get_history(Hand.LEFT).append(data, self._quaternion_left, self._timestamp_left,
+                                                    self._frameno_left)
             self.left_hand_received.emit()
 
         elif data["hand"] == 1:
-            self._api_data_right = data
+            self._api_data[Hand.RIGHT] = data
             self._hand_last_on_right = time.time()
+            self._timestamp_right = self.driver.current_timestamp
             self._frameno_right += 1
             self._update_quaternion_right()
+            self._snapshots[Hand.RIGHT] = EteeControllerSnapshot(data, self._quaternion_right, self._frameno_right,
+                                                                 self._timestamp_right)
+            if self._history_size:
+                self._get_history(Hand.RIGHT).append(data, self._quaternion_right, self._timestamp_right,
+                                                     self._frameno_right)
             self.right_hand_received.emit()
 
         self.hand_received.emit()
 
-        if (time.time() - self._hand_last_on_left) > 1.5 and self._api_data_left is not None:
-            self._api_data_left = None
+        if (time.time() - self._hand_last_on_left) > 1.5 and self._api_data[Hand.LEFT] is not None:
+            self._api_data[Hand.LEFT] = None
+            self._snapshots[Hand.LEFT] = None
             self.left_hand_lost.emit()
-        if (time.time() - self._hand_last_on_right) > 1.5 and self._api_data_right is not None:
-            self._api_data_right = None
+        if (time.time() - self._hand_last_on_right) > 1.5 and self._api_data[Hand.RIGHT] is not None:
+            self._api_data[Hand.RIGHT] = None
+            self._snapshots[Hand.RIGHT] = None
             self.right_hand_lost.emit()
 
+    def _get_history(self, hand):
+        """
+        Returns the frame history of a controller, which is created with the data structure of the connected driver
+        when the first frame is received.
+
+        :param int hand: Controller hand index.
+        :return: Controller's frame history.
+        :rtype: FrameHistory
+        """
+        history = self._histories[hand]
+        if history is None:
+            history = FrameHistory(self.driver.serial_reader.decoder, self._history_size)
+            self._histories[hand] = history
+        return history
+
     def _serial_exception_callback(self):
         """
         Emit a disconnection event if the etee dongle connection is lost.
         """
-        ports = self.get_available_etee_ports()
+        ports = self.get_available_etee_ports(refresh=True)
         if self.driver.serial_reader.port not in ports:
             self.driver.disconnect()
             self.dongle_disconnected.emit()
@@ -298,10 +476,12 @@ class EteeController:
         elif reading == b"L connection complete\r\n":
             self.left_connected.emit()
         elif reading == b"R disconnected\r\n":
-            self._api_data_right = None
+            self._api_data[Hand.RIGHT] = None
+            self._snapshots[Hand.RIGHT] = None
             self.right_disconnected.emit()
         elif reading == b"L disconnected\r\n":
-            self._api_data_left = None
+            self._api_data[Hand.LEFT] = None
+            self._snapshots[Hand.LEFT] = None
             self.left_disconnected.emit()
 
     def _rest_callback(self, reading):
@@ -313,13 +493,15 @@ class EteeController:
         """
         if reading is not None:
             return
-        left_lost = (time.time() - self._hand_last_on_left) > 1.5 and self._api_data_left is not None
-        right_lost = (time.time() - self._hand_last_on_right) > 1.5 and self._api_data_right is not None
+        left_lost = (time.time() - self._hand_last_on_left) > 1.5 and self._api_data[Hand.LEFT] is not None
+        right_lost = (time.time() - self._hand_last_on_right) > 1.5 and self._api_data[Hand.RIGHT] is not None
         if left_lost:
-            self._api_data_left = None
+            self._api_data[Hand.LEFT] = None
+            self._snapshots[Hand.LEFT] = None
             self.left_hand_lost.emit()
         if right_lost:
-            self._api_data_right = None
+            self._api_data[Hand.RIGHT] = None
+            self._snapshots[Hand.RIGHT] = None
             self.right_hand_lost.emit()
         if left_lost and right_lost:
             self.data_lost.emit()
@@ -337,115 +519,139 @@ class EteeController:
 
     def _update_quaternion_left(self):
         """
-        Calculates and updates the left controller's quaternion and euler.
-        """
-        accel = [
-            self.get_left("accel_x"),
-            self.get_left("accel_y"),
-            self.get_left("accel_z")]
-        gyro = [
-            self.get_left("gyro_x"),
-            self.get_left("gyro_y"),
-            self.get_left("gyro_z")]
-        if None in gyro or None in accel:
+        Calculates and updates the left controller's quaternion with a single filter step. The euler angles are
+        derived from it when requested.
+        """
+        data = self._api_data[Hand.LEFT]
+        if data is None:
             return
+        accel = [data["accel_x"], data["accel_y"], data["accel_z"]]
+        gyro = [data["gyro_x"], data["gyro_y"], data["gyro_z"]]
         if self._absolute_imu_on:
-            mag = [
-                self.get_left("mag_x"),
-                self.get_left("mag_y"),
-                self.get_left("mag_z")]
-            if None in mag:
-                return
+            mag = [data["mag_x"], data["mag_y"], data["mag_z"]]
         else:
             mag = None
-        self._quaternion_left = self._ahrs_left.get_quaternion(gyro, accel, mag)
-        self._euler_left = self._ahrs_left.get_euler(gyro, accel, mag)
+        self._quaternion_left = self._ahrs_left.get_quaternion(gyro, accel, mag, self._timestamp_left)
 
     def _update_quaternion_right(self):
         """
-        Calculates and updates the right controller's quaternion and euler.
+        Calculates and updates the right controller's quaternion with a single filter step. The euler angles are
+        derived from it when requested.
         """
-        accel = [self.get_right("accel_x"), self.get_right("accel_y"), self.get_right("accel_z")]
-        gyro = [self.get_right("gyro_x"), self.get_right("gyro_y"), self.get_right("gyro_z")]
-        if None in gyro or None in accel:
+        data = self._api_data[Hand.RIGHT]
+        if data is None:
             return
+        accel = [data["accel_x"], data["accel_y"], data["accel_z"]]
+        gyro = [data["gyro_x"], data["gyro_y"], data["gyro_z"]]
         if self._absolute_imu_on:
-            mag = [self.get_right("mag_x"),  self.get_right("mag_y"), self.get_right("mag_z")]
-            if None in mag:
-                return
+            mag = [data["mag_x"], data["mag_y"], data["mag_z"]]
         else:
             mag = None
-        self._quaternion_right = self._ahrs_right.get_quaternion(gyro, accel, mag)
-        self._euler_right = self._ahrs_right.get_euler(gyro, accel, mag)
+        self._quaternion_right = self._ahrs_right.get_quaternion(gyro, accel, mag, self._timestamp_right)
 
     def update_gyro_offset_left(self):
         """
         Retrieves the gyroscope calibration parameters saved on the left etee controller, and updates the calibration
         offsets in the driver model.
         """
-        response = self.driver.send_command(b"BL+gf\r\n")
-        try:
-            x = float(response.split(b"X:")[1].split(b" ")[0].decode())
-            y = float(response.split(b"Y:")[1].split(b" ")[0].decode())
-            z = float(response.split(b"Z:")[1].split(b"\r\n")[0].decode())
-            self._ahrs_left.set_gyro_offset([x, y, z])
-        except:
-            pass
+        offset = self._parse_imu_offset(self.driver.send_command(b"BL+gf\r\n"))
+        if offset is not None:
+            self._ahrs_left.set_gyro_offset(offset)
 
     def update_gyro_offset_right(self):
         """
         Retrieves the gyroscope calibration parameters saved on the right etee controller, and updates the calibration
         offsets in the driver model.
         """
-        response = self.driver.send_command(b"BR+gf\r\n")
-        try:
-            x = float(response.split(b"X:")[1].split(b" ")[0].decode())
-            y = float(response.split(b"Y:")[1].split(b" ")[0].decode())
-            z = float(response.split(b"Z:")[1].split(b"\r\n")[0].decode())
-            self._ahrs_right.set_gyro_offset([x, y, z])
-        except:
-            pass
+        offset = self._parse_imu_offset(self.driver.send_command(b"BR+gf\r\n"))
+        if offset is not None:
+            self._ahrs_right.set_gyro_offset(offset)
 
     def update_mag_offset_left(self):
         """
         Retrieves the magnetometer calibration parameters saved on the left etee controller, and updates the calibration
         offsets in the driver model.
         """
-        response = self.driver.send_command(b"BL+mf\r\n")
-        try:
-            x = float(response.split(b"X:")[1].split(b" ")[0].decode())
-            y = float(response.split(b"Y:")[1].split(b" ")[0].decode())
-            z = float(response.split(b"Z:")[1].split(b"\r\n")[0].decode())
-            self._ahrs_left.set_mag_offset([x, y, z])
-        except:
-            pass
+        offset = self._parse_imu_offset(self.driver.send_command(b"BL+mf\r\n"))
+        if offset is not None:
+            self._ahrs_left.set_mag_offset(offset)
 
     def update_mag_offset_right(self):
         """
         Retrieves the magnetometer calibration parameters saved on the right etee controller, and updates the calibration
         offsets in the driver model.
         """
-        response = self.driver.send_command(b"BR+mf\r\n")
+        offset = self._parse_imu_offset(self.driver.send_command(b"BR+mf\r\n"))
+        if offset is not None:
+            self._ahrs_right.set_mag_offset(offset)
+
+    @staticmethod
+    def _parse_imu_offset(response):
+        """
+        Parses the X, Y and Z calibration offsets from a controller's gyroscope or magnetometer calibration response.
+
+        :param bytes response: Response to the calibration command.
+        :return: Offsets [x, y, z], or None if the response could not be parsed.
+        :rtype: list[float]
+        """
         try:
             x = float(response.split(b"X:")[1].split(b" ")[0].decode())
             y = float(response.split(b"Y:")[1].split(b" ")[0].decode())
             z = float(response.split(b"Z:")[1].split(b"\r\n")[0].decode())
-            self._ahrs_right.set_mag_offset([x, y, z])
+            return [x, y, z]
         except:
-            pass
+            return None
 
-    def update_imu_offsets(self):
+    def update_imu_offsets(self, timeout=2, settle_time=2):
         """
         Retrieves the gyroscope and magnetometer calibration parameters from both controllers, and updates the calibration
-        offsets in the driver model.
+        offsets in the driver model. The two calibration queries of each controller are sent at once and their
+        responses are collected concurrently. The responses do not say which controller they come from, so the
+        controllers are queried one after the other, and a controller which does not answer only makes its own queries
+        time out.
+
+        :param float timeout: Time to wait for the calibration responses of each controller, in seconds.
+        :param float settle_time: Time to wait before sending the queries, in seconds, as the controllers do not
+                                answer them right after connecting.
+        :return: Calibration commands which timed out or whose response could not be parsed.
+        :rtype: list[str]
         """
         print("Updating gyro and magnetometer offsets. Please, wait...")
-        time.sleep(2)
-        self.update_gyro_offset_left()
-        self.update_gyro_offset_right()
-        self.update_mag_offset_left()
-        self.update_mag_offset_right()
-        print("Gyro and magnetometer offsets updated!")
+        time.sleep(settle_time)
+        results = []
+        for commands in self._IMU_OFFSET_COMMANDS:
+            results.append(self.driver.send_commands(commands, timeout=timeout))
+        return self._apply_imu_offsets(results)
+
+    def _apply_imu_offsets(self, results):
+        """
+        Parses the responses to the calibration commands and updates the calibration offsets in the driver model.
+
+        :param list[list[CommandResponse]] results: Responses to the commands in _IMU_OFFSET_COMMANDS, by hand.
+        :return: Calibration commands which timed out or whose response could not be parsed.
+        :rtype: list[str]
+        """
+        timed_out = []
+        unparsed = []
+        for ahrs, commands, command_responses in zip((self._ahrs_left, self._ahrs_right), self._IMU_OFFSET_COMMANDS,
+                                                     results):
+            setters = [ahrs.set_gyro_offset, ahrs.set_mag_offset]
+            for command, command_response, set_offset in zip(commands, command_responses, setters):
+                if not command_response.done:
+                    timed_out.append(command.decode().strip())
+                    continue
+                offset = self._parse_imu_offset(command_response.result())
+                if offset is None:
+                    unparsed.append(command.decode().strip())
+                else:
+                    set_offset(offset)
+        if timed_out:
+            print("Offset queries timed out: {}".format(", ".join(timed_out)))
+        if unparsed:
+            print("Offset responses could not be parsed: {}".format(", ".join(unparsed)))
+        if not timed_out and not unparsed:
+            print("Gyro and magnetometer offsets updated!")
+        return timed_out + unparsed
 
     # ---------------- Firmware Versions ----------------
     def get_dongle_version(self):
@@ -456,8 +662,18 @@ class EteeController:
                 If no dongle is connected, the firmware version value will be None.
         :rtype: str
         """
+        return self._parse_dongle_version(self.driver.send_command(b"AT+AB\r\n"))
+
+    @staticmethod
+    def _parse_dongle_version(response):
+        """
+        Parses the dongle firmware version from the response to the dongle version command.
+
+        :param bytes response: Response to the dongle version command.
+        :return: Dongle firmware version, or None if it is not in the response.
+        :rtype: str
+        """
         ret = None
-        response = self.driver.send_command(b"AT+AB\r\n")
         response = parse_utf8(response)
         if "NRF" in response:
             ret = response.split("NRF")[1].split("\r\n")[0]
@@ -471,8 +687,20 @@ class EteeController:
                 If a controller is not connected, its firmware version value will be None.
         :rtype: list[str]
         """
-        ret = [None, None]
         response = self.driver.send_command(b"BP+AB\r\n", response_keys=[b"R:AB=etee", b"L:AB=etee"], verbose=True)
+        return self._parse_etee_versions(response)
+
+    @staticmethod
+    def _parse_etee_versions(response):
+        """
+        Parses the controllers firmware versions from the response to the controllers version command.
+
+        :param dict response: Response to the controllers version command, by response key.
+        :return: Firmware versions of the left and right controllers. The version of a controller not in the
+                response is None.
+        :rtype: list[str]
+        """
+        ret = [None, None]
         if response is None:
             return ret
         if response[b"R:AB=etee"] is not None and b'-' in response[b"R:AB=etee"]:
@@ -489,10 +717,10 @@ class EteeController:
         :param str w: Key for the device data to be retrieved, as defined in the YAML file.
         :return: Left controller's value for the key provided.
         """
-        if self._api_data_left:
-            return self._api_data_left[w]
-        else:
+        data = self._api_data[Hand.LEFT]
+        if data is None:
             return None
+        return data[w]
 
     def get_right(self, w):
         """
@@ -501,10 +729,42 @@ class EteeController:
         :param str w: Key for the device data to be retrieved, as defined in the YAML file.
         :return: Right controller's value for the key provided.
         """
-        if self._api_data_right:
-            return self._api_data_right[w]
-        else:
+        data = self._api_data[Hand.RIGHT]
+        if data is None:
+            return None
+        return data[w]
+
+    def snapshot(self, dev):
+        """
+        Get the latest state of the specified device (left or right) as an immutable snapshot. All the values in the
+        snapshot belong to the same data frame, even if new frames are received while it is being read.
+
+        :param str dev: Selected controller hand. Possible values: "left", "right".
+        :return: Selected controller's latest state, or None if no data is being received from it.
+        :rtype: EteeControllerSnapshot
+        :raises ValueError: if the dev input is not "left" or "right"
+        """
+        return self._snapshots[_hand_index(dev)]
+
+    def history(self, dev, w, n=None):
+        """
+        Get the last values of a key for the specified device (left or right), from oldest to newest. The history must
+        be enabled with the history_size parameter of the class constructor.
+        The returned array is a read-only view of the history buffer, which is overwritten as new data is received, so
+        it must be copied to keep it.
+
+        :param str dev: Selected controller hand. Possible values: "left", "right".
+        :param str w: Key for the device data to be retrieved, as defined in the YAML file, or "quaternion",
+                    "timestamp" or "frameno".
+        :param int n: Number of values. If None, all the values in the history are returned.
+        :return: Selected controller's last values for the key provided, or None if no data has been received from it.
+        :rtype: numpy.ndarray
+        :raises ValueError: if the dev input is not "left" or "right"
+        """
+        history = self._histories[_hand_index(dev)]
+        if history is None:
             return None
+        return history.window(w, n)
 
     def get_data(self, dev, w):
         """
@@ -515,12 +775,27 @@ class EteeController:
         :return: Selected controller's value for the key provided.
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left":
-            return self.get_left(w)
-        elif dev == "right":
-            return self.get_right(w)
-        else:
-            raise ValueError("Input 'dev' must be: 'left' or 'right'")
+        data = self._api_data[_hand_index(dev)]
+        if data is None:
+            return None
+        return data[w]
+
+    def get_values(self, dev, widgets):
+        """
+        Get several key values in the current internal data buffer for the specified device (left or right) at once.
+        All the values belong to the same data frame.
+
+        :param str dev: Selected controller hand. Possible values: "left", "right".
+        :param list[str] widgets: Keys for the device data to be retrieved, as defined in the YAML file.
+        :return: Selected controller's values for the keys provided, in the same order, or None if no data is being
+                received from the controller.
+        :rtype: list
+        :raises ValueError: if the dev input is not "left" or "right"
+        """
+        data = self._api_data[_hand_index(dev)]
+        if data is None:
+            return None
+        return [data[w] for w in widgets]
 
     # ---------------- Get hand/controller connection status ----------------
     def all_hands_on(self):
@@ -530,7 +805,7 @@ class EteeController:
         :return: Returns true if data has been recently received from both controllers.
         :rtype: bool
         """
-        return (self._api_data_left is not None) and (self._api_data_right is not None)
+        return (self._api_data[Hand.LEFT] is not None) and (self._api_data[Hand.RIGHT] is not None)
 
     def any_hand_on(self):
         """
@@ -539,7 +814,7 @@ class EteeController:
         :return: Returns true if data has been recently received from any of the controller.
         :rtype: bool
         """
-        return (self._api_data_left is not None) or (self._api_data_right is not None)
+        return (self._api_data[Hand.LEFT] is not None) or (self._api_data[Hand.RIGHT] is not None)
 
     def left_hand_on(self):
         """
@@ -548,7 +823,7 @@ class EteeController:
         :return: Returns true if data has been recently received from the left controller.
         :rtype: bool
         """
-        return self._api_data_left is not None
+        return self._api_data[Hand.LEFT] is not None
 
     def right_hand_on(self):
         """
@@ -557,12 +832,11 @@ class EteeController:
         :return: Returns true if data has been recently received from the right controller.
         :rtype: bool
         """
-        return self._api_data_right is not None
+        return self._api_data[Hand.RIGHT] is not None
 
     # ================ Getter functions for sensor data ================
     # ---------------- Get pinky finger data ----------------
-    def get_pinky_pull(self, dev):
-        """
+    get_pinky_pull = _widget_getter("pinky_pull", """
         Returns the pinky finger pull value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -570,16 +844,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinky_pull")
-        elif dev == "right":
-            return self.get_right("pinky_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_pinky_force(self, dev):
-        """
+    get_pinky_force = _widget_getter("pinky_force", """
         Returns the pinky finger force value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -587,49 +854,28 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinky_force")
-        elif dev == "right":
-            return self.get_right("pinky_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_pinky_touched(self, dev):
-        """
+    get_pinky_touched = _widget_getter("pinky_touched", """
         Returns the pinky finger touch value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's pinky finger is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinky_touched")
-        elif dev == "right":
-            return self.get_right("pinky_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_pinky_clicked(self, dev):
-        """
+    get_pinky_clicked = _widget_getter("pinky_clicked", """
         Returns the pinky finger click value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's pinky finger is clicked.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinky_clicked")
-        elif dev == "right":
-            return self.get_right("pinky_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get ring finger data ----------------
-    def get_ring_pull(self, dev):
-        """
+    get_ring_pull = _widget_getter("ring_pull", """
         Returns the ring finger pull value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -637,16 +883,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("ring_pull")
-        elif dev == "right":
-            return self.get_right("ring_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_ring_force(self, dev):
-        """
+    get_ring_force = _widget_getter("ring_force", """
         Returns the ring finger force value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -654,49 +893,28 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("ring_force")
-        elif dev == "right":
-            return self.get_right("ring_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_ring_touched(self, dev):
-        """
+    get_ring_touched = _widget_getter("ring_touched", """
         Returns the ring finger touch value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's ring finger is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("ring_touched")
-        elif dev == "right":
-            return self.get_right("ring_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_ring_clicked(self, dev):
-        """
+    get_ring_clicked = _widget_getter("ring_clicked", """
         Returns the ring finger click value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's ring finger is clicked.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("ring_clicked")
-        elif dev == "right":
-            return self.get_right("ring_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get middle finger data ----------------
-    def get_middle_pull(self, dev):
-        """
+    get_middle_pull = _widget_getter("middle_pull", """
         Returns the middle finger pull value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -704,16 +922,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("middle_pull")
-        elif dev == "right":
-            return self.get_right("middle_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_middle_force(self, dev):
-        """
+    get_middle_force = _widget_getter("middle_force", """
         Returns the middle finger force value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -721,49 +932,28 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("middle_force")
-        elif dev == "right":
-            return self.get_right("middle_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_middle_touched(self, dev):
-        """
+    get_middle_touched = _widget_getter("middle_touched", """
         Returns the middle finger touch value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's middle finger is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("middle_touched")
-        elif dev == "right":
-            return self.get_right("middle_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_middle_clicked(self, dev):
-        """
+    get_middle_clicked = _widget_getter("middle_clicked", """
         Returns the middle finger click value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's middle finger is clicked.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("middle_clicked")
-        elif dev == "right":
-            return self.get_right("middle_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get index finger data ----------------
-    def get_index_pull(self, dev):
-        """
+    get_index_pull = _widget_getter("index_pull", """
         Returns the index finger pull value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -771,16 +961,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("index_pull")
-        elif dev == "right":
-            return self.get_right("index_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_index_force(self, dev):
-        """
+    get_index_force = _widget_getter("index_force", """
         Returns the index finger force value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -788,49 +971,28 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("index_force")
-        elif dev == "right":
-            return self.get_right("index_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_index_touched(self, dev):
-        """
+    get_index_touched = _widget_getter("index_touched", """
         Returns the index finger touch value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's index finger is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("index_touched")
-        elif dev == "right":
-            return self.get_right("index_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_index_clicked(self, dev):
-        """
+    get_index_clicked = _widget_getter("index_clicked", """
         Returns the index finger click value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's index finger is clicked.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("index_clicked")
-        elif dev == "right":
-            return self.get_right("index_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get thumb finger data ----------------
-    def get_thumb_pull(self, dev):
-        """
+    get_thumb_pull = _widget_getter("thumb_pull", """
         Returns the thumb finger pull value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -838,16 +1000,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("thumb_pull")
-        elif dev == "right":
-            return self.get_right("thumb_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_thumb_force(self, dev):
-        """
+    get_thumb_force = _widget_getter("thumb_force", """
         Returns the thumb finger force value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -855,45 +1010,25 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("thumb_force")
-        elif dev == "right":
-            return self.get_right("thumb_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_thumb_touched(self, dev):
-        """
+    get_thumb_touched = _widget_getter("thumb_touched", """
         Returns the thumb finger touch value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's thumb finger is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("thumb_touched")
-        elif dev == "right":
-            return self.get_right("thumb_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_thumb_clicked(self, dev):
-        """
+    get_thumb_clicked = _widget_getter("thumb_clicked", """
         Returns the thumb finger click value for the selected device/controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected controller's thumb finger is clicked.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("thumb_clicked")
-        elif dev == "right":
-            return self.get_right("thumb_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get all fingers data ----------------
     def get_device_finger_pressures(self, dev):
@@ -907,16 +1042,14 @@ class EteeController:
         :rtype: list[int], list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left" or "right":
-            fingers_pull = [self.get_data(dev, "thumb_pull"), self.get_data(dev, "index_pull"),
-                            self.get_data(dev, "middle_pull"),
-                            self.get_data(dev, "ring_pull"), self.get_data(dev, "pinky_pull")]
-            fingers_force = [self.get_data(dev, "thumb_force"), self.get_data(dev, "index_force"),
-                             self.get_data(dev, "middle_force"),
-                             self.get_data(dev, "ring_force"), self.get_data(dev, "pinky_force")]
-            return fingers_pull, fingers_force
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        data = self._api_data[_hand_index(dev)]
+        if data is None:
+            return [None] * 5, [None] * 5
+        fingers_pull = [data["thumb_pull"], data["index_pull"], data["middle_pull"], data["ring_pull"],
+                        data["pinky_pull"]]
+        fingers_force = [data["thumb_force"], data["index_force"], data["middle_force"], data["ring_force"],
+                         data["pinky_force"]]
+        return fingers_pull, fingers_force
 
     # ---------------- Get tracker data ----------------
     def get_tracker_connections(self):
@@ -928,25 +1061,17 @@ class EteeController:
         """
         return self.get_left("tracker_on") and self.get_right("tracker_on")
 
-    def get_tracker_connection(self, dev):
-        """
+    get_tracker_connection = _widget_getter("tracker_on", """
         Checks if the selected controller has an eteeTracker connected.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: Returns True if the selected tracker is connected.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("tracker_on")
-        elif dev == "right":
-            return self.get_right("tracker_on")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get proximity sensor data from tracker ----------------
-    def get_proximity(self, dev):
-        """
+    get_proximity = _widget_getter("proximity_value", """
         Returns the proximity sensor analog value for the selected controller.
         This sensor is only available when an eteeTracker is connected.
         If disconnected, the value will always be 0, even when the sensor is interacted with.
@@ -956,16 +1081,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("proximity_value")
-        elif dev == "right":
-            return self.get_right("proximity_value")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_proximity_touched(self, dev):
-        """
+    get_proximity_touched = _widget_getter("proximity_touched", """
         Returns the proximity sensor touch value for the selected controller.
         This sensor is only available when an eteeTracker is connected.
         If disconnected, the value will always be false, even when the sensor is touched.
@@ -974,16 +1092,9 @@ class EteeController:
         :return: True if the selected tracker's proximity sensor value is at touch level.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("proximity_touched")
-        elif dev == "right":
-            return self.get_right("proximity_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_proximity_clicked(self, dev):
-        """
+    get_proximity_clicked = _widget_getter("proximity_clicked", """
         Returns the proximity sensor click value for the selected controller.
         This sensor is only available when an eteeTracker is connected.
         If disconnected, the value will always be false, even when the sensor is touched.
@@ -992,17 +1103,10 @@ class EteeController:
         :return: True if the selected tracker's proximity sensor value is at click level.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("proximity_clicked")
-        elif dev == "right":
-            return self.get_right("proximity_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get trackpad data ----------------
-    def get_trackpad_x(self, dev):  # Location
-        """
+    get_trackpad_x = _widget_getter("trackpad_x", """
         Returns the trackpad x-axis position for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1010,16 +1114,9 @@ class EteeController:
                 Range: 0-255. If not touched, the value is 126.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("trackpad_x")
-        elif dev == "right":
-            return self.get_right("trackpad_x")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_trackpad_y(self, dev):
-        """
+    get_trackpad_y = _widget_getter("trackpad_y", """
         Returns the trackpad y-axis position for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1027,13 +1124,7 @@ class EteeController:
                 Range: 0-255. If not touched, the value is 126.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("trackpad_y")
-        elif dev == "right":
-            return self.get_right("trackpad_y")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     def get_trackpad_xy(self, dev):
         """
@@ -1045,17 +1136,9 @@ class EteeController:
         :rtype: list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left" or "right":
-            xy = [self.get_data(dev, "trackpad_x"), self.get_data(dev, "trackpad_y")]
-            if None in xy:
-                return None
-            else:
-                return xy
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        return self.get_values(dev, ("trackpad_x", "trackpad_y"))
 
-    def get_trackpad_pull(self, dev):   # Pressure
-        """
+    get_trackpad_pull = _widget_getter("trackpad_pull", """
         Returns the trackpad pull pressure value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1063,16 +1146,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("trackpad_pull")
-        elif dev == "right":
-            return self.get_right("trackpad_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_trackpad_force(self, dev):
-        """
+    get_trackpad_force = _widget_getter("trackpad_force", """
         Returns the trackpad force pressure value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1080,49 +1156,28 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("trackpad_force")
-        elif dev == "right":
-            return self.get_right("trackpad_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_trackpad_touched(self, dev):
-        """
+    get_trackpad_touched = _widget_getter("trackpad_touched", """
         Returns the trackpad touch value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected trackpad is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("trackpad_touched")
-        elif dev == "right":
-            return self.get_right("trackpad_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_trackpad_clicked(self, dev):
-        """
+    get_trackpad_clicked = _widget_getter("trackpad_clicked", """
         Returns the trackpad click value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected trackpad is clicked.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("trackpad_clicked")
-        elif dev == "right":
-            return self.get_right("trackpad_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get slider data ----------------
-    def get_slider_value(self, dev):  # Location in Y-axis
-        """
+    get_slider_value = _widget_getter("slider_value", """
         Returns the slider positional value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1130,65 +1185,37 @@ class EteeController:
                 Range: 0-126. If not touched, the slider value is 126.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("slider_value")
-        elif dev == "right":
-            return self.get_right("slider_value")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_slider_touched(self, dev):  # Touch
-        """
+    get_slider_touched = _widget_getter("slider_touched", """
         Returns the slider touch value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected LED light is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("slider_touched")
-        elif dev == "right":
-            return self.get_right("slider_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_slider_up_button(self, dev):  # Slider Up/Down Button
-        """
+    get_slider_up_button = _widget_getter("slider_up_touched", """
         Returns the slider UP button value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the upper part of selected LED is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("slider_up_touched")
-        elif dev == "right":
-            return self.get_right("slider_up_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_slider_down_button(self, dev):
-        """
+    get_slider_down_button = _widget_getter("slider_down_touched", """
         Returns the slider DOWN button value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the lower part of selected LED is touched.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("slider_down_touched")
-        elif dev == "right":
-            return self.get_right("slider_down_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get grip gesture data ----------------
-    def get_grip_pull(self, dev):
-        """
+    get_grip_pull = _widget_getter("grip_pull", """
         Returns the grip gesture's pull pressure value for the selected controller.
         If the gesture is not performed, the pull value will be 0.
 
@@ -1197,16 +1224,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("grip_pull")
-        elif dev == "right":
-            return self.get_right("grip_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_grip_force(self, dev):
-        """
+    get_grip_force = _widget_getter("grip_force", """
         Returns the grip gesture's force pressure value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1214,49 +1234,28 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("grip_force")
-        elif dev == "right":
-            return self.get_right("grip_force")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_grip_touched(self, dev):
-        """
+    get_grip_touched = _widget_getter("grip_touched", """
         Returns the grip gesture's touch value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the grip gesture reaches touch level in the selected controller.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("grip_touched")
-        elif dev == "right":
-            return self.get_right("grip_touched")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_grip_clicked(self, dev):
-        """
+    get_grip_clicked = _widget_getter("grip_clicked", """
         Returns the grip gesture's click value for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the grip gesture reaches click level in the selected controller.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("grip_clicked")
-        elif dev == "right":
-            return self.get_right("grip_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get standard pinch (using trackpad) gesture data ----------------
-    def get_pinch_trackpad_pull(self, dev):
-        """
+    get_pinch_trackpad_pull = _widget_getter("pinch_trackpad_pull", """
         Returns the pull pressure value for the pinch with trackpad gesture in the selected controller.
         If the gesture is not performed, the pull value will be 0.
 
@@ -1265,33 +1264,19 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinch_trackpad_pull")
-        elif dev == "right":
-            return self.get_right("pinch_trackpad_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_pinch_trackpad_clicked(self, dev):
-        """
+    get_pinch_trackpad_clicked = _widget_getter("pinch_trackpad_clicked", """
         Returns the click value for the pinch with trackpad gesture in the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the pinch gesture (trackpad variation) reaches click level in the selected controller.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinch_trackpad_clicked")
-        elif dev == "right":
-            return self.get_right("pinch_trackpad_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get alternative pinch (using thumb finger) gesture data ----------------
-    def get_pinch_thumbfinger_pull(self, dev):
-        """
+    get_pinch_thumbfinger_pull = _widget_getter("pinch_thumbfinger_pull", """
         Returns the pull pressure value for the pinch with thumb finger gesture in the selected controller.
         If the gesture is not performed, the pull value will be 0.
 
@@ -1300,16 +1285,9 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinch_thumbfinger_pull")
-        elif dev == "right":
-            return self.get_right("pinch_thumbfinger_pull")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_pinch_thumbfinger_clicked(self, dev):
-        """
+    get_pinch_thumbfinger_clicked = _widget_getter("pinch_thumbfinger_clicked", """
         Returns the click value for the pinch with thumb finger gesture in the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1317,17 +1295,10 @@ class EteeController:
                 Range: 0-126. Base value: 0.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("pinch_thumbfinger_clicked")
-        elif dev == "right":
-            return self.get_right("pinch_thumbfinger_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get independent point (trackpad can be used) gesture data ----------------
-    def get_point_independent_clicked(self, dev):
-        """
+    get_point_independent_clicked = _widget_getter("point_independent_clicked", """
         This is the main point gesture used in VR and XBOX-controller based games.
 
         Returns the click value for the independent point (trackpad can be touched) gesture in the selected controller.
@@ -1336,17 +1307,10 @@ class EteeController:
         :return: True if the independent point gesture variation is detected in the selected controller. In this variation, the trackpad can be used alongside the point gesture.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("point_independent_clicked")
-        elif dev == "right":
-            return self.get_right("point_independent_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get exclude-trackpad point (trackpad must not be touched) gesture data ----------------
-    def get_point_excl_tp_clicked(self, dev):
-        """
+    get_point_excl_tp_clicked = _widget_getter("point_exclude_trackpad_clicked", """
         This is the alternative point gesture.
 
         Returns the click value for the exclude-trackpad point (trackpad must not be touched) gesture in the selected controller.
@@ -1356,13 +1320,7 @@ class EteeController:
         :return: True if the exclude-trackpad point gesture variation (i.e. where the trackpad is not touched) is detected in the selected controller.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("point_exclude_trackpad_clicked")
-        elif dev == "right":
-            return self.get_right("point_exclude_trackpad_clicked")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get IMU and quaternions ----------------
     def get_quaternion(self, dev):
@@ -1374,12 +1332,9 @@ class EteeController:
         :rtype: list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left":
+        if _hand_index(dev) == Hand.LEFT:
             return self._quaternion_left
-        elif dev == "right":
-            return self._quaternion_right
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        return self._quaternion_right
 
     def get_euler(self, dev):
         """
@@ -1390,12 +1345,9 @@ class EteeController:
         :rtype: list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left":
-            return self._euler_left
-        elif dev == "right":
-            return self._euler_right
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        if _hand_index(dev) == Hand.LEFT:
+            return self._ahrs_left.euler if self._quaternion_left is not None else None
+        return self._ahrs_right.euler if self._quaternion_right is not None else None
 
     def get_accel(self, dev):
         """
@@ -1406,14 +1358,7 @@ class EteeController:
         :rtype: list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left" or "right":
-            accel = [self.get_data(dev, "accel_x"), self.get_data(dev, "accel_y"), self.get_data(dev, "accel_z")]
-            if None in accel:
-                return None
-            else:
-                return accel
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        return self.get_values(dev, ("accel_x", "accel_y", "accel_z"))
 
     def get_gyro(self, dev):
         """
@@ -1424,14 +1369,7 @@ class EteeController:
         :rtype: list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left" or "right":
-            gyro = [self.get_data(dev, "gyro_x"), self.get_data(dev, "gyro_y"), self.get_data(dev, "gyro_z")]
-            if None in gyro:
-                return None
-            else:
-                return gyro
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        return self.get_values(dev, ("gyro_x", "gyro_y", "gyro_z"))
 
     def get_mag(self, dev):
         """
@@ -1442,18 +1380,10 @@ class EteeController:
         :rtype: list[int]
         :raises ValueError: if the dev input is not "left" or "right"
         """
-        if dev == "left" or "right":
-            mag = [self.get_data(dev, "mag_x"), self.get_data(dev, "mag_y"), self.get_data(dev, "mag_z")]
-            if None in mag:
-                return None
-            else:
-                return mag
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        return self.get_values(dev, ("mag_x", "mag_y", "mag_z"))
 
     # ---------------- Get battery data ----------------
-    def get_battery_level(self, dev):
-        """
+    get_battery_level = _widget_getter("battery_level", """
         Returns the battery level for the selected controller.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
@@ -1461,59 +1391,32 @@ class EteeController:
                 Range: 0-100.
         :rtype: int
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("battery_level")
-        elif dev == "right":
-            return self.get_right("battery_level")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_charging_in_progress_status(self, dev):
-        """
+    get_charging_in_progress_status = _widget_getter("battery_charging", """
         Checks if the selected controller is charging.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected battery is charging.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("battery_charging")
-        elif dev == "right":
-            return self.get_right("battery_charging")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
-    def get_charging_complete_status(self, dev):
-        """
+    get_charging_complete_status = _widget_getter("battery_charging_complete", """
         Checks if the selected controller has finished charging (battery level is 100%).
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected battery charging has been completed.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("battery_charging_complete")
-        elif dev == "right":
-            return self.get_right("battery_charging_complete")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
 
     # ---------------- Get system/power button data ----------------
-    def get_system_button_pressed(self, dev):
-        """
+    get_system_button_pressed = _widget_getter("system_button", """
         Checks if the system button is pressed.
 
         :param str dev: Selected device hand. Possible values: "left", "right".
         :return: True if the selected system button is pressed.
         :rtype: bool
         :raises ValueError: if the dev input is not "left" or "right"
-        """
-        if dev == "left":
-            return self.get_left("system_button")
-        elif dev == "right":
-            return self.get_right("system_button")
-        else:
-            raise ValueError("Input must be: 'left' or 'right'")
+        """)
@@ -0,0 +1,155 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+asyncio variant of the eteeController driver.
+Data is read from the etee dongle in the asyncio event loop, and commands to the dongle and controllers are awaitable.
+
+"""
+
+import asyncio
+
+from .tangio_for_etee import AsyncTG0Driver
+from .driver_eteecontroller import EteeController
+
+
+class AsyncEteeController(EteeController):
+    """
+    This class manages the communication between the driver and the eteeControllers from an asyncio event loop.
+    Data frames are read as soon as they are available and update the internal buffer, events and getter methods in the
+    same way as for EteeController. Commands sent to the dongle and controllers are coroutines, and data keeps being
+    read while their responses are awaited.
+
+    The serial port is watched by the event loop, which is only supported for POSIX serial ports.
+    """
+    DRIVER_CLASS = AsyncTG0Driver
+
+    def run(self):
+        """
+        Starts reading data from the etee dongle in the running event loop. Must be called from a coroutine.
+        """
+        self.driver.run()
+
+    async def frames(self):
+        """
+        Asynchronous iterator over the data frames received from the etee dongle. Each frame is yielded after the
+        internal buffer, quaternions and events have been updated with it.
+
+        :return: asynchronous iterator of (frame number, parsed data) tuples.
+        """
+        async for frame in self.driver.frames():
+            yield frame
+
+    async def send_command(self, command, *args, **kwargs):
+        """
+        Sends a command to the etee dongle and awaits the response.
+
+        :param bytes command: Command to be sent.
+        :return: Read response.
+        """
+        return await self.driver.send_command(command, *args, **kwargs)
+
+    async def start_data(self):
+        """
+        Sends command to the etee controller to start the data stream.
+        """
+        await self.driver.send_command(b"BP+AG\r\n")
+
+    async def stop_data(self):
+        """
+        Sends command to the etee controller to stop the data stream.
+        """
+        await self.driver.send_command(b"BP+AS\r\n")
+
+    async def update_gyro_offset_left(self):
+        """
+        Retrieves the gyroscope calibration parameters saved on the left etee controller, and updates the calibration
+        offsets in the driver model.
+        """
+        offset = self._parse_imu_offset(await self.driver.send_command(b"BL+gf\r\n"))
+        if offset is not None:
+            self._ahrs_left.set_gyro_offset(offset)
+
+    async def update_gyro_offset_right(self):
+        """
+        Retrieves the gyroscope calibration parameters saved on the right etee controller, and updates the calibration
+        offsets in the driver model.
+        """
+        offset = self._parse_imu_offset(await self.driver.send_command(b"BR+gf\r\n"))
+        if offset is not None:
+            self._ahrs_right.set_gyro_offset(offset)
+
+    async def update_mag_offset_left(self):
+        """
+        Retrieves the magnetometer calibration parameters saved on the left etee controller, and updates the
+        calibration offsets in the driver model.
+        """
+        offset = self._parse_imu_offset(await self.driver.send_command(b"BL+mf\r\n"))
+        if offset is not None:
+            self._ahrs_left.set_mag_offset(offset)
+
+    async def update_mag_offset_right(self):
+        """
+        Retrieves the magnetometer calibration parameters saved on the right etee controller, and updates the
+        calibration offsets in the driver model.
+        """
+        offset = self._parse_imu_offset(await self.driver.send_command(b"BR+mf\r\n"))
+        if offset is not None:
+            self._ahrs_right.set_mag_offset(offset)
+
+    async def update_imu_offsets(self, timeout=2, settle_time=2):
+        """
+        Retrieves the gyroscope and magnetometer calibration parameters from both controllers, and updates the
+        calibration offsets in the driver model. The two calibration queries of each controller are sent at once and
+        their responses are awaited concurrently. The controllers are queried one after the other, so that a controller
+        which does not answer only makes its own queries time out.
+
+        :param float timeout: Time to wait for the calibration responses of each controller, in seconds.
+        :param float settle_time: Time to wait before sending the queries, in seconds, as the controllers do not
+                                answer them right after connecting.
+        :return: Calibration commands which timed out or whose response could not be parsed.
+        :rtype: list[str]
+        """
+        print("Updating gyro and magnetometer offsets. Please, wait...")
+        await asyncio.sleep(settle_time)
+        results = []
+        for commands in self._IMU_OFFSET_COMMANDS:
+            results.append(await self.driver.send_commands(commands, timeout=timeout))
+        return self._apply_imu_offsets(results)
+
+    async def get_dongle_version(self):
+        """
+        Retrieve the firmware version of the connected dongle.
+
+        :return: Returns the dongle firmware version if a dongle is connected.
+                If no dongle is connected, the firmware version value will be None.
+        :rtype: str
+        """
+        return self._parse_dongle_version(await self.driver.send_command(b"AT+AB\r\n"))
+
+    async def get_etee_versions(self):
+        """
+        Retrieve the firmware version from the connected controllers.
+
+        :return: Returns the firmware versions of the connected controllers.
+                If a controller is not connected, its firmware version value will be None.
+        :rtype: list[str]
+        """
+        response = await self.driver.send_command(b"BP+AB\r\n", response_keys=[b"R:AB=etee", b"L:AB=etee"])
+        return self._parse_etee_versions(response)
@@ -0,0 +1,285 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Software eteeDongle that streams recorded or synthetic data through the serial interface used by the driver, so that
+the driver can be run and benchmarked without hardware.
+
+"""
+
+from builtins import object
+import math
+import struct
+import threading
+import time
+
+import serial
+
+DATA_BYTES = 42
+END_BYTES = b"\xff\xff"
+DEFAULT_RATE = 97
+DEFAULT_MAX_BUFFER = 65536
+SYNTHETIC_GRAVITY = 8192
+STREAM_BLOCK_FRAMES = 4096
+
+
+def session_stream(reader, end_bytes=END_BYTES):
+    """
+    Returns the data frames and text lines of a recorded session in the order they were received, as they are sent
+    by the dongle.
+
+    :param SessionReader reader: recorded session.
+    :param bytes end_bytes: data packet delimiter appended to each data frame.
+    :return: generator of (timestamp, bytes) tuples.
+    """
+    lines = reader.lines()
+    line_index = 0
+    timestamps = None
+    for index in range(len(reader)):
+        # Timestamps are read from the session file in blocks, as they are needed
+        if index % STREAM_BLOCK_FRAMES == 0:
+            timestamps = reader.get_timestamps(index, index + STREAM_BLOCK_FRAMES)
+        timestamp = float(timestamps[index % STREAM_BLOCK_FRAMES])
+        while line_index < len(lines) and lines[line_index][0] <= timestamp:
+            yield lines[line_index]
+            line_index += 1
+        yield timestamp, bytes(reader.frame(index)) + end_bytes
+    for line in lines[line_index:]:
+        yield line
+
+
+def synthetic_stream(rate=DEFAULT_RATE, hands=(0, 1), count=None, end_bytes=END_BYTES):
+    """
+    Returns synthetic eteeController data, starting with the connection message of each controller. Each frame has
+    the hand bit set, gravity on the accelerometer Z axis, and finger and trackpad values that sweep over their
+    range, so that every frame is different.
+
+    :param float rate: data frames per second sent by each controller.
+    :param tuple[int] hands: hands of the connected controllers, 0 for left and 1 for right.
+    :param int count: number of data frames, after which the disconnection message of each controller is sent.
+                    If None, frames are generated indefinitely.
+    :param bytes end_bytes: data packet delimiter appended to each data frame.
+    :return: generator of (timestamp, bytes) tuples.
+    """
+    for hand in hands:
+        yield 0.0, b"L connection complete\r\n" if hand == 0 else b"R connection complete\r\n"
+    period = 1 / (rate * len(hands))
+    frame = bytearray(DATA_BYTES)
+    i = 0
+    while count is None or i < count:
+        hand = hands[i % len(hands)]
+        step = i // len(hands)
+        value = step % 127
+        frame[2] = value << 1                                     # index_pull
+        frame[6] = step % 256                                     # trackpad_x
+        frame[11] = (frame[11] & ~0b1000) | (hand << 3)           # hand
+        struct.pack_into("<h", frame, 27, SYNTHETIC_GRAVITY)      # accel_z
+        struct.pack_into("<h", frame, 35, int(100 * math.sin(step / 50)))  # gyro_x
+        yield i * period, bytes(frame) + end_bytes
+        i += 1
+    for hand in hands:
+        yield i * period, b"L disconnected\r\n" if hand == 0 else b"R disconnected\r\n"
+
+
+class FakeDongle(object):
+    """
+    This class implements the subset of the serial.Serial interface used by the driver, and behaves like an
+    eteeDongle: it streams data once the data stream is started with the BP+AG command, and answers the stream,
+    firmware version and IMU calibration commands.
+
+    The data is taken from a stream of (timestamp, bytes) tuples, such as session_stream() for a recorded session or
+    synthetic_stream(). It is sent at the pace given by its timestamps multiplied by a speed factor, or as fast as the
+    driver reads it.
+
+    The dongle is connected by passing it as the port to the connect methods of the drivers and EteeController.
+    """
+
+    def __init__(self, stream=None, speed=1.0, timeout=1, max_buffer=DEFAULT_MAX_BUFFER, port="fake"):
+        """
+        Initializes the FakeDongle class with the given parameters.
+
+        :param stream: iterable of (timestamp, bytes) tuples to be sent. If None, synthetic_stream() is used.
+        :param float speed: playback speed factor, 1 for real time. If None, data is sent as fast as it is read.
+        :param float timeout: read timeout in seconds. If None, reads wait until data is available.
+        :param int max_buffer: number of bytes after which sending waits for the driver to read.
+        :param str port: port name reported to the driver.
+        """
+        self.stream = synthetic_stream() if stream is None else stream
+        self.speed = speed
+        self.timeout = timeout
+        self.write_timeout = None
+        self.max_buffer = max_buffer
+        self.port = port
+        self.is_open = True
+        self.streaming = False
+        self.finished = False
+        self.connected_hands = {b"L", b"R"}
+        """Controllers that answer commands. Commands addressed to other controllers are not answered."""
+        self.versions = {b"L": b"etee-1.0.0", b"R": b"etee-1.0.0"}
+        self.dongle_version = b"NRF1.0.0"
+        self.gyro_offsets = {b"L": (0.0, 0.0, 0.0), b"R": (0.0, 0.0, 0.0)}
+        self.mag_offsets = {b"L": (0.0, 0.0, 0.0), b"R": (0.0, 0.0, 0.0)}
+        self.thread = None
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+        self._command_buffer = bytearray()
+
+    @property
+    def in_waiting(self):
+        """
+        Number of bytes waiting to be read.
+        """
+        return len(self._buffer)
+
+    def read(self, size=1):
+        """
+        Reads up to size bytes, waiting up to the timeout for at least one byte.
+
+        :param int size: maximum number of bytes to be read.
+        :return: bytes read, empty if the timeout was reached.
+        """
+        with self._condition:
+            if not self.is_open:
+                raise serial.SerialException("Port is closed")
+            if not self._buffer and self.timeout != 0:
+                self._condition.wait_for(lambda: self._buffer or not self.is_open, self.timeout)
+            chunk = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self._condition.notify_all()
+        return chunk
+
+    def write(self, data):
+        """
+        Receives commands sent by the driver, and answers the complete command lines.
+
+        :param bytes data: bytes written.
+        :return: number of bytes written.
+        """
+        if not self.is_open:
+            raise serial.SerialException("Port is closed")
+        self._command_buffer += data
+        while b"\r\n" in self._command_buffer:
+            end = self._command_buffer.index(b"\r\n")
+            command = bytes(self._command_buffer[:end])
+            del self._command_buffer[:end + 2]
+            self._answer(command)
+        return len(data)
+
+    def reset_input_buffer(self):
+        """
+        Discards the bytes waiting to be read.
+        """
+        with self._condition:
+            self._buffer.clear()
+            self._condition.notify_all()
+
+    def flush(self):
+        """
+        Waits until all the bytes written are sent. Commands are answered as soon as they are written.
+        """
+        pass
+
+    def close(self):
+        """
+        Stops the data stream and closes the dongle.
+        """
+        with self._condition:
+            self.is_open = False
+            self.streaming = False
+            self._condition.notify_all()
+
+    def _answer(self, command):
+        """
+        Starts or stops the data stream, or sends the response to a command.
+
+        :param bytes command: command, without the '\\r\\n' end flag.
+        """
+        if command == b"BP+AG":
+            self._send(b"OK\r\nEND\r\n")
+            self._start_stream()
+        elif command == b"BP+AS":
+            self.streaming = False
+            self._send(b"OK\r\nEND\r\n")
+        elif command == b"BP+AB":
+            lines = [b"OK"] + [hand + b":AB=" + version for hand, version in sorted(self.versions.items())
+                               if hand in self.connected_hands] + [b"END"]
+            self._send(b"\r\n".join(lines) + b"\r\n")
+        elif command == b"AT+AB":
+            self._send(b"OK\r\n" + self.dongle_version + b"\r\nEND\r\n")
+        elif len(command) == 5 and command[:1] == b"B" and command[2:] in (b"+gf", b"+mf"):
+            if command[1:2] not in self.connected_hands:
+                return
+            offsets = self.gyro_offsets if command[2:] == b"+gf" else self.mag_offsets
+            x, y, z = offsets.get(command[1:2], (0.0, 0.0, 0.0))
+            self._send("OK\r\nX:{} Y:{} Z:{}\r\nEND\r\n".format(x, y, z).encode())
+        else:
+            self._send(b"ERROR\r\nEND\r\n")
+
+    def _send(self, data):
+        """
+        Makes bytes available to be read. Data frames and text lines are sent whole, so that responses are never
+        inserted inside a data frame.
+
+        :param bytes data: bytes to be read by the driver.
+        """
+        with self._condition:
+            self._buffer += data
+            self._condition.notify_all()
+
+    def _start_stream(self):
+        """
+        Launches the thread that sends the data stream, or resumes it if it was stopped.
+        """
+        self.streaming = True
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._loop)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _loop(self):
+        """
+        Method that sends the data stream at its pace, while the data stream is started.
+        """
+        start_time = None
+        first_timestamp = None
+        paused_time = None
+        for timestamp, data in self.stream:
+            while not self.streaming and self.is_open:
+                if paused_time is None:
+                    paused_time = time.monotonic()
+                time.sleep(0.01)
+            if not self.is_open:
+                return
+            if paused_time is not None:
+                # Resuming the stream continues from where it stopped, instead of catching up
+                if start_time is not None:
+                    start_time += time.monotonic() - paused_time
+                paused_time = None
+            if self.speed is not None:
+                if start_time is None:
+                    start_time = time.monotonic()
+                    first_timestamp = timestamp
+                delay = start_time + (timestamp - first_timestamp) / self.speed - time.monotonic()
+                if delay > 0.001:
+                    time.sleep(delay)
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._buffer) < self.max_buffer or not self.is_open)
+                self._buffer += data
+                self._condition.notify_all()
+        self.finished = True
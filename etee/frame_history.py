@@ -0,0 +1,154 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Fixed-capacity history of the data frames received from an eteeController.
+
+"""
+
+from operator import itemgetter
+
+import numpy as np
+
+from .tangio_for_etee import WidgetFrame
+
+
+class FrameHistory:
+    """
+    This class stores the last data frames received from a controller in preallocated NumPy columns: one per widget,
+    plus the quaternion, the receive timestamp and the frame number of each frame.
+
+    Every value is written twice, at its position in the ring buffer and one capacity further, so that the most recent
+    values are always contiguous in memory and can be returned as array views instead of copies.
+    """
+    def __init__(self, decoder, capacity):
+        """
+        Class constructor method.
+
+        :param WidgetDecoder decoder: decoder whose data structure defines the widget columns.
+        :param int capacity: maximum number of frames stored. Older frames are overwritten.
+        """
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive")
+        self.capacity = capacity
+        self.layout = decoder.layout
+        self.names = decoder.names
+        # Without byte list widgets, a dictionary frame maps to the layout order with a single itemgetter call
+        self._get_values = itemgetter(*self.names) if decoder.record_length == len(self.names) else None
+        self._dtype = np.dtype(decoder.record_typecode)
+        self._widgets = np.zeros((decoder.record_length, 2 * capacity), dtype=self._dtype)
+        self._quaternions = np.zeros((2 * capacity, 4))
+        self._timestamps = np.full(2 * capacity, np.nan)
+        self._framenos = np.zeros(2 * capacity, dtype=np.int64)
+        self._index = 0
+        self._count = 0
+
+    def __len__(self):
+        """
+        Returns the number of frames stored.
+
+        :return: number of frames stored, up to the capacity.
+        """
+        return self._count
+
+    def clear(self):
+        """
+        Removes all the stored frames.
+        """
+        self._index = 0
+        self._count = 0
+
+    def append(self, data, quaternion=None, timestamp=None, frameno=None):
+        """
+        Stores a data frame, overwriting the oldest frame if the history is full.
+
+        :param data: Dictionary or WidgetFrame of the parsed controller data.
+        :param Quaternion quaternion: Controller's quaternion computed from the frame.
+        :param float timestamp: Time at which the frame was received, in seconds from a monotonic clock.
+        :param int frameno: Controller's frame number.
+        """
+        if isinstance(data, WidgetFrame):
+            values = np.frombuffer(data.record, dtype=self._dtype)
+        else:
+            values = np.array(self._values_from_dict(data), dtype=self._dtype)
+        index = self._index
+        mirror = index + self.capacity
+        self._widgets[:, index] = values
+        self._widgets[:, mirror] = values
+        if quaternion is not None:
+            q = (quaternion.w, quaternion.x, quaternion.y, quaternion.z)
+            self._quaternions[index] = q
+            self._quaternions[mirror] = q
+        else:
+            self._quaternions[index] = np.nan
+            self._quaternions[mirror] = np.nan
+        self._timestamps[index] = self._timestamps[mirror] = np.nan if timestamp is None else timestamp
+        self._framenos[index] = self._framenos[mirror] = -1 if frameno is None else frameno
+        self._index = (index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def window(self, name, n=None):
+        """
+        Returns the last stored values of a widget, the quaternions, timestamps or frame numbers, from oldest to newest.
+        The returned array is a read-only view of the history, which is overwritten as new frames are stored, so it
+        must be copied to keep it.
+
+        :param str name: widget name as defined in the YAML file, "quaternion", "timestamp" or "frameno".
+        :param int n: number of values. If None or larger than the number of frames stored, all the stored values are
+                    returned.
+        :return: [n] array of values, or [n, 4] array for quaternions and [n, number of bytes] for byte list widgets.
+        :rtype: numpy.ndarray
+        :raises KeyError: if the name is not a widget or history column.
+        """
+        count = self._count if n is None else max(0, min(n, self._count))
+        # The newest value is at _index - 1 + capacity, so the last count values end there
+        end = self._index + self.capacity
+        start = end - count
+        if name == "quaternion":
+            view = self._quaternions[start:end]
+        elif name == "timestamp":
+            view = self._timestamps[start:end]
+        elif name == "frameno":
+            view = self._framenos[start:end]
+        else:
+            view = self._widgets[self.layout[name], start:end]
+            if view.ndim == 2:
+                view = view.T
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def _values_from_dict(self, data):
+        """
+        Returns the widget values of a dictionary frame, in layout order.
+
+        :param dict data: Dictionary of the parsed controller data.
+        :return: list of widget values.
+        """
+        if self._get_values is not None:
+            return self._get_values(data)
+        values = list()
+        for name in self.names:
+            value = data[name]
+            if isinstance(value, list):
+                values.extend(value)
+            else:
+                values.append(value)
+        return values
@@ -30,7 +30,11 @@ import math
 class Quaternion:
     """
     Class implementing basic quaternion arithmetics and euler angle estimations.
+
+    The quaternion values are stored as plain floats in the w, x, y and z attributes.
     """
+    __slots__ = ("w", "x", "y", "z")
+
     def __init__(self, w_or_q, x=None, y=None, z=None):
         """
         Initializes a Quaternion object.
@@ -41,19 +45,18 @@ class Quaternion:
         :param float y: The second imaginary part if w_or_q is a scalar.
         :param float z: The third imaginary part if w_or_q is a scalar.
         """
-        self._q = np.array([1, 0, 0, 0])
-
         if x is not None and y is not None and z is not None:
-            w = w_or_q
-            q = np.array([w, x, y, z])
+            self.w = float(w_or_q)
+            self.x = float(x)
+            self.y = float(y)
+            self.z = float(z)
         elif isinstance(w_or_q, Quaternion):
-            q = np.array(w_or_q.q)
+            self.w = w_or_q.w
+            self.x = w_or_q.x
+            self.y = w_or_q.y
+            self.z = w_or_q.z
         else:
-            q = np.array(w_or_q)
-            if len(q) != 4:
-                raise ValueError("Expecting a 4-element array or w x y z as parameters")
-
-        self._set_q(q)
+            self._set_q(w_or_q)
 
     # ---------------- Quaternion specific interfaces ----------------
     def conj(self):
@@ -62,7 +65,49 @@ class Quaternion:
 
         :return: conjugate of the quaternion
         """
-        return Quaternion(self._q[0], -self._q[1], -self._q[2], -self._q[3])
+        return Quaternion(self.w, -self.x, -self.y, -self.z)
+
+    def norm(self):
+        """
+        Returns the norm of the quaternion.
+
+        :return: norm of the quaternion
+        """
+        return math.sqrt(self.w * self.w + self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize_(self):
+        """
+        Normalizes the quaternion in place.
+
+        :return: this quaternion
+        """
+        n = math.sqrt(self.w * self.w + self.x * self.x + self.y * self.y + self.z * self.z)
+        self.w /= n
+        self.x /= n
+        self.y /= n
+        self.z /= n
+        return self
+
+    def imul(self, other):
+        """
+        Multiplies the quaternion in place with another quaternion (self = self * other) or a scalar.
+
+        :param other: Quaternion object or number.
+        :return: this quaternion
+        """
+        if isinstance(other, Quaternion):
+            aw, ax, ay, az = self.w, self.x, self.y, self.z
+            bw, bx, by, bz = other.w, other.x, other.y, other.z
+            self.w = aw*bw - ax*bx - ay*by - az*bz
+            self.x = aw*bx + ax*bw + ay*bz - az*by
+            self.y = aw*by - ax*bz + ay*bw + az*bx
+            self.z = aw*bz + ax*by - ay*bx + az*bw
+        else:
+            self.w *= other
+            self.x *= other
+            self.y *= other
+            self.z *= other
+        return self
 
     def to_angle_axis(self):
         """
@@ -73,15 +118,15 @@ class Quaternion:
         :return: rad, x, y, z --> where rad is the magnitude of rotation around the rotation axis, and x,y,z represent
                 the rotation axis' direction vector.
         """
-        if self[0] == 1 and self[1] == 0 and self[2] == 0 and self[3] == 0:
+        if self.w == 1 and self.x == 0 and self.y == 0 and self.z == 0:
             return 0, 1, 0, 0
-        rad = np.arccos(self[0]) * 2
-        imaginary_factor = np.sin(rad / 2)
+        rad = math.acos(max(-1.0, min(1.0, self.w))) * 2
+        imaginary_factor = math.sin(rad / 2)
         if abs(imaginary_factor) < 1e-8:
             return 0, 1, 0, 0
-        x = self._q[1] / imaginary_factor
-        y = self._q[2] / imaginary_factor
-        z = self._q[3] / imaginary_factor
+        x = self.x / imaginary_factor
+        y = self.y / imaginary_factor
+        z = self.z / imaginary_factor
         return rad, x, y, z
 
     @staticmethod
@@ -95,8 +140,8 @@ class Quaternion:
         :param float z: z-component of the rotation axis' direction vector.
         :return: quaternion
         """
-        s = np.sin(rad / 2)
-        return Quaternion(np.cos(rad / 2), x*s, y*s, z*s)
+        s = math.sin(rad / 2)
+        return Quaternion(math.cos(rad / 2), x*s, y*s, z*s)
 
     def to_euler(self):
         """
@@ -108,7 +153,7 @@ class Quaternion:
 
         :return: roll, pitch, yaw
         """
-        w, x, y, z = self._q[0], self._q[1], self._q[2], self._q[3]
+        w, x, y, z = self.w, self.x, self.y, self.z
 
         t0 = +2.0 * (w * x + y * z)
         t1 = +1.0 - 2.0 * (x * x + y * y)
@@ -134,15 +179,15 @@ class Quaternion:
         :return: Resultant Quaternion from the operation.
         """
         if isinstance(other, Quaternion):
-            w = self._q[0]*other._q[0] - self._q[1]*other._q[1] - self._q[2]*other._q[2] - self._q[3]*other._q[3]
-            x = self._q[0]*other._q[1] + self._q[1]*other._q[0] + self._q[2]*other._q[3] - self._q[3]*other._q[2]
-            y = self._q[0]*other._q[2] - self._q[1]*other._q[3] + self._q[2]*other._q[0] + self._q[3]*other._q[1]
-            z = self._q[0]*other._q[3] + self._q[1]*other._q[2] - self._q[2]*other._q[1] + self._q[3]*other._q[0]
-
-            return Quaternion(w, x, y, z)
+            aw, ax, ay, az = self.w, self.x, self.y, self.z
+            bw, bx, by, bz = other.w, other.x, other.y, other.z
+            return Quaternion(aw*bw - ax*bx - ay*by - az*bz,
+                              aw*bx + ax*bw + ay*bz - az*by,
+                              aw*by - ax*bz + ay*bw + az*bx,
+                              aw*bz + ax*by - ay*bx + az*bw)
         elif isinstance(other, numbers.Number):
-            q = self._q * other
-            return Quaternion(q)
+            return Quaternion(self.w * other, self.x * other, self.y * other, self.z * other)
+        return NotImplemented
 
     def __add__(self, other):
         """
@@ -154,28 +199,30 @@ class Quaternion:
         if not isinstance(other, Quaternion):
             if len(other) != 4:
                 raise TypeError("Quaternions must be added to other quaternions or a 4-element array")
-            q = self.q + other
-        else:
-            q = self.q + other.q
-
-        return Quaternion(q)
+            return Quaternion(self.w + other[0], self.x + other[1], self.y + other[2], self.z + other[3])
+        return Quaternion(self.w + other.w, self.x + other.x, self.y + other.y, self.z + other.z)
 
     # ---------------- Implementing other interfaces to ease working with the class ----------------
     def _set_q(self, q):
         """
         Set quaternion values.
 
-        :param q: New quaternion value, in ndarray format.
+        :param q: New quaternion value, as a four-element array.
         """
-        self._q = q
+        if len(q) != 4:
+            raise ValueError("Expecting a 4-element array or w x y z as parameters")
+        self.w = float(q[0])
+        self.x = float(q[1])
+        self.y = float(q[2])
+        self.z = float(q[3])
 
     def _get_q(self):
         """
         Return the current quaternion
 
-        :return: current quaternion
+        :return: current quaternion, in ndarray format
         """
-        return self._q
+        return np.array([self.w, self.x, self.y, self.z])
 
     q = property(_get_q, _set_q)
 
@@ -186,15 +233,31 @@ class Quaternion:
         :param item: key for quaternion item to be retrieved
         :return: quaternion item value
         """
-        return self._q[item]
+        if item == 0:
+            return self.w
+        elif item == 1:
+            return self.x
+        elif item == 2:
+            return self.y
+        elif item == 3:
+            return self.z
+        return self._get_q()[item]
+
+    def __len__(self):
+        """
+        Return the number of quaternion components.
+
+        :return: 4
+        """
+        return 4
 
-    def __array__(self):
+    def __array__(self, dtype=None, copy=None):
         """
-        Return a copy of the quaternion ndarray.
+        Return the quaternion as a new ndarray.
 
         :return: quaternion
         """
-        return self._q
+        return np.array([self.w, self.x, self.y, self.z], dtype=dtype)
 
     def tolist(self):
         """
@@ -202,5 +265,229 @@ class Quaternion:
 
         :return: quaternion as list
         """
-        return self._q.tolist()
+        return [self.w, self.x, self.y, self.z]
+
+
+class QuaternionArray:
+    """
+    Class implementing quaternion arithmetics and euler angle estimations for N quaternions at once, e.g. for the
+    orientation stream of a recorded session. The quaternion values are stored in an [N, 4] ndarray with (w, x, y, z)
+    columns, and all the operations are vectorized.
+    """
+    def __init__(self, q):
+        """
+        Initializes a QuaternionArray object.
+
+        :param q: [N, 4] array containing the quaternion values, or a list of Quaternion objects.
+        """
+        q = np.array(q, dtype=float)
+        if q.ndim == 1 and len(q) == 0:
+            q = q.reshape(0, 4)
+        if q.ndim != 2 or q.shape[1] != 4:
+            raise ValueError("Expecting a [N, 4] array or a list of quaternions")
+        self.q = q
+
+    # ---------------- Quaternion specific interfaces ----------------
+    def conj(self):
+        """
+        Returns the conjugates of the quaternions.
+
+        :return: conjugates of the quaternions
+        """
+        return QuaternionArray(self.q * np.array([1.0, -1.0, -1.0, -1.0]))
 
+    def norm(self):
+        """
+        Returns the norms of the quaternions.
+
+        :return: [N] array of norms
+        """
+        return np.sqrt(np.einsum("ij,ij->i", self.q, self.q))
+
+    def normalize(self):
+        """
+        Returns the normalized quaternions.
+
+        :return: normalized quaternions
+        """
+        return QuaternionArray(self.q / self.norm()[:, None])
+
+    def to_angle_axis(self):
+        """
+        Returns the quaternions' 3D rotations in an axis-angle representation.
+
+        For identity quaternions (1, 0, 0, 0), a rotation along the x-axis with angle 0 is returned.
+
+        :return: [N] array of magnitudes of rotation around the rotation axes, in radians, and [N, 3] array of the
+                rotation axes' direction vectors.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        rad = np.arccos(np.clip(self.q[:, 0], -1.0, 1.0)) * 2
+        imaginary_factor = np.sin(rad / 2)
+        identity = np.abs(imaginary_factor) < 1e-8
+        axis = np.empty((len(self.q), 3))
+        axis[~identity] = self.q[~identity, 1:] / imaginary_factor[~identity, None]
+        axis[identity] = (1, 0, 0)
+        rad[identity] = 0
+        return rad, axis
+
+    @staticmethod
+    def from_angle_axis(rad, axis):
+        """
+        Returns the quaternions given their axis-angle representations.
+
+        :param rad: [N] array of magnitudes of rotation about the rotation axes, in radians.
+        :param axis: [N, 3] array of the rotation axes' direction vectors.
+        :return: quaternions
+        """
+        rad = np.asarray(rad, dtype=float)
+        axis = np.asarray(axis, dtype=float)
+        q = np.empty((len(rad), 4))
+        q[:, 0] = np.cos(rad / 2)
+        q[:, 1:] = axis * np.sin(rad / 2)[:, None]
+        return QuaternionArray(q)
+
+    def to_euler(self):
+        """
+        Convert the quaternions into euler angles (roll, pitch, yaw), in the same way as Quaternion.to_euler().
+
+        :return: [N, 3] array of roll, pitch and yaw, in radians.
+        """
+        w, x, y, z = self.q[:, 0], self.q[:, 1], self.q[:, 2], self.q[:, 3]
+        euler = np.empty((len(self.q), 3))
+        euler[:, 0] = np.arctan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+        euler[:, 1] = np.arcsin(np.clip(2.0 * (w * y - z * x), -1.0, 1.0)) * 2
+        euler[:, 2] = np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+        return euler
+
+    def slerp(self, other, t):
+        """
+        Spherical linear interpolation between these unit quaternions and other unit quaternions, along the shortest
+        path.
+
+        :param other: QuaternionArray, Quaternion or [N, 4] array to interpolate to.
+        :param t: interpolation factor between 0 and 1, either a float or a [N] array.
+        :return: interpolated quaternions
+        """
+        q0 = self.q
+        q1 = _as_quaternion_values(other)
+        t = np.asarray(t, dtype=float)
+        if t.ndim == 1:
+            t = t[:, None]
+        dot = np.sum(q0 * q1, axis=1)
+        q1 = np.where(dot[:, None] < 0, -q1, q1)
+        dot = np.abs(dot)[:, None]
+        theta = np.arccos(np.clip(dot, -1.0, 1.0))
+        sin_theta = np.sin(theta)
+        # Nearly parallel quaternions are interpolated linearly to avoid dividing by a small sine
+        linear = sin_theta < 1e-6
+        sin_theta[linear] = 1
+        w0 = np.where(linear, 1 - t, np.sin((1 - t) * theta) / sin_theta)
+        w1 = np.where(linear, t, np.sin(t * theta) / sin_theta)
+        return QuaternionArray(w0 * q0 + w1 * q1).normalize()
+
+    def rotate(self, vectors):
+        """
+        Rotates 3D vectors by these unit quaternions.
+
+        :param vectors: [N, 3] array of vectors, or a single three-element vector rotated by every quaternion.
+        :return: [N, 3] array of rotated vectors
+        :rtype: numpy.ndarray
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        w = self.q[:, :1]
+        u = self.q[:, 1:]
+        uv = np.cross(u, vectors)
+        return vectors + 2 * (w * uv + np.cross(u, uv))
+
+    # ---------------- Quaternion operations ----------------
+    def __mul__(self, other):
+        """
+        Multiply the quaternions with other quaternions, a single quaternion or a scalar.
+
+        :param other: QuaternionArray, Quaternion, [N, 4] array or number.
+        :return: Resultant QuaternionArray from the operation.
+        """
+        if isinstance(other, numbers.Number):
+            return QuaternionArray(self.q * other)
+        return QuaternionArray(_multiply(self.q, _as_quaternion_values(other)))
+
+    def __rmul__(self, other):
+        """
+        Multiply a single quaternion or a scalar with the quaternions.
+
+        :param other: Quaternion, [N, 4] array or number.
+        :return: Resultant QuaternionArray from the operation.
+        """
+        if isinstance(other, numbers.Number):
+            return QuaternionArray(self.q * other)
+        return QuaternionArray(_multiply(_as_quaternion_values(other), self.q))
+
+    # ---------------- Implementing other interfaces to ease working with the class ----------------
+    def __len__(self):
+        """
+        Return the number of quaternions.
+
+        :return: number of quaternions
+        """
+        return len(self.q)
+
+    def __getitem__(self, item):
+        """
+        Return the specified quaternions.
+
+        :param item: index, slice or index array of the quaternions to be retrieved
+        :return: Quaternion for an index, or QuaternionArray otherwise
+        """
+        if isinstance(item, numbers.Integral):
+            return Quaternion(self.q[item])
+        return QuaternionArray(self.q[item])
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Return the [N, 4] quaternion ndarray.
+
+        :return: quaternions
+        """
+        if dtype is None:
+            return self.q
+        return self.q.astype(dtype)
+
+    def tolist(self):
+        """
+        Convert and return quaternions as a list of [w, x, y, z] lists.
+
+        :return: quaternions as list
+        """
+        return self.q.tolist()
+
+
+def _as_quaternion_values(other):
+    """
+    Return the quaternion values of a quaternion operand.
+
+    :param other: QuaternionArray, Quaternion or array of quaternion values.
+    :return: [N, 4] or [1, 4] ndarray
+    """
+    if isinstance(other, QuaternionArray):
+        return other.q
+    if isinstance(other, Quaternion):
+        return np.array([[other.w, other.x, other.y, other.z]])
+    other = np.asarray(other, dtype=float)
+    return other.reshape(-1, 4)
+
+
+def _multiply(a, b):
+    """
+    Multiply quaternion values row by row.
+
+    :param a: [N, 4] or [1, 4] ndarray.
+    :param b: [N, 4] or [1, 4] ndarray.
+    :return: [N, 4] ndarray
+    """
+    aw, ax, ay, az = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    bw, bx, by, bz = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack((aw*bw - ax*bx - ay*by - az*bz,
+                     aw*bx + ax*bw + ay*bz - az*by,
+                     aw*by - ax*bz + ay*bw + az*bx,
+                     aw*bz + ax*by - ay*bx + az*bw), axis=1)
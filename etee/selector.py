@@ -0,0 +1,248 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Precompiled selection of eteeController data fields, read for both controllers at once.
+
+"""
+
+from operator import itemgetter
+
+import numpy as np
+import yaml
+
+from .tangio_for_etee import WidgetDecoder
+from .driver_eteecontroller import ETEE_CONTROLLER_DATA_CONFIG, Hand
+
+HAND_NAMES = ("left", "right")
+_HANDS = tuple(zip(Hand, HAND_NAMES))
+VECTOR_FIELDS = {
+    "accel": ("accel_x", "accel_y", "accel_z"),
+    "gyro": ("gyro_x", "gyro_y", "gyro_z"),
+    "mag": ("mag_x", "mag_y", "mag_z"),
+    "trackpad_xy": ("trackpad_x", "trackpad_y"),
+}
+ORIENTATION_FIELDS = {
+    "quaternion": ("w", "x", "y", "z"),
+    "euler": ("roll", "pitch", "yaw"),
+}
+
+_decoders = dict()
+
+
+def select(fields, config_file=ETEE_CONTROLLER_DATA_CONFIG, aliases=None):
+    """
+    Creates a selector for the given eteeController data fields.
+
+    :param list[str] fields: Field names. See Selector for the possible values.
+    :param str config_file: path to the file which contains the data structure definition.
+    :param dict aliases: Field read for each name in fields which is not a field itself, such as the output names
+                        used by existing applications. The values are returned under the names given in fields.
+    :return: Selector for the fields.
+    :rtype: Selector
+    :raises ValueError: if a field is not a widget or a derived field.
+    """
+    return Selector(fields, config_file, aliases)
+
+
+def _get_decoder(config_file):
+    """
+    Returns the decoder of a data structure definition file, which is only compiled the first time it is requested.
+
+    :param str config_file: path to the file which contains the data structure definition.
+    :return: decoder of the data structure.
+    :rtype: WidgetDecoder
+    """
+    decoder = _decoders.get(config_file)
+    if decoder is None:
+        with open(config_file, 'r') as fstream:
+            conf_dict = yaml.safe_load(fstream)
+        decoder = WidgetDecoder(conf_dict["widgets"])
+        _decoders[config_file] = decoder
+    return decoder
+
+
+class Selector:
+    """
+    This class reads a fixed set of data fields from both eteeControllers. The field names are resolved once, when the
+    selector is created, so that each read is a single lookup of all the widget values of a controller's latest frame.
+
+    The fields can be widget names as defined in the YAML file, "accel", "gyro", "mag" and "trackpad_xy" for the
+    widget vectors returned by the corresponding getters, and "quaternion" and "euler" for the controller orientation.
+    Other names can be mapped to these fields with aliases, in which case the values are returned under those names.
+
+    The values are written into output structures created with the selector and reused by every read: a dictionary of
+    values per hand, or a NumPy array with one row per hand.
+    """
+    def __init__(self, fields, config_file=ETEE_CONTROLLER_DATA_CONFIG, aliases=None):
+        """
+        Class constructor method.
+
+        :param list[str] fields: Field names.
+        :param str config_file: path to the file which contains the data structure definition.
+        :param dict aliases: Field read for each name in fields which is not a field itself. The values are returned
+                            under the names given in fields.
+        :raises ValueError: if a field is not a widget or a derived field.
+        """
+        layout = _get_decoder(config_file).layout
+        aliases = dict() if aliases is None else aliases
+        self.fields = list(fields)
+        scalars = list()
+        vectors = list()
+        orientations = list()
+        for name in self.fields:
+            field = aliases.get(name, name)
+            if field in ORIENTATION_FIELDS:
+                orientations.append((name, field))
+            elif field in VECTOR_FIELDS:
+                vectors.append((name, field, VECTOR_FIELDS[field]))
+            elif field in layout:
+                if layout[field].__class__ is int:
+                    scalars.append((name, field))
+                else:
+                    vectors.append((name, field, None))
+            else:
+                raise ValueError("Unknown field: {}".format(field))
+
+        # Scalar widgets go first, so that they map to the first widget values, followed by the vector components
+        widgets = [field for _, field in scalars]
+        columns = [name for name, _ in scalars]
+        self._vectors = list()
+        for name, field, components in vectors:
+            start = len(widgets)
+            if components is None:
+                # Byte list widget, whose value is already a list
+                widgets.append(field)
+                self._vectors.append((name, start, None))
+                width = layout[field].stop - layout[field].start
+                columns.extend("{}_{}".format(name, i) for i in range(width))
+            else:
+                widgets.extend(components)
+                self._vectors.append((name, start, start + len(components)))
+                if name == field:
+                    columns.extend(components)
+                else:
+                    columns.extend("{}_{}".format(name, component.rsplit("_", 1)[1]) for component in components)
+        self._scalars = [name for name, _ in scalars]
+        self._widgets = widgets
+        self._flat = all(stop is not None for _, _, stop in self._vectors)
+        if len(widgets) == 1:
+            self._get_widgets = lambda data, w=widgets[0]: (data[w],)
+        elif widgets:
+            self._get_widgets = itemgetter(*widgets)
+        else:
+            self._get_widgets = lambda data: ()
+        self._widget_columns = len(columns)
+
+        self._orientations = list()
+        for name, field in orientations:
+            self._orientations.append((name, field, len(columns)))
+            columns.extend("{}_{}".format(name, axis) for axis in ORIENTATION_FIELDS[field])
+        self.columns = columns
+
+        self.values = {hand: dict.fromkeys(self.fields) for hand in HAND_NAMES}
+        """Values read for each hand, as a dictionary of field values keyed by "left" and "right".
+        Vector fields are lists. If no data is received from a controller, all its values are None.
+
+        :type: dict """
+
+        self.array = np.full((len(HAND_NAMES), len(columns)), np.nan)
+        """Values read for each hand, as a [2, number of columns] array with the left hand in the first row.
+        Vector and orientation fields take one column per component, as named in the columns attribute.
+        If no data is received from a controller, its row is NaN.
+
+        :type: numpy.ndarray """
+
+        self._empty = dict.fromkeys(self.fields)
+
+    def read(self, controller):
+        """
+        Reads the selected fields of both controllers into the values dictionary. The values of each controller are
+        taken from its latest snapshot, so that they all belong to the same data frame.
+
+        :param EteeController controller: controller to read the data from.
+        :return: the values dictionary, which is updated in place on every read.
+        :rtype: dict
+        """
+        for hand, name in _HANDS:
+            out = self.values[name]
+            snapshot = controller.snapshot(hand)
+            if snapshot is None:
+                out.update(self._empty)
+                continue
+            values = self._get_widgets(snapshot.data)
+            out.update(zip(self._scalars, values))
+            for field, start, stop in self._vectors:
+                out[field] = list(values[start:stop]) if stop is not None else values[start]
+            for field, kind, _ in self._orientations:
+                out[field] = snapshot.quaternion if kind == "quaternion" else snapshot.euler
+        return self.values
+
+    def read_array(self, controller, out=None):
+        """
+        Reads the selected fields of both controllers into an array, with one row per hand. The values of each
+        controller are taken from its latest snapshot, so that they all belong to the same data frame.
+
+        :param EteeController controller: controller to read the data from.
+        :param numpy.ndarray out: [2, number of columns] float array to write the values to. If None, the array
+                                attribute is used.
+        :return: the output array.
+        :rtype: numpy.ndarray
+        """
+        if out is None:
+            out = self.array
+        width = self._widget_columns
+        for hand, _ in _HANDS:
+            row = out[hand]
+            snapshot = controller.snapshot(hand)
+            if snapshot is None:
+                row[:] = np.nan
+                continue
+            values = self._get_widgets(snapshot.data)
+            if self._flat:
+                row[:width] = values
+            else:
+                row[:width] = _flatten(values)
+            for _, kind, column in self._orientations:
+                if kind == "quaternion":
+                    q = snapshot.quaternion
+                    if q is None:
+                        row[column:column + 4] = np.nan
+                    else:
+                        row[column:column + 4] = (q.w, q.x, q.y, q.z)
+                else:
+                    euler = snapshot.euler
+                    row[column:column + 3] = np.nan if euler is None else euler
+        return out
+
+
+def _flatten(values):
+    """
+    Returns the widget values with the byte lists expanded.
+
+    :param tuple values: widget values.
+    :return: list of values.
+    """
+    flat = list()
+    for value in values:
+        if isinstance(value, list):
+            flat.extend(value)
+        else:
+            flat.append(value)
+    return flat
@@ -1,2 +1,10 @@
 from .utilities import *
+from .port_monitor import *
+from .widget_frame import *
+from .widget_decoder import *
+from .frame_sync import *
+from .command_response import *
+from .session_recorder import *
+from .session_reader import *
 from .driver_base import *
+from .driver_async import *
@@ -0,0 +1,90 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Collection of TG0 device command responses from the text lines received through serial.
+
+"""
+
+from builtins import object
+
+
+class CommandResponse(object):
+    """
+    This class collects the text lines that make up the response to a command sent to a TG0 device, and detects when
+    the response is complete.
+    """
+
+    def __init__(self, response_start=b"OK", response_end=b"END", response_keys=None):
+        """
+        Initializes the CommandResponse class with the given parameters.
+
+        :param bytes response_start: a delimiter starting from which the response is read.
+                                    If None, the response is read from the first line.
+        :param bytes response_end: a delimiter until which the response is read.
+        :param list[bytes] response_keys: keys whose values are parsed from the response. If response_end is None,
+                                        the response is complete as soon as all these keys are read.
+        """
+        self.response_start = response_start
+        self.response_end = response_end
+        self.response_keys = response_keys
+        self.response = b""
+        self.started = response_start is None
+        self.keys_received = [False] * len(response_keys) if response_keys is not None else None
+        self.done = False
+
+    def add_line(self, line):
+        """
+        Adds a text line received from the device to the response.
+
+        :param bytes line: text line, including its '\\r\\n' end flag.
+        :return: true if the response is complete.
+        """
+        if self.response_start is not None and (self.response_start + b"\r\n") in line:
+            self.response += self.response_start + b"\r\n"
+            self.started = True
+        elif self.started:
+            self.response += line
+        if self.response_end is not None and (self.response_end + b"\r\n") in line:
+            self.done = True
+        if self.response_keys is not None:
+            for i, key in enumerate(self.response_keys):
+                if key in line:
+                    self.keys_received[i] = True
+            # With an end delimiter, the response is read up to it so that no lines are left for the next command
+            if self.response_end is None and all(self.keys_received):
+                self.done = True
+        return self.done
+
+    def result(self):
+        """
+        Returns the response read so far.
+
+        :return: read response. If response keys were given, a dictionary with the value read for each key,
+                or None for the keys that were not received.
+        """
+        if self.response_keys is None:
+            return self.response
+        response_dict = dict()
+        for key in self.response_keys:
+            if key in self.response:
+                response_dict[key] = self.response.split(key)[1].split(b"\r\n")[0]
+            else:
+                response_dict[key] = None
+        return response_dict
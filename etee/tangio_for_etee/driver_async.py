@@ -0,0 +1,281 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+asyncio transport for TG0 device communication.
+The serial port file descriptor is registered with the event loop, so data is read and parsed in the event loop
+thread as soon as it is available, without a separate data thread.
+
+"""
+
+import asyncio
+import time
+
+import serial
+
+from .driver_base import TG0Driver, DEFAULT_READ_RESPONSE_TIMEOUT
+from .command_response import CommandResponse
+
+IDLE_DELAY = 0.05
+
+
+class AsyncTG0Driver(TG0Driver):
+    """
+    This driver connects to TG0 devices through serial communication and reads their data from an asyncio event loop.
+    The serial port is set to non-blocking mode and its file descriptor is watched by the event loop, which is only
+    supported for POSIX serial ports.
+
+    Data frames are passed to the data callbacks and can be iterated with frames(). Commands can be awaited while data
+    keeps being read, since text lines are routed to the pending command responses.
+    """
+    def __init__(self, config_file=None, *, data_bytes=None, end_bytes=None, widgets=None, keep_alive_period=5,
+                 compact_frames=False, queue_size=256):
+        """
+        Initializes the AsyncTG0Driver class with the given parameters.
+
+        :param str config_file: path to the file which contains the data structure definition.
+        :param int data_bytes: byte length of data to be received from the device.
+        :param int end_bytes: length of data packet delimiter characters (\xff).
+        :param dict widgets: dictionary defining the data structure.
+        :param float keep_alive_period: duration of time to keep the connection alive even when no data is transmitted.
+        :param bool compact_frames: if true, data packets are parsed into array-backed WidgetFrame objects instead of
+                                    dictionaries.
+        :param int queue_size: number of frames kept for each frames() iterator. The oldest frames are dropped when
+                                an iterator falls behind.
+        """
+        super().__init__(config_file, data_bytes=data_bytes, end_bytes=end_bytes, widgets=widgets,
+                         keep_alive_period=keep_alive_period, compact_frames=compact_frames)
+        self.queue_size = queue_size
+        self.dropped_frames = 0
+        self.event_loop = None
+        self._frame_queues = list()
+        self._idle_handle = None
+
+    def connect(self, port=None, close_at_exit=True):
+        """
+        Attempts to open a connection between the driver and the hardware device, and sets the serial port to
+        non-blocking mode.
+
+        :param str port: string representation of the hardware port to be used to establish the connection to hardware.
+                    If None, the first available COM port is chosen.
+        :param bool close_at_exit: boolean to define whether the connection to the device will be closed at exit.
+        :return: success flag; true if the connection was successful, false otherwise.
+        """
+        connected = super().connect(port, close_at_exit=close_at_exit)
+        self.serial_reader.serial.timeout = 0
+        return connected
+
+    def run(self):
+        """
+        Registers the serial port with the running event loop, so that data is read as soon as it is available.
+        Must be called from a coroutine or callback running in the event loop.
+        """
+        self.event_loop = asyncio.get_running_loop()
+        self.read_text = True
+        self.run_mode = True
+        self.loop_is_running = True
+        self.event_loop.add_reader(self.serial_reader.serial.fileno(), self._on_readable)
+
+    def stop(self):
+        """
+        Unregisters the serial port from the event loop and ends the frames() iterators.
+        """
+        if self.run_mode and self.event_loop is not None and not self.event_loop.is_closed():
+            try:
+                self.event_loop.remove_reader(self.serial_reader.serial.fileno())
+            except (ValueError, OSError, serial.SerialException):
+                pass
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        self.run_mode = False
+        self.loop_is_running = False
+        for queue in self._frame_queues:
+            self._put_frame(queue, None)
+
+    async def frames(self):
+        """
+        Asynchronous iterator over the data frames received from the device.
+        The iteration ends when the driver is stopped or the connection is lost.
+
+        :return: asynchronous iterator of (frame number, parsed data) tuples.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        self._frame_queues.append(queue)
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self._frame_queues.remove(queue)
+
+    async def send_command(self, command, response_start=b"OK", response_end=b"END", response_keys=None,
+                           timeout=DEFAULT_READ_RESPONSE_TIMEOUT, verbose=False):
+        """
+        Sends a command and waits for its response, while data frames keep being read. Text lines are passed to the
+        pending commands in the order the commands were sent.
+
+        :param bytes command: Command to be sent.
+        :param bytes response_start: a delimiter starting from which the response is read.
+        :param bytes response_end: a delimiter until which the response is read.
+        :param list[bytes] response_keys: keys whose values are parsed from the response. If response_end is None,
+                                        the command returns as soon as all these keys are read.
+        :param float timeout: read timeout duration in seconds.
+        :param bool verbose: enable or disable verbose mode, which prints messages sent and received through serial.
+        :return: Read response. If the timeout is reached, the response read until then.
+        """
+        if verbose:
+            print("write: ", command)
+        command_response = CommandResponse(response_start, response_end, response_keys)
+        command_response.future = asyncio.get_running_loop().create_future()
+        with self._commands_lock:
+            self._pending_commands.append(command_response)
+        try:
+            self.write(command)
+            await asyncio.wait_for(asyncio.shield(command_response.future), timeout)
+        except asyncio.TimeoutError:
+            pass
+        except serial.SerialException:
+            print("Sending command failed")
+            return
+        finally:
+            with self._commands_lock:
+                self._pending_commands.remove(command_response)
+        return command_response.result()
+
+    async def send_commands(self, commands, response_start=b"OK", response_end=b"END", response_keys=None,
+                            timeout=DEFAULT_READ_RESPONSE_TIMEOUT):
+        """
+        Sends several commands at once and waits for all their responses concurrently, within a single timeout.
+
+        :param list[bytes] commands: Commands to be sent.
+        :param bytes response_start: a delimiter starting from which each response is read.
+        :param bytes response_end: a delimiter until which each response is read.
+        :param list[bytes] response_keys: keys whose values are parsed from each response.
+        :param float timeout: read timeout duration in seconds.
+        :return: One CommandResponse per command. Responses not completed before the timeout are not done.
+        :rtype: list[CommandResponse]
+        """
+        event_loop = asyncio.get_running_loop()
+        command_responses = [CommandResponse(response_start, response_end, response_keys) for _ in commands]
+        if not command_responses:
+            return command_responses
+        for command_response in command_responses:
+            command_response.future = event_loop.create_future()
+        with self._commands_lock:
+            self._pending_commands.extend(command_responses)
+        try:
+            for command in commands:
+                self.write(command)
+            await asyncio.wait([command_response.future for command_response in command_responses], timeout=timeout)
+        except serial.SerialException:
+            print("Sending command failed")
+        finally:
+            with self._commands_lock:
+                for command_response in command_responses:
+                    self._pending_commands.remove(command_response)
+        return command_responses
+
+    def _on_readable(self):
+        """
+        Event loop callback for the serial port becoming readable. Reads all available bytes and handles every data
+        frame and text line received.
+        """
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        try:
+            if self.serial_reader.read_available() == 0:
+                # A readable port with no data means it was closed or unplugged
+                raise serial.SerialException("Device reports readiness to read but returned no data")
+            self._handle_buffered()
+        except (serial.SerialException, OSError):
+            self.stop()
+            self.serial_exception_handler()
+            return
+        if self.serial_reader.frame_sync.buffer and self.run_mode:
+            # Bytes kept in the buffer are handled if no more data is received after them
+            self._idle_handle = self.event_loop.call_later(IDLE_DELAY, self._on_idle)
+
+    def _on_idle(self):
+        """
+        Event loop callback for no data being received for IDLE_DELAY after bytes were kept in the receive buffer.
+        Handles the text lines that were waiting for the bytes following them.
+        """
+        self._idle_handle = None
+        self._handle_buffered(idle=True)
+
+    def _handle_buffered(self, idle=False):
+        """
+        Handles every data frame and text line in the receive buffer.
+
+        :param bool idle: if true, no more bytes are expected for now.
+        """
+        while True:
+            reading = self.serial_reader.pop_widgets_and_text(idle)
+            if reading is None:
+                break
+            self._handle_reading(reading)
+
+    def _handle_reading(self, reading):
+        """
+        Stores a data frame and passes it to the data callbacks and frames() iterators, or passes a text line to the
+        print callbacks and pending command responses.
+
+        :param reading: parsed data structure for a data frame, or bytes for a text line.
+        """
+        self.last_alive_time = time.time()
+        recorder = self.recorder
+        if not isinstance(reading, bytes):
+            self.current_data = reading
+            self.current_timestamp = self.serial_reader.read_time
+            self.frameno += 1
+            if recorder is not None:
+                recorder.record_frame(self.serial_reader.last_frame, self.current_timestamp, reading.get("hand"))
+            self.data_handler(self.frameno, reading)
+            for queue in self._frame_queues:
+                self._put_frame(queue, (self.frameno, reading))
+        else:
+            if recorder is not None:
+                recorder.record_line(reading, self.serial_reader.read_time)
+            self._route_command_line(reading)
+            self.print_handler(reading)
+
+    def _command_done(self, command_response):
+        """
+        Notifies the coroutine awaiting a command that its response is complete.
+
+        :param CommandResponse command_response: completed command response.
+        """
+        if not command_response.future.done():
+            command_response.future.set_result(None)
+
+    def _put_frame(self, queue, frame):
+        """
+        Puts a frame in a frames() iterator queue, dropping the oldest frame if the queue is full.
+
+        :param asyncio.Queue queue: frames() iterator queue.
+        :param tuple frame: (frame number, parsed data) tuple, or None to end the iteration.
+        """
+        if queue.full():
+            queue.get_nowait()
+            self.dropped_frames += 1
+        queue.put_nowait(frame)
@@ -33,7 +33,11 @@ import yaml
 import os
 import time
 
-from . import serial_ports
+from . import serial_ports, is_pseudo_terminal
+from .widget_decoder import WidgetDecoder
+from .frame_sync import FrameSynchronizer, FRAME_DATA
+from .command_response import CommandResponse
+from .session_recorder import SessionRecorder
 
 yaml.warnings({'YAMLLoadWarning': False})
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -44,6 +48,8 @@ DEFAULT_READ_DATA_TIMEOUT = 1
 DEFAULT_READ_SERIAL_TIMEOUT = 1
 DEFAULT_READ_RESPONSE_TIMEOUT = 1
 
+STATUS_LINE_ENDINGS = (b" connection complete\r\n", b" disconnected\r\n")
+
 
 class SerialReader(object):
     """
@@ -51,7 +57,8 @@ class SerialReader(object):
     parsing the data it receives to the defined data structure.
     """
 
-    def __init__(self, config_file=None, *, baud_rate=115200, data_bytes=None, end_bytes=None, widgets=None):
+    def __init__(self, config_file=None, *, baud_rate=115200, data_bytes=None, end_bytes=None, widgets=None,
+                 compact_frames=False):
         """
         Initializes SerialReader class with the given parameters.
 
@@ -60,17 +67,25 @@ class SerialReader(object):
         :param int data_bytes: byte length of data to be received from the device.
         :param int end_bytes: length of data packet delimiter characters (\xff).
         :param dict widgets: dictionary defining the data structure.
+        :param bool compact_frames: if true, data packets are parsed into array-backed WidgetFrame objects instead of
+                                    dictionaries.
         """
         super().__init__()
         self.serial = None
         self.baud_rate = baud_rate
+        self.compact_frames = compact_frames
         self.serial_lock = threading.Lock()
         self.port = None
+        self.read_time = None
+        self.last_frame = None
+        self._rx_buffer = bytearray()
 
         if config_file is not None or widgets is not None:
             self.data_bytes = None
             self.end_bytes = None
             self.widgets = None
+            self.decoder = None
+            self.frame_sync = None
             self.configure(config_file, data_bytes=data_bytes, end_bytes=end_bytes, widgets=widgets)
 
     def connect(self, port=None):
@@ -79,8 +94,19 @@ class SerialReader(object):
 
         :param str port: string representation the port of connection.
                         If None is passed, the driver will connect to the first available TG0 port.
-        """
+                        Pseudo-terminals are accepted even though they are not listed as TG0 ports.
+                        An object implementing the serial.Serial interface, such as a software device, can also be
+                        passed, in which case it is used as the serial connection.
+        """
+        if port is not None and not isinstance(port, str):
+            self.serial = port
+            self.port = getattr(port, "port", None)
+            print("Connected to port {}".format(self.port))
+            return
         available_ports = serial_ports()
+        if port is not None and is_pseudo_terminal(port):
+            # Pseudo-terminals are not listed as COM ports, but they are used by device emulators
+            available_ports.append((port, None))
         if not available_ports:
             raise Exception("No TG0 device is found!")
         if port is None:
@@ -111,6 +137,7 @@ class SerialReader(object):
             self.serial.close()
             if self.serial_lock.locked():
                 self.serial_lock.release()
+        self._rx_buffer.clear()
         self.port = None
         print("Connection closed")
 
@@ -119,42 +146,62 @@ class SerialReader(object):
         Empty the driver input buffer, which stores the device transmitted data.
         """
         self.serial.reset_input_buffer()
+        self._rx_buffer.clear()
+
+    def read_available(self):
+        """
+        Reads all the bytes waiting in the serial input buffer in a single call, or waits up to the serial timeout for
+        at least one byte, and appends them to the receive buffer. If the serial timeout is 0, it does not wait.
+        The monotonic clock time at which bytes were last received is stored in read_time.
+
+        :return: number of bytes read.
+        """
+        chunk = self.serial.read(self.serial.in_waiting or 1)
+        if chunk:
+            self.read_time = time.monotonic()
+            self._rx_buffer += chunk
+        return len(chunk)
 
     def readline(self, delim=b"\r\n", num=None, timeout=DEFAULT_READ_DATA_TIMEOUT):
         """
         Reads bytes from the serial until a delimiter.
+        Bytes are read from the serial in bulk into a receive buffer, and any bytes after the delimiter are kept in
+        the buffer for the next read.
 
-        :param bytes delim: delimiter until to which bytes are read.
+        :param bytes delim: delimiter until to which bytes are read. A list of delimiters can be passed, in which case
+                            bytes are read until the first of them is found.
         :param int num: maximum number of characters to be read.
         :param float timeout: timeout duration in seconds.
         :return: read byte string.
         """
-        line = b""
-        elapsed = 0
+        delims = delim if isinstance(delim, list) else [delim]
+        overlap = max(len(item) for item in delims) - 1
+        buffer = self._rx_buffer
+        start = 0
         time_start = time.time()
         self.serial_lock.acquire()
-        while elapsed < timeout:
-            try:
-                char = self.serial.read()
-                line = line + char
-            except serial.SerialException as e:
-                self.serial_lock.release()
-                raise e
-            if isinstance(delim, list):
-                delim_found = False
-                for item in delim:
-                    if line[-len(item):] == item:
-                        delim_found = True
-                        break
-                if delim_found:
+        try:
+            while True:
+                end = -1
+                for item in delims:
+                    index = buffer.find(item, start)
+                    if index != -1 and (end == -1 or index + len(item) < end):
+                        end = index + len(item)
+                if num is not None and len(buffer) >= num and (end == -1 or end > num):
+                    end = num
+                if end != -1:
                     break
-            else:
-                if line[-len(delim):] == delim:
-                   break
-            if len(line) == num:
-                break
-            elapsed = time.time() - time_start
-        self.serial_lock.release()
+                if time.time() - time_start >= timeout:
+                    end = len(buffer)
+                    break
+                # Only the newly read bytes, plus a partial delimiter before them, need to be scanned again
+                start = max(0, len(buffer) - overlap)
+                self.read_available()
+            # The receive buffer is shared with the data loop, so the line is taken before the lock is released
+            line = bytes(buffer[:end])
+            del buffer[:end]
+        finally:
+            self.serial_lock.release()
         return line
 
     def write(self, message):
@@ -172,7 +219,8 @@ class SerialReader(object):
         :param bytes message: message written to the serial.
         :param bytes response_start: a delimiter starting from which the response is read.
         :param bytes response_end: a delimiter until which the response is read.
-        :param bytes response_keys: the commands leaves as soon as all these keys are read.
+        :param bytes response_keys: keys whose values are parsed from the response. If response_end is None, the
+                                    command leaves as soon as all these keys are read.
         :param float timeout: read timeout duration in seconds.
         :param bool verbose: enable or disable verbose mode, which prints messages sent and received through serial.
         :return: read response
@@ -180,12 +228,25 @@ class SerialReader(object):
         if verbose:
             print("write: ", message)
         self.serial.write(message)
+        command_response = CommandResponse(response_start, response_end, response_keys)
+        self.read_response(command_response, timeout=timeout, verbose=verbose)
+        response = command_response.result()
+        if response_keys is not None:
+            for key in response_keys:
+                print(key, response[key])
+        return response
+
+    def read_response(self, command_response, timeout=DEFAULT_READ_RESPONSE_TIMEOUT, verbose=False):
+        """
+        Reads text lines from the serial and adds them to a command response, until the response is complete.
+
+        :param CommandResponse command_response: response to be read.
+        :param float timeout: read timeout duration in seconds.
+        :param bool verbose: enable or disable verbose mode, which prints the lines received through serial.
+        :return: true if the response is complete, false if the timeout was reached.
+        """
         previous_timeout = self.serial.timeout
         self.serial.timeout = 1
-        response = b""
-        response_started = (response_start is None)
-        if response_keys is not None:
-            keys_received = [False] * len(response_keys)
         elapsed = 0
         time_start = time.time()
         while elapsed < timeout:
@@ -198,40 +259,19 @@ class SerialReader(object):
             elif b"\r\n" not in line:
                 print("Line was not read.")
                 continue
-            elif (response_start + b"\r\n") in line:
-                response += (response_start + b"\r\n")
-                response_started = True
-            else:
-                if response_started:
-                    response += line
-            if response_end is not None:
-                if (response_end + b"\r\n") in line:
-                    break
-            if response_keys is not None:
-                for i, key in enumerate(response_keys):
-                    if key in line:
-                        keys_received[i] = True
-                        if all(keys_received):
-                            break
-        if response_keys is not None:
-            response_dict = dict()
-            for key in response_keys:
-                if key in response:
-                    response_dict[key] = response.split(key)[1].split(b"\r\n")[0]
-                else:
-                    response_dict[key] = None
-                print(key, response_dict[key])
-            response = response_dict
+            if command_response.add_line(line):
+                break
 
         self.serial.timeout = previous_timeout
 
-        return response
+        return command_response.done
 
     def configure(self, config_file=None, *, data_bytes=None, end_bytes=None, widgets=None):
         """
         Update the information on data structure configuration.
         This provides information on data packet structures, and byte-bit location of specific device parameters,
-        allowing for their retrieval during device communication.
+        allowing for their retrieval during device communication. The data structure is compiled into a decode plan,
+        which is used by raw2data to parse each data packet.
 
         :param str config_file: path to the file which contains the data structure definition.
         :param int data_bytes: byte length of data to be received from the device.
@@ -251,11 +291,43 @@ class SerialReader(object):
                 self.widgets = widgets
             else:
                 raise Exception("Since config_file is None, data_bytes, end_bytes and widgets are required arguments.")
+        self.decoder = WidgetDecoder(self.widgets)
+        self.frame_sync = FrameSynchronizer(self.data_bytes, self.end_bytes, buffer=self._rx_buffer)
 
     def raw2data(self, raw):
         """
         Parses raw data to the specified data structure.
 
+        :param bytes raw: raw binary data from the serial port.
+        :return: data structure parsed from the raw data following the data structure specification. If compact_frames
+                is set, a WidgetFrame.
+        """
+        if len(raw) >= self.decoder.min_length:
+            if self.compact_frames:
+                return self.decoder.decode_record(raw)
+            return self.decoder.decode(raw)
+        return self._raw2data_unplanned(raw)
+
+    def raw2data_batch(self, buf, n=None, stride=None):
+        """
+        Parses a contiguous buffer of raw data packets to the specified data structure, decoding all packets at once.
+
+        :param buf: bytes-like object containing the raw data packets back to back.
+        :param int n: number of data packets to be parsed. By default, as many complete packets as the buffer holds.
+        :param int stride: distance in bytes between the start of consecutive packets. By default, data_bytes.
+        :return: dictionary with a NumPy array of n values for each widget name in the data structure specification.
+        """
+        if stride is None:
+            stride = self.data_bytes
+        if n is None:
+            n = len(memoryview(buf).cast("B")) // stride
+        return self.decoder.decode_batch(buf, n, stride=stride)
+
+    def _raw2data_unplanned(self, raw):
+        """
+        Parses raw data to the specified data structure by walking the widgets definition. This is only used for raw
+        data shorter than the decode plan requires, where widgets out of range must be handled byte by byte.
+
         :param bytes raw: raw binary data from the serial port.
         :return: data structure parsed from the raw data following the data structure specification.
         """
@@ -292,23 +364,51 @@ class SerialReader(object):
     def read_widgets_and_text(self, timeout=DEFAULT_READ_SERIAL_TIMEOUT):
         """
         Reads binary data from the serial port and calls raw2data to parse it.
+        Data frames and text lines are split by the frame synchronizer, which recovers the frame alignment if the
+        received data is corrupted.
 
         :param float timeout: time after which the method will stop trying to read the widget value, in seconds.
         :return: data structure instance parsed using the raw2data method from a serial port raw data reading.
         """
         events = None
+        idle = False
         start_time = time.time()
-        while time.time() - start_time < timeout:
-            data = self.readline(delim=[b"\xff\xff", b"\r\n"])
-            if b"\xff\xff" == data[-self.end_bytes:] and len(data) == self.data_bytes + self.end_bytes:
-                data = data[0:-self.end_bytes]
-                events = self.raw2data(data)
-                break
-            if b"\r\n" == data[-2:]:
-                events = data
-                break
+        self.serial_lock.acquire()
+        try:
+            while True:
+                events = self.pop_widgets_and_text(idle)
+                if events is not None or time.time() - start_time >= timeout:
+                    break
+                # A read that times out without data means the device is not sending more for now
+                idle = self.read_available() == 0
+        finally:
+            self.serial_lock.release()
         return events
 
+    def pop_widgets_and_text(self, idle=False):
+        """
+        Takes the next data frame or text line already in the receive buffer, without reading from the serial port.
+        Data frames are parsed with the raw2data method.
+
+        :param bool idle: if true, no more bytes are expected for now, so a text line at the end of the buffer is
+                        taken without waiting for the bytes that follow it.
+        :return: parsed data structure for a data frame, bytes for a text line, or None if no complete frame or line
+                has been received. The raw data of the last data frame is kept in last_frame.
+        """
+        kind, data = self.frame_sync.pop(idle)
+        if kind == FRAME_DATA:
+            self.last_frame = data
+            return self.raw2data(data)
+        return data
+
+    def get_frame_counters(self):
+        """
+        Returns the counters of the frame synchronizer, which show the data lost to corruption of the serial stream.
+
+        :return: dictionary with the number of frames, lines, resyncs, truncated frames and discarded bytes.
+        """
+        return self.frame_sync.counters()
+
 
 class TG0Driver:
     """
@@ -316,7 +416,8 @@ class TG0Driver:
     data in a separate container for each device, overwriting them periodically as new data is fetched from the hardware.
     This class is usually used for inheritance from a child class specific to the hardware device that it's been used for.
     """
-    def __init__(self, config_file=None, *, data_bytes=None, end_bytes=None, widgets=None, keep_alive_period=5):
+    def __init__(self, config_file=None, *, data_bytes=None, end_bytes=None, widgets=None, keep_alive_period=5,
+                 compact_frames=False):
         """
         Initializes the TG0Driver class with the given parameters.
 
@@ -325,12 +426,15 @@ class TG0Driver:
         :param int end_bytes: length of data packet delimiter characters (\xff).
         :param dict widgets: dictionary defining the data structure.
         :param float keep_alive_period: duration of time to keep the connection alive even when no data is transmitted.
+        :param bool compact_frames: if true, data packets are parsed into array-backed WidgetFrame objects instead of
+                                    dictionaries.
         """
         self.baud_rate = 115200
         self.serial_reader = None
         self.port = None
         self.thread = None
         self.keep_alive_period = keep_alive_period
+        self.compact_frames = compact_frames
         self.last_alive_time = 0
         self.config_file = config_file
         self.data_bytes = data_bytes
@@ -344,9 +448,13 @@ class TG0Driver:
         self.serial_exception_callbacks = list()
         self.connection_callbacks = list()
         self.current_data = None
+        self.current_timestamp = None
         self.frameno = -1
+        self.recorder = None
         self.read_text = False
         self.loop_is_running = False
+        self._pending_commands = list()
+        self._commands_lock = threading.Lock()
 
     def connect(self, port=None, close_at_exit=True):
         """
@@ -360,7 +468,8 @@ class TG0Driver:
         """
         try:
             self.serial_reader = SerialReader(self.config_file, baud_rate=self.baud_rate, data_bytes=self.data_bytes,
-                                              end_bytes=self.end_bytes,  widgets=self.widgets)
+                                              end_bytes=self.end_bytes,  widgets=self.widgets,
+                                              compact_frames=self.compact_frames)
             self.serial_reader.connect(port=port)
             if close_at_exit:
                 self.close_connection_at_exit()
@@ -379,6 +488,7 @@ class TG0Driver:
         :return: true if the connection to hardware was closed correctly, false otherwise.
         """
         self.stop()
+        self.stop_recording()
         try:
             self.serial_reader.close_connection()
             self.connection_handler(state=0)
@@ -414,6 +524,29 @@ class TG0Driver:
         """
         self.run_mode = False
 
+    def start_recording(self, path):
+        """
+        Starts recording the raw data frames and text lines received to a session file.
+
+        :param str path: path of the session file. If it exists, it is overwritten.
+        :return: session recorder.
+        :rtype: SessionRecorder
+        """
+        self.stop_recording()
+        recorder = SessionRecorder(path)
+        recorder.start()
+        self.recorder = recorder
+        return recorder
+
+    def stop_recording(self):
+        """
+        Stops recording, once all the received data has been written to the session file.
+        """
+        recorder = self.recorder
+        if recorder is not None:
+            self.recorder = None
+            recorder.stop()
+
     def sleep(self, timeout=3):
         """
         Suspends the data thread. During sleep, no data is read from serial.
@@ -544,12 +677,19 @@ class TG0Driver:
         if reading is not None:
             self.last_alive_time = time.time()
 
-        if isinstance(reading, dict):
+        recorder = self.recorder
+        if isinstance(reading, bytes):
+            if recorder is not None:
+                recorder.record_line(reading, self.serial_reader.read_time)
+            self._route_command_line(reading)
+            self.print_handler(reading)
+        elif reading is not None:
             self.current_data = reading
+            self.current_timestamp = self.serial_reader.read_time
             self.frameno += 1
+            if recorder is not None:
+                recorder.record_frame(self.serial_reader.last_frame, self.current_timestamp, reading.get("hand"))
             self.data_handler(self.frameno, reading)
-        elif isinstance(reading, bytes):
-            self.print_handler(reading)
         else:
             self.rest_handler(reading)
 
@@ -575,23 +715,128 @@ class TG0Driver:
 
     def send_command(self, command, sleep=True, *args, **kargs):
         """
-        Suspends reading data from the device. Sends command and reads response.
+        Sends command and reads response.
+
+        If the data loop is running, it keeps reading data while the response is awaited, and passes the text lines it
+        receives to the pending commands, in the order the commands were sent. Otherwise, the response is read directly
+        from the serial port.
 
         :param bytes command: Command to be sent.
-        :param bool sleep: Boolean to toggle a sleep routine before the command is sent. True by default.
+        :param bool sleep: Kept for compatibility. The data loop is no longer suspended to send commands.
         :return: Read response.
         """
-        if sleep and self.run_mode:
-            self.sleep()
+        if self.run_mode and not self.sleep_mode and self.thread is not None and self.thread.is_alive():
+            return self._send_command_multiplexed(command, *args, **kargs)
         try:
             response = self.serial_reader.send_command(command, *args, **kargs)
         except Exception as e:
-            self.sleep_mode = False
             print("Sending command failed")
             return
-        self.sleep_mode = False
         return response
 
+    def _send_command_multiplexed(self, command, response_start=b"OK", response_end=b"END", response_keys=None,
+                                  timeout=DEFAULT_READ_RESPONSE_TIMEOUT, verbose=False):
+        """
+        Sends command and waits for the data loop to read its response.
+
+        :param bytes command: Command to be sent.
+        :param bytes response_start: a delimiter starting from which the response is read.
+        :param bytes response_end: a delimiter until which the response is read.
+        :param list[bytes] response_keys: keys whose values are parsed from the response.
+        :param float timeout: read timeout duration in seconds.
+        :param bool verbose: enable or disable verbose mode, which prints messages sent and received through serial.
+        :return: Read response. If the timeout is reached, the response read until then.
+        """
+        if verbose:
+            print("write: ", command)
+        command_response = CommandResponse(response_start, response_end, response_keys)
+        try:
+            self._send_commands_multiplexed([command], [command_response], timeout)
+        except Exception as e:
+            print("Sending command failed")
+            return
+        response = command_response.result()
+        if verbose:
+            print("response: ", response)
+        return response
+
+    def send_commands(self, commands, response_start=b"OK", response_end=b"END", response_keys=None,
+                      timeout=DEFAULT_READ_RESPONSE_TIMEOUT):
+        """
+        Sends several commands and reads their responses.
+
+        If the data loop is running, all the commands are sent at once and their responses are read concurrently by
+        the data loop, within a single timeout. Otherwise, the commands are sent one after another and each response
+        is read directly from the serial port.
+
+        :param list[bytes] commands: Commands to be sent.
+        :param bytes response_start: a delimiter starting from which each response is read.
+        :param bytes response_end: a delimiter until which each response is read.
+        :param list[bytes] response_keys: keys whose values are parsed from each response.
+        :param float timeout: read timeout duration in seconds.
+        :return: One CommandResponse per command. Responses not completed before the timeout are not done.
+        :rtype: list[CommandResponse]
+        """
+        command_responses = [CommandResponse(response_start, response_end, response_keys) for _ in commands]
+        try:
+            if self.run_mode and not self.sleep_mode and self.thread is not None and self.thread.is_alive():
+                self._send_commands_multiplexed(commands, command_responses, timeout)
+            else:
+                for command, command_response in zip(commands, command_responses):
+                    self.write(command)
+                    self.serial_reader.read_response(command_response, timeout=timeout)
+        except Exception as e:
+            print("Sending command failed")
+        return command_responses
+
+    def _send_commands_multiplexed(self, commands, command_responses, timeout):
+        """
+        Sends commands and waits for the data loop to read all their responses.
+
+        :param list[bytes] commands: Commands to be sent.
+        :param list[CommandResponse] command_responses: Responses to be read, one per command.
+        :param float timeout: read timeout duration in seconds.
+        """
+        for command_response in command_responses:
+            command_response.event = threading.Event()
+        with self._commands_lock:
+            self._pending_commands.extend(command_responses)
+        try:
+            for command in commands:
+                self.write(command)
+            deadline = time.time() + timeout
+            for command_response in command_responses:
+                command_response.event.wait(max(0, deadline - time.time()))
+        finally:
+            with self._commands_lock:
+                for command_response in command_responses:
+                    self._pending_commands.remove(command_response)
+
+    def _route_command_line(self, line):
+        """
+        Passes a text line received from the device to the oldest pending command which has not been fully answered.
+        Status lines sent by the device on its own, such as connection and disconnection messages, are not part of
+        any command response and are only passed to the print callbacks.
+
+        :param bytes line: text line received from the device.
+        """
+        if line.endswith(STATUS_LINE_ENDINGS):
+            return
+        with self._commands_lock:
+            for command_response in self._pending_commands:
+                if not command_response.done:
+                    if command_response.add_line(line):
+                        self._command_done(command_response)
+                    break
+
+    def _command_done(self, command_response):
+        """
+        Notifies the sender of a command that its response is complete.
+
+        :param CommandResponse command_response: completed command response.
+        """
+        command_response.event.set()
+
     def close_connection_at_exit(self):
         """
         Register a callback to close the connection to hardware when the program is about to exit.
@@ -622,6 +867,14 @@ class TG0Driver:
         """
         return time.time() - self.last_alive_time
 
+    def get_frame_counters(self):
+        """
+        Returns the counters of data frames, text lines and data lost to corruption of the serial stream.
+
+        :return: dictionary with the number of frames, lines, resyncs, truncated frames and discarded bytes.
+        """
+        return self.serial_reader.get_frame_counters()
+
 
 class _TG0DataQueue:
     """
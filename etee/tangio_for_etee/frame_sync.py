@@ -0,0 +1,296 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Framing state machine for the TG0 device serial stream.
+Splits received bytes into fixed-length data frames and text lines, and recovers frame alignment after corruption.
+
+"""
+
+from builtins import object
+
+FRAME_DATA = 1
+FRAME_TEXT = 2
+
+TEXT_DELIMITER = b"\r\n"
+MAX_TEXT_LENGTH = 256
+
+_NEED_MORE = 0
+_INVALID = -1
+
+
+class FrameSynchronizer(object):
+    """
+    This class splits the bytes received from a TG0 device into data frames and text lines.
+
+    Data frames have a fixed length of data_bytes followed by end_bytes (\\xff) delimiter characters, and text lines
+    are printable characters ended by '\\r\\n'. Because data payloads can contain both delimiters, frames are
+    identified from their fixed length and terminator rather than by searching for the first delimiter. When the stream
+    does not start with a valid frame or line, the synchronizer discards bytes up to the next delimiter from which a
+    valid frame or line follows, and keeps count of the data lost.
+    """
+
+    def __init__(self, data_bytes, end_bytes, buffer=None):
+        """
+        Initializes the FrameSynchronizer class with the given parameters.
+
+        :param int data_bytes: byte length of data to be received from the device.
+        :param int end_bytes: length of data packet delimiter characters (\\xff).
+        :param bytearray buffer: receive buffer to take bytes from. If None, a new buffer is created.
+        """
+        self.data_bytes = data_bytes
+        self.end_bytes = end_bytes
+        self.frame_bytes = data_bytes + end_bytes
+        self.terminator = b"\xff" * end_bytes
+        self.buffer = bytearray() if buffer is None else buffer
+        self._synced = True
+        self._idle = False
+
+        self.frames = 0
+        """Number of data frames received."""
+        self.lines = 0
+        """Number of text lines received."""
+        self.resyncs = 0
+        """Number of times the frame alignment was lost and recovered."""
+        self.truncated_frames = 0
+        """Number of data frames discarded because they were shorter than the frame length."""
+        self.discarded_bytes = 0
+        """Number of bytes discarded while recovering the frame alignment."""
+
+    def feed(self, data):
+        """
+        Appends received bytes to the receive buffer.
+
+        :param bytes data: bytes received from the device.
+        """
+        self.buffer += data
+
+    def pop(self, idle=False):
+        """
+        Removes the next data frame or text line from the receive buffer.
+
+        A text line at the end of the buffer may be the start of a data frame whose payload contains '\\r\\n', so it
+        is only taken once more bytes are received, or when the stream is idle.
+
+        :param bool idle: if true, no more bytes are expected for now, so units at the end of the buffer are taken
+                        without waiting for the bytes that follow them.
+        :return: (FRAME_DATA, data payload without end bytes), (FRAME_TEXT, text line including '\\r\\n'), or
+                (None, None) if more bytes are needed.
+        """
+        self._idle = idle
+        length = self._classify(0)
+        if length == _NEED_MORE:
+            return None, None
+        if length == _INVALID:
+            self._synced = False
+            length = self._resync()
+            if length == _NEED_MORE:
+                return None, None
+
+        if not self._synced:
+            self._synced = True
+            self.resyncs += 1
+        buffer = self.buffer
+        if length == self.frame_bytes and buffer[self.data_bytes:length] == self.terminator:
+            payload = bytes(buffer[:self.data_bytes])
+            del buffer[:length]
+            self.frames += 1
+            return FRAME_DATA, payload
+        line = bytes(buffer[:length])
+        del buffer[:length]
+        self.lines += 1
+        return FRAME_TEXT, line
+
+    def counters(self):
+        """
+        Returns the framing counters.
+
+        :return: dictionary with the number of frames, lines, resyncs, truncated frames and discarded bytes.
+        """
+        return {
+            "frames": self.frames,
+            "lines": self.lines,
+            "resyncs": self.resyncs,
+            "truncated_frames": self.truncated_frames,
+            "discarded_bytes": self.discarded_bytes,
+        }
+
+    def reset_counters(self):
+        """
+        Sets all framing counters to zero.
+        """
+        self.frames = 0
+        self.lines = 0
+        self.resyncs = 0
+        self.truncated_frames = 0
+        self.discarded_bytes = 0
+
+    def _classify(self, start):
+        """
+        Checks whether a valid text line or data frame starts at the given buffer position.
+
+        Data payloads can contain printable characters followed by '\\r\\n', so the bytes at a position can read both
+        as a text line and as a data frame. In that case, the unit following each candidate decides which one is
+        aligned with the stream, and the data frame is kept unless the stream only continues after the text line.
+
+        :param int start: position in the receive buffer.
+        :return: length of the text line or data frame, _NEED_MORE if more bytes are needed to decide, or _INVALID.
+        """
+        if start >= len(self.buffer):
+            return _NEED_MORE
+        frame = self._frame_at(start)
+        if frame:
+            # A text line cannot contain the terminator, so it must end before it
+            text = self._text_length(start, start + self.data_bytes + len(TEXT_DELIMITER))
+            if text <= 0:
+                return self.frame_bytes
+            following_text = self._unit_length(start + text)
+            following_frame = self._unit_length(start + self.frame_bytes)
+            if following_text > 0 and following_frame == _INVALID:
+                return text
+            if following_text == _INVALID or following_frame > 0:
+                return self.frame_bytes
+            if self._idle:
+                # Nothing more is expected, so the line is only taken if the frame would leave a partial unit after it
+                end = len(self.buffer)
+                if start + self.frame_bytes != end and (following_text > 0 or start + text == end):
+                    return text
+                return self.frame_bytes
+            return _NEED_MORE
+
+        text = self._text_length(start)
+        if text > 0:
+            if frame is False or self._idle:
+                return text
+            # The line may still be the start of a data frame, until the stream is seen to continue after it
+            if start + text == len(self.buffer):
+                return _NEED_MORE
+            return text if self._unit_length(start + text) > 0 else _NEED_MORE
+        if frame is None or text == _NEED_MORE:
+            return _NEED_MORE
+        return _INVALID
+
+    def _unit_length(self, start):
+        """
+        Checks whether a valid text line or data frame starts at the given buffer position, without checking the
+        units that follow it.
+
+        :param int start: position in the receive buffer.
+        :return: length of the text line or data frame, _NEED_MORE if more bytes are needed to decide, or _INVALID.
+        """
+        frame = self._frame_at(start)
+        if frame:
+            return self.frame_bytes
+        text = self._text_length(start)
+        if text > 0:
+            return text
+        if frame is None or text == _NEED_MORE:
+            return _NEED_MORE
+        return _INVALID
+
+    def _frame_at(self, start):
+        """
+        Checks whether the data frame terminator is found at the end of a data frame starting at the given position.
+
+        :param int start: position in the receive buffer.
+        :return: True or False, or None if the buffer ends before the end of the frame.
+        """
+        end = start + self.frame_bytes
+        if end > len(self.buffer):
+            return None
+        return self.buffer[start + self.data_bytes:end] == self.terminator
+
+    def _text_length(self, start, limit=None):
+        """
+        Checks whether a valid text line starts at the given buffer position.
+
+        :param int start: position in the receive buffer.
+        :param int limit: position before which the line must end. If None, lines up to MAX_TEXT_LENGTH are searched.
+        :return: length of the text line including '\\r\\n', _NEED_MORE if the line may not have been fully received,
+                or _INVALID.
+        """
+        buffer = self.buffer
+        if start >= len(buffer) or buffer[start] not in _TEXT_START:
+            return _NEED_MORE if start >= len(buffer) else _INVALID
+        max_end = start + MAX_TEXT_LENGTH if limit is None else min(limit, start + MAX_TEXT_LENGTH)
+        end = buffer.find(TEXT_DELIMITER, start, max_end)
+        if end != -1:
+            return end + len(TEXT_DELIMITER) - start if _is_text(buffer, start, end) else _INVALID
+        if limit is not None or len(buffer) >= start + MAX_TEXT_LENGTH:
+            return _INVALID
+        # The last byte may be the start of the delimiter
+        stop = len(buffer) - 1 if buffer.endswith(TEXT_DELIMITER[:1]) else len(buffer)
+        return _NEED_MORE if _is_text(buffer, start, stop) else _INVALID
+
+    def _resync(self):
+        """
+        Discards bytes from the receive buffer up to the next delimiter from which a valid text line or data frame
+        starts.
+
+        :return: length of the text line or data frame at the start of the buffer after discarding, or _NEED_MORE.
+        """
+        buffer = self.buffer
+        position = 1
+        while True:
+            candidates = []
+            for delimiter in (self.terminator, TEXT_DELIMITER):
+                index = buffer.find(delimiter, max(0, position - len(delimiter)))
+                if index != -1:
+                    candidates.append(index + len(delimiter))
+            if not candidates:
+                # Keep the last bytes, which may be the start of a delimiter
+                keep = max(self.end_bytes, len(TEXT_DELIMITER)) - 1
+                self._discard(max(0, len(buffer) - keep))
+                return _NEED_MORE
+            position = min(candidates)
+            length = self._classify(position)
+            if length != _INVALID:
+                self._discard(position)
+                return length
+            position += 1
+
+    def _discard(self, count):
+        """
+        Removes bytes from the start of the receive buffer and updates the corruption counters.
+
+        :param int count: number of bytes to be removed.
+        """
+        if count == 0:
+            return
+        buffer = self.buffer
+        if self.end_bytes <= count < self.frame_bytes and buffer[count - self.end_bytes:count] == self.terminator:
+            self.truncated_frames += 1
+        self.discarded_bytes += count
+        del buffer[:count]
+
+
+def _is_text(buffer, start, end):
+    """
+    Checks if the given buffer range contains only printable ASCII characters.
+
+    :param bytearray buffer: receive buffer.
+    :param int start: start of the range.
+    :param int end: end of the range.
+    :return: true if all the characters in the range are printable.
+    """
+    return buffer[start:end].translate(None, _PRINTABLE) == b""
+
+
+_PRINTABLE = bytes(range(0x20, 0x7f)) + b"\t"
+_TEXT_START = frozenset(_PRINTABLE + TEXT_DELIMITER[:1])
@@ -0,0 +1,178 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Cached registry of the available COM ports, with port attach and detach notifications.
+
+"""
+
+from builtins import object
+import os
+import threading
+import time
+
+from .utilities import serial_ports
+
+DEFAULT_PORTS_TTL = 1
+DEFAULT_SCAN_PERIOD = 0.5
+DEVICE_DIR = "/dev"
+
+
+class PortMonitor(object):
+    """
+    This class keeps a cached list of the available COM ports, filtered by VID and/or PID, so that the ports can be
+    queried on every iteration of an application loop without enumerating them each time.
+
+    The ports are enumerated again when the cached list is older than its time to live. On systems with a /dev
+    directory, they are also enumerated again as soon as the directory is modified, since device nodes are created and
+    removed there when devices are attached or detached. A background thread can be started to scan the ports
+    periodically and call the attach and detach callbacks.
+    """
+
+    def __init__(self, vid=None, pid=None, ttl=DEFAULT_PORTS_TTL):
+        """
+        Initializes the PortMonitor class with the given parameters.
+
+        :param int vid: Device VID to filter. By default, it is None.
+        :param int pid: Device PID to filter. By default, it is None.
+        :param float ttl: time after which the cached ports are enumerated again, in seconds.
+        """
+        self.vid = vid
+        self.pid = pid
+        self.ttl = ttl
+        self.attach_callbacks = list()
+        self.detach_callbacks = list()
+        self.thread = None
+        self.run_mode = False
+        self._ports = None
+        self._scan_time = 0
+        self._device_dir_mtime = None
+        self._lock = threading.RLock()
+
+    def get_ports(self, refresh=False):
+        """
+        Returns the available COM ports meeting the VID and/or PID criteria.
+
+        :param bool refresh: if true, the ports are enumerated again even if the cached list is still valid.
+        :return: List of available COM ports, as (device, VID) tuples.
+        """
+        with self._lock:
+            if refresh or not self._cache_valid():
+                self._scan()
+            return list(self._ports)
+
+    def get_port_names(self, refresh=False):
+        """
+        Returns the names of the available COM ports meeting the VID and/or PID criteria.
+
+        :param bool refresh: if true, the ports are enumerated again even if the cached list is still valid.
+        :return: List of available COM port names.
+        """
+        return [port[0] for port in self.get_ports(refresh)]
+
+    def add_attach_callback(self, cb):
+        """
+        Adds a callback for ports attached, which is called with the port name.
+
+        :param cb: callback.
+        """
+        self.attach_callbacks.append(cb)
+
+    def add_detach_callback(self, cb):
+        """
+        Adds a callback for ports detached, which is called with the port name.
+
+        :param cb: callback.
+        """
+        self.detach_callbacks.append(cb)
+
+    def start(self, period=DEFAULT_SCAN_PERIOD):
+        """
+        Launches a separate thread that scans the COM ports periodically, keeping the cached list up to date and
+        calling the attach and detach callbacks when ports change.
+
+        :param float period: time between scans, in seconds.
+        """
+        if self.run_mode:
+            return
+        self.run_mode = True
+        self.thread = threading.Thread(target=self._loop, args=(period,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the scanning thread.
+        """
+        self.run_mode = False
+
+    def _loop(self, period):
+        """
+        Method that scans the COM ports periodically while the monitor is running.
+
+        :param float period: time between scans, in seconds.
+        """
+        while self.run_mode:
+            self.get_ports()
+            time.sleep(period)
+
+    def _cache_valid(self):
+        """
+        Checks if the cached ports can still be used.
+
+        :return: true if the cached list is newer than its time to live and the /dev directory has not been modified.
+        """
+        if self._ports is None or time.monotonic() - self._scan_time >= self.ttl:
+            return False
+        # The /dev directory modification time is not updated on every platform, so it can only shorten the time to live
+        return self._device_dir_mtime is None or self._device_dir_mtime == _get_device_dir_mtime()
+
+    def _scan(self):
+        """
+        Enumerates the COM ports, updates the cached list and calls the attach and detach callbacks for the ports that
+        changed since the previous scan.
+        """
+        device_dir_mtime = _get_device_dir_mtime()
+        ports = serial_ports(self.vid, self.pid)
+        previous = self._ports
+        self._ports = ports
+        self._scan_time = time.monotonic()
+        self._device_dir_mtime = device_dir_mtime
+        if previous is None:
+            return
+        previous_names = set(port[0] for port in previous)
+        names = set(port[0] for port in ports)
+        for name in sorted(names - previous_names):
+            for cb in self.attach_callbacks:
+                cb(name)
+        for name in sorted(previous_names - names):
+            for cb in self.detach_callbacks:
+                cb(name)
+
+
+def _get_device_dir_mtime():
+    """
+    Returns the modification time of the /dev directory.
+
+    :return: modification time in nanoseconds, or None if the directory does not exist.
+    """
+    try:
+        return os.stat(DEVICE_DIR).st_mtime_ns
+    except OSError:
+        return None
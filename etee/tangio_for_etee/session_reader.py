@@ -0,0 +1,420 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Memory-mapped reader of the session files written by SessionRecorder.
+
+"""
+
+from builtins import object
+import mmap
+
+import numpy as np
+import yaml
+
+from .widget_decoder import WidgetDecoder
+from .session_recorder import SESSION_MAGIC, SESSION_HEADER, RECORD_HEADER, RECORD_FRAME, INDEX_MAGIC, \
+    INDEX_FOOTER
+
+RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("length", "<u2"), ("kind", "u1"), ("hand", "u1")])
+RUN_DTYPE = np.dtype([("offset", "<i8"), ("count", "<i8"), ("length", "<u2"), ("first_timestamp", "<f8"),
+                      ("last_timestamp", "<f8")])
+LINE_DTYPE = np.dtype([("offset", "<i8"), ("length", "<u2"), ("timestamp", "<f8")])
+INDEX_CHUNK_RECORDS = 65536
+
+
+class SessionReader(object):
+    """
+    This class gives access to the data frames and text lines of a recorded session, without loading the file into
+    memory. The file is memory-mapped, and only the runs of back to back data frames of the same length are indexed,
+    so that opening a session does not depend on its number of frames. The index written at the end of the file by
+    SessionRecorder is used if present. Otherwise, as for an interrupted recording, the record headers are scanned
+    with NumPy, run by run.
+
+    Data frames are returned as memoryviews of the mapped file, and ranges of frames are decoded directly from the
+    mapped file by the widget decoder, without copying the raw data. Frame timestamps and hands are read from the
+    record headers in the mapped file when they are requested.
+    """
+
+    def __init__(self, path, config_file=None, *, widgets=None):
+        """
+        Opens and indexes a session file.
+
+        :param str path: path of the session file.
+        :param str config_file: path to the file which contains the data structure definition, used to decode the
+                                data frames.
+        :param dict widgets: dictionary defining the data structure, if no config_file is given.
+        :raises Exception: if the file is not a session file.
+        """
+        self.path = path
+        self.decoder = None
+        if config_file is not None:
+            with open(config_file, 'r') as fstream:
+                widgets = yaml.safe_load(fstream)["widgets"]
+        if widgets is not None:
+            self.decoder = WidgetDecoder(widgets)
+
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise Exception("{} is not a session file".format(path))
+        if len(self._mmap) < SESSION_HEADER.size:
+            self.close()
+            raise Exception("{} is not a session file".format(path))
+        magic, self.version, self.wall_time, self.start_time = SESSION_HEADER.unpack_from(self._mmap, 0)
+        if magic != SESSION_MAGIC:
+            self.close()
+            raise Exception("{} is not a session file".format(path))
+        runs = self._read_index()
+        if runs is None:
+            runs = self._build_index()
+
+        self.runs = runs
+        """Runs of back to back data frames of the same length: position of the first record in the session file,
+        number of frames, frame length in bytes, and receive times of the first and last frames.
+
+        :type: numpy.ndarray """
+
+        self._run_starts = np.zeros(len(self.runs) + 1, dtype=np.int64)
+        np.cumsum(self.runs["count"], out=self._run_starts[1:])
+        self._strides = self.runs["length"].astype(np.int64) + RECORD_HEADER.size
+
+    def __len__(self):
+        """
+        Returns the number of data frames in the session.
+
+        :return: number of data frames.
+        """
+        return int(self._run_starts[-1])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the session file. Memoryviews returned by frame() must be released before.
+        """
+        self._mmap.close()
+        self._file.close()
+
+    def frame(self, index):
+        """
+        Returns the raw data of a data frame.
+
+        :param int index: frame index.
+        :return: read-only memoryview of the mapped file with the raw data frame, without end bytes.
+        :rtype: memoryview
+        :raises IndexError: if there is no frame with the given index.
+        """
+        run, position = self._locate(index)
+        offset = position + RECORD_HEADER.size
+        return memoryview(self._mmap)[offset:offset + int(self.runs["length"][run])]
+
+    def read(self, index):
+        """
+        Decodes a data frame.
+
+        :param int index: frame index.
+        :return: dictionary with the value of each widget.
+        """
+        return self._get_decoder().decode(self.frame(index))
+
+    def get_timestamp(self, index):
+        """
+        Returns the receive time of a data frame.
+
+        :param int index: frame index.
+        :return: receive time, in seconds from the monotonic clock of the recording.
+        :rtype: float
+        :raises IndexError: if there is no frame with the given index.
+        """
+        return RECORD_HEADER.unpack_from(self._mmap, self._locate(index)[1])[0]
+
+    def get_timestamps(self, start=0, stop=None):
+        """
+        Returns the receive times of a range of data frames.
+
+        :param int start: index of the first frame.
+        :param int stop: index after the last frame. If None, the end of the session.
+        :return: receive times, in seconds from the monotonic clock of the recording.
+        :rtype: numpy.ndarray
+        """
+        return self._read_headers("timestamp", start, stop)
+
+    def get_hands(self, start=0, stop=None):
+        """
+        Returns the hand IDs of a range of data frames.
+
+        :param int start: index of the first frame.
+        :param int stop: index after the last frame. If None, the end of the session.
+        :return: hand IDs.
+        :rtype: numpy.ndarray
+        """
+        return self._read_headers("hand", start, stop)
+
+    def index_range(self, start_time=None, end_time=None):
+        """
+        Returns the range of the frames received within a time interval. The runs are searched by their first and last
+        timestamps, and then the frames of a single run are searched, so that only a few record headers are read.
+
+        :param float start_time: start of the interval, as a receive timestamp. If None, the start of the session.
+        :param float end_time: end of the interval, excluded, as a receive timestamp. If None, the end of the session.
+        :return: start and stop frame indices.
+        :rtype: (int, int)
+        """
+        start = 0 if start_time is None else self._search_time(start_time)
+        stop = len(self) if end_time is None else self._search_time(end_time)
+        return start, max(start, stop)
+
+    def decode(self, start=0, stop=None, hand=None):
+        """
+        Decodes a range of data frames at once, with one NumPy column per widget. Each run of frames is decoded
+        straight from the mapped file.
+
+        :param int start: index of the first frame.
+        :param int stop: index after the last frame. If None, the end of the session.
+        :param int hand: if given, only the frames of this hand ID are returned.
+        :return: dictionary with an array of values per widget name, plus the "timestamp" array of the frames.
+        """
+        decoder = self._get_decoder()
+        chunks = list()
+        for run, run_start, run_stop in self._run_slices(start, stop):
+            offset = self._record_position(run, run_start) + RECORD_HEADER.size
+            chunks.append(decoder.decode_batch(self._mmap, run_stop - run_start, stride=int(self._strides[run]),
+                                               offset=offset))
+        if chunks:
+            columns = {name: np.concatenate([chunk[name] for chunk in chunks]) if len(chunks) > 1 else chunks[0][name]
+                       for name in chunks[0]}
+        else:
+            columns = decoder.decode_batch(b"", 0)
+        columns["timestamp"] = self.get_timestamps(start, stop)
+        if hand is not None:
+            mask = self.get_hands(start, stop) == hand
+            columns = {name: values[mask] for name, values in columns.items()}
+        return columns
+
+    def decode_time_range(self, start_time=None, end_time=None, hand=None):
+        """
+        Decodes the data frames received within a time interval.
+
+        :param float start_time: start of the interval, as a receive timestamp. If None, the start of the session.
+        :param float end_time: end of the interval, excluded, as a receive timestamp. If None, the end of the session.
+        :param int hand: if given, only the frames of this hand ID are returned.
+        :return: dictionary with an array of values per widget name, plus the "timestamp" array of the frames.
+        """
+        start, stop = self.index_range(start_time, end_time)
+        return self.decode(start, stop, hand=hand)
+
+    def lines(self, start_time=None, end_time=None):
+        """
+        Returns the text lines received within a time interval.
+
+        :param float start_time: start of the interval, as a receive timestamp. If None, the start of the session.
+        :param float end_time: end of the interval, excluded, as a receive timestamp. If None, the end of the session.
+        :return: list of (timestamp, line) tuples.
+        """
+        lines = list()
+        for timestamp, offset, length in self._lines:
+            if (start_time is None or timestamp >= start_time) and (end_time is None or timestamp < end_time):
+                lines.append((timestamp, self._mmap[offset:offset + length]))
+        return lines
+
+    def _get_decoder(self):
+        """
+        Returns the widget decoder.
+
+        :return: widget decoder.
+        :rtype: WidgetDecoder
+        :raises Exception: if the reader was opened without a data structure definition.
+        """
+        if self.decoder is None:
+            raise Exception("A config_file or widgets definition is required to decode data frames")
+        return self.decoder
+
+    def _locate(self, index):
+        """
+        Finds the run of a data frame and the position of its record.
+
+        :param int index: frame index. Negative indices count from the end of the session.
+        :return: run index and record position in the file.
+        :rtype: (int, int)
+        :raises IndexError: if there is no frame with the given index.
+        """
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("Frame index out of range")
+        run = int(np.searchsorted(self._run_starts, index, side="right")) - 1
+        return run, self._record_position(run, index - int(self._run_starts[run]))
+
+    def _record_position(self, run, index):
+        """
+        Returns the position of the record of a frame within its run.
+
+        :param int run: run index.
+        :param int index: frame index within the run.
+        :return: record position in the file.
+        :rtype: int
+        """
+        return int(self.runs["offset"][run]) + index * int(self._strides[run])
+
+    def _run_slices(self, start, stop):
+        """
+        Splits a range of frames into the parts of the runs that contain them.
+
+        :param int start: index of the first frame.
+        :param int stop: index after the last frame. If None, the end of the session.
+        :return: list of (run index, start, stop) tuples, with the frame indices within the run.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        slices = list()
+        if stop <= start:
+            return slices
+        run = int(np.searchsorted(self._run_starts, start, side="right")) - 1
+        while start < stop:
+            run_start = int(self._run_starts[run])
+            end = min(stop, int(self._run_starts[run + 1]))
+            slices.append((run, start - run_start, end - run_start))
+            start = end
+            run += 1
+        return slices
+
+    def _run_records(self, run):
+        """
+        Returns the record headers of a run, as a strided view of the mapped file. The view must not be kept, so that
+        the file can be closed.
+
+        :param int run: run index.
+        :return: structured array of RECORD_DTYPE.
+        :rtype: numpy.ndarray
+        """
+        return np.ndarray(shape=(int(self.runs["count"][run]),), dtype=RECORD_DTYPE, buffer=self._mmap,
+                          offset=int(self.runs["offset"][run]), strides=(int(self._strides[run]),))
+
+    def _read_headers(self, field, start, stop):
+        """
+        Reads a field of the record headers of a range of data frames.
+
+        :param str field: field of RECORD_DTYPE.
+        :param int start: index of the first frame.
+        :param int stop: index after the last frame. If None, the end of the session.
+        :return: copy of the field values.
+        :rtype: numpy.ndarray
+        """
+        parts = [self._run_records(run)[field][run_start:run_stop].copy()
+                 for run, run_start, run_stop in self._run_slices(start, stop)]
+        if not parts:
+            return np.zeros(0, dtype=RECORD_DTYPE[field])
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def _search_time(self, timestamp):
+        """
+        Returns the index of the first frame received at or after a time.
+
+        :param float timestamp: receive time.
+        :return: frame index, or the number of frames if all of them were received before.
+        :rtype: int
+        """
+        run = int(np.searchsorted(self.runs["last_timestamp"], timestamp, side="left"))
+        if run == len(self.runs):
+            return len(self)
+        # Binary search within the run, reading one record header per step
+        low = 0
+        high = int(self.runs["count"][run]) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD_HEADER.unpack_from(self._mmap, self._record_position(run, middle))[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return int(self._run_starts[run]) + low
+
+    def _read_index(self):
+        """
+        Reads the index written at the end of the session file by SessionRecorder.
+
+        :return: runs of data frames, or None if the file has no valid index.
+        :rtype: numpy.ndarray
+        """
+        buffer = self._mmap
+        footer_position = len(buffer) - INDEX_FOOTER.size
+        if footer_position < SESSION_HEADER.size:
+            return None
+        magic, index_offset, run_count, line_count = INDEX_FOOTER.unpack_from(buffer, footer_position)
+        if magic != INDEX_MAGIC or index_offset < SESSION_HEADER.size or \
+                index_offset + run_count * RUN_DTYPE.itemsize + line_count * LINE_DTYPE.itemsize != footer_position:
+            return None
+        runs = np.frombuffer(buffer, RUN_DTYPE, run_count, index_offset).copy()
+        lines = np.frombuffer(buffer, LINE_DTYPE, line_count, index_offset + run_count * RUN_DTYPE.itemsize)
+        self._lines = [(float(timestamp), int(offset), int(length))
+                       for offset, length, timestamp in lines.tolist()]
+        del lines
+        return runs
+
+    def _build_index(self):
+        """
+        Indexes the runs of data frames and the text lines by scanning the records of the session file. A truncated
+        record at the end of the file, left by an interrupted recording, is ignored.
+
+        :return: runs of data frames.
+        :rtype: numpy.ndarray
+        """
+        buffer = self._mmap
+        size = len(buffer)
+        header_size = RECORD_HEADER.size
+        runs = list()
+        self._lines = list()
+        position = SESSION_HEADER.size
+        while position + header_size <= size:
+            timestamp, length, kind, hand = RECORD_HEADER.unpack_from(buffer, position)
+            if position + header_size + length > size:
+                break
+            if kind != RECORD_FRAME:
+                self._lines.append((timestamp, position + header_size, length))
+                position += header_size + length
+                continue
+            # Check the following records, a chunk at a time, for a run of frames with the same length
+            stride = header_size + length
+            run_offset = position
+            count = 0
+            last_timestamp = timestamp
+            while True:
+                chunk = min((size - position) // stride, INDEX_CHUNK_RECORDS)
+                if chunk == 0:
+                    break
+                records = np.ndarray(shape=(chunk,), dtype=RECORD_DTYPE, buffer=buffer, offset=position,
+                                     strides=(stride,))
+                matches = (records["kind"] == RECORD_FRAME) & (records["length"] == length)
+                run = chunk if matches.all() else int(matches.argmin())
+                if run:
+                    last_timestamp = float(records["timestamp"][run - 1])
+                del records
+                count += run
+                position += stride * run
+                if run < chunk:
+                    break
+            runs.append((run_offset, count, length, timestamp, last_timestamp))
+        return np.array(runs, dtype=RUN_DTYPE)
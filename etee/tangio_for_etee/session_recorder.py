@@ -0,0 +1,197 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Recorder of the raw data frames and text lines received from a TG0 device, to a compact binary session file.
+
+Session file format (little-endian):
+    File header: magic b"TG0SESS\\x00", format version (uint16), wall clock time (float64) and monotonic time
+    (float64) at the start of the recording.
+    Records, back to back: receive time (float64, monotonic clock), payload length (uint16), record kind (uint8,
+    RECORD_FRAME or RECORD_TEXT) and hand (uint8, HAND_UNKNOWN for text lines or frames without a hand), followed by
+    the payload: the raw data frame without end bytes, or the text line including '\\r\\n'.
+    Index, written when the recording is stopped: one RUN_ENTRY per run of back to back data frames of the same length
+    (position of the first record, number of frames, frame length, and receive times of the first and last frames),
+    one LINE_ENTRY per text line (position and length of the line, and receive time), and the INDEX_FOOTER: magic
+    b"TG0SIDX\\x00", position of the index, and number of runs and lines. Files of interrupted recordings have no
+    index.
+
+"""
+
+from builtins import object
+from collections import deque
+import struct
+import threading
+import time
+
+SESSION_MAGIC = b"TG0SESS\x00"
+SESSION_VERSION = 1
+SESSION_HEADER = struct.Struct("<8sHdd")
+RECORD_HEADER = struct.Struct("<dHBB")
+INDEX_MAGIC = b"TG0SIDX\x00"
+RUN_ENTRY = struct.Struct("<qqHdd")
+LINE_ENTRY = struct.Struct("<qHd")
+INDEX_FOOTER = struct.Struct("<8sqqq")
+
+RECORD_FRAME = 0
+RECORD_TEXT = 1
+HAND_UNKNOWN = 255
+
+DEFAULT_FLUSH_PERIOD = 0.25
+DEFAULT_FLUSH_RECORDS = 512
+
+
+class SessionRecorder(object):
+    """
+    This class appends the raw data frames and text lines received from a device to a session file, together with
+    their receive timestamps and hand IDs.
+
+    Recording a record only queues a reference to the received bytes. The records are packed and written to the file
+    in batches by a separate writer thread, so that the data thread does not wait for the file.
+    """
+
+    def __init__(self, path, flush_period=DEFAULT_FLUSH_PERIOD, flush_records=DEFAULT_FLUSH_RECORDS):
+        """
+        Initializes the SessionRecorder class with the given parameters.
+
+        :param str path: path of the session file. If it exists, it is overwritten.
+        :param float flush_period: maximum time between writes to the file, in seconds.
+        :param int flush_records: number of queued records after which the writer thread is woken up.
+        """
+        self.path = path
+        self.flush_period = flush_period
+        self.flush_records = flush_records
+        self.records = 0
+        self.thread = None
+        self.run_mode = False
+        self._file = None
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._position = 0
+        self._run = None
+        self._runs = list()
+        self._lines = list()
+
+    def start(self):
+        """
+        Creates the session file, writes its header and launches the writer thread.
+        """
+        if self.run_mode:
+            return
+        self._file = open(self.path, "wb")
+        self._file.write(SESSION_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, time.time(), time.monotonic()))
+        self._position = SESSION_HEADER.size
+        self._run = None
+        self._runs = list()
+        self._lines = list()
+        self.run_mode = True
+        self.thread = threading.Thread(target=self._loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the writer thread once all the queued records have been written, writes the index and closes the session
+        file.
+        """
+        if not self.run_mode:
+            return
+        self.run_mode = False
+        self._wake.set()
+        self.thread.join()
+        self._file.close()
+        self._file = None
+
+    def record_frame(self, raw, timestamp, hand=None):
+        """
+        Queues a raw data frame to be written.
+
+        :param bytes raw: raw data frame, without end bytes.
+        :param float timestamp: time at which the frame was received, in seconds from a monotonic clock.
+        :param int hand: hand ID of the frame, or None if unknown.
+        """
+        self._queue.append((raw, timestamp, RECORD_FRAME, HAND_UNKNOWN if hand is None else hand))
+        if len(self._queue) >= self.flush_records:
+            self._wake.set()
+
+    def record_line(self, line, timestamp):
+        """
+        Queues a text line to be written.
+
+        :param bytes line: text line, including '\\r\\n'.
+        :param float timestamp: time at which the line was received, in seconds from a monotonic clock.
+        """
+        self._queue.append((line, timestamp, RECORD_TEXT, HAND_UNKNOWN))
+        if len(self._queue) >= self.flush_records:
+            self._wake.set()
+
+    def _loop(self):
+        """
+        Method that writes the queued records in batches while the recorder is running, and the remaining records
+        when it is stopped.
+        """
+        while self.run_mode:
+            self._wake.wait(self.flush_period)
+            self._wake.clear()
+            self._write_queued()
+        self._write_queued()
+        self._write_index()
+        self._file.flush()
+
+    def _write_queued(self):
+        """
+        Packs all the queued records and writes them to the session file with a single write.
+        """
+        queue = self._queue
+        pack = RECORD_HEADER.pack
+        header_size = RECORD_HEADER.size
+        position = self._position
+        run = self._run
+        chunks = list()
+        while queue:
+            payload, timestamp, kind, hand = queue.popleft()
+            timestamp = 0.0 if timestamp is None else timestamp
+            length = len(payload)
+            chunks.append(pack(timestamp, length, kind, hand))
+            chunks.append(payload)
+            # Runs of frames of the same length are indexed as they are written, and text lines break them
+            if kind != RECORD_FRAME:
+                run = None
+                self._lines.append((position + header_size, length, timestamp))
+            elif run is not None and run[2] == length:
+                run[1] += 1
+                run[4] = timestamp
+            else:
+                run = [position, 1, length, timestamp, timestamp]
+                self._runs.append(run)
+            position += header_size + length
+        self._position = position
+        self._run = run
+        if chunks:
+            self._file.write(b"".join(chunks))
+            self.records += len(chunks) // 2
+
+    def _write_index(self):
+        """
+        Writes the index of the runs of data frames and text lines at the end of the session file.
+        """
+        chunks = [RUN_ENTRY.pack(*run) for run in self._runs]
+        chunks.extend(LINE_ENTRY.pack(*line) for line in self._lines)
+        chunks.append(INDEX_FOOTER.pack(INDEX_MAGIC, self._position, len(self._runs), len(self._lines)))
+        self._file.write(b"".join(chunks))
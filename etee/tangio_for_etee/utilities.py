@@ -75,6 +75,21 @@ def serial_ports(vid=None, pid=None):
     return get_ports(_get_port_info_predicate(vid, pid))
 
 
+def is_pseudo_terminal(port):
+    """
+    Checks if a port name is a POSIX pseudo-terminal, such as the ones created by device emulators. Pseudo-terminals
+    are not listed as COM ports.
+
+    :param str port: port name.
+    :return: true if the port is a pseudo-terminal.
+    """
+    if port.startswith("/dev/pts/"):
+        return port[len("/dev/pts/"):].isdigit()
+    if port.startswith("/dev/ttys"):
+        return port[len("/dev/ttys"):].isdigit()
+    return False
+
+
 # ------------------------- Parse Bytestring -------------------------
 def parse_utf8(bytestring):
     """
@@ -0,0 +1,278 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Compiled decoder for TG0 device data packets.
+The widget data structure definition is translated once into a decode plan of shifts, masks and struct offsets,
+which is then applied to every data packet received from the device, or to many packets at once with NumPy.
+
+"""
+
+from array import array
+from builtins import object
+import struct
+
+import numpy as np
+
+from .widget_frame import WidgetFrame
+
+_STRUCT_FORMATS = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+
+class WidgetDecoder(object):
+    """
+    This class compiles a widgets data structure definition into a decode plan, and parses raw data packets with it.
+    """
+
+    def __init__(self, widgets):
+        """
+        Compiles the given data structure definition into a decode plan.
+
+        :param dict widgets: dictionary defining the data structure.
+        """
+        self.widgets = widgets
+        self.names = list(widgets)
+        self.min_length = 0
+        self._template = dict.fromkeys(self.names)
+        self._bit_fields = list()       # (name, shift, mask) for contiguous bit ranges and single bits
+        self._bit_lists = list()        # (name, bit positions) for non-contiguous bit ranges
+        self._bytes = list()            # (name, byte index) for unsigned single bytes
+        self._structs = list()          # (name, unpack_from, offset, dtype) for signed bytes and contiguous multi-byte values
+        self._byte_values = list()      # (name, byte indices, signed) for non-contiguous multi-byte values
+        self._byte_lists = list()       # (name, byte indices, signed) for lists of single bytes
+        for name, properties in widgets.items():
+            self._compile_widget(name, properties)
+        self._compile_record_layout()
+
+    def _compile_widget(self, name, properties):
+        """
+        Adds the decode operation for a single widget to the decode plan.
+
+        :param str name: widget name.
+        :param dict properties: byte-bit location of the widget in the data packet.
+        """
+        if "byte" in properties:
+            indices = properties["byte"]
+            is_signed = "signed" in properties
+            if isinstance(indices, list):
+                indices = tuple(indices)
+                self.min_length = max(self.min_length, max(indices) + 1)
+                if "single_value" in properties:
+                    contiguous = indices == tuple(range(indices[0], indices[0] + len(indices)))
+                    if contiguous and len(indices) in _STRUCT_FORMATS:
+                        fmt = _STRUCT_FORMATS[len(indices)]
+                        fmt = "<" + (fmt if is_signed else fmt.upper())
+                        self._structs.append((name, struct.Struct(fmt).unpack_from, indices[0], np.dtype(fmt)))
+                    else:
+                        self._byte_values.append((name, indices, is_signed))
+                else:
+                    self._byte_lists.append((name, indices, is_signed))
+            else:
+                self.min_length = max(self.min_length, indices + 1)
+                if "bit" in properties:
+                    self._bit_fields.append((name, indices * 8 + properties["bit"], 1))
+                elif is_signed:
+                    self._structs.append((name, struct.Struct("<b").unpack_from, indices, np.dtype("<b")))
+                else:
+                    self._bytes.append((name, indices))
+        elif "bit" in properties:
+            positions = tuple(properties["bit"])
+            self.min_length = max(self.min_length, max(positions) // 8 + 1)
+            if positions == tuple(range(positions[0], positions[0] - len(positions), -1)):
+                self._bit_fields.append((name, positions[-1], (1 << len(positions)) - 1))
+            else:
+                self._bit_lists.append((name, positions))
+        else:
+            raise Exception("Widget {} has neither a byte nor a bit location".format(name))
+
+    def _compile_record_layout(self):
+        """
+        Assigns a position in the WidgetFrame record to each widget, and translates the decode plan to write to those
+        positions.
+        """
+        byte_list_lengths = dict((name, len(indices)) for name, indices, _ in self._byte_lists)
+        self.layout = dict()
+        """Position of each widget in the WidgetFrame record, or slice of positions for byte list widgets."""
+        position = 0
+        for name in self.names:
+            if name in byte_list_lengths:
+                self.layout[name] = slice(position, position + byte_list_lengths[name])
+                position += byte_list_lengths[name]
+            else:
+                self.layout[name] = position
+                position += 1
+        self.record_length = position
+        self.record_typecode = self._record_typecode()
+        """Type code of the smallest signed array type that holds the values of all widgets."""
+        self._record_template = [0] * position
+        layout = self.layout
+        self._record_bit_fields = [(layout[name], shift, mask) for name, shift, mask in self._bit_fields]
+        self._record_bit_lists = [(layout[name], positions) for name, positions in self._bit_lists]
+        self._record_bytes = [(layout[name], index) for name, index in self._bytes]
+        self._record_structs = [(layout[name], unpack_from, offset) for name, unpack_from, offset, _ in self._structs]
+        self._record_byte_values = [(layout[name], indices, is_signed)
+                                    for name, indices, is_signed in self._byte_values]
+        self._record_byte_lists = [(layout[name], indices, is_signed)
+                                   for name, indices, is_signed in self._byte_lists]
+
+    def decode(self, raw):
+        """
+        Parses a raw data packet by running the decode plan.
+        The raw data must be at least min_length bytes long.
+
+        :param bytes raw: raw binary data from the serial port.
+        :return: data structure parsed from the raw data following the data structure specification.
+        """
+        events = self._template.copy()
+        value = int.from_bytes(raw, byteorder="little")
+        for name, shift, mask in self._bit_fields:
+            events[name] = (value >> shift) & mask
+        for name, positions in self._bit_lists:
+            event = 0
+            for position in positions:
+                event = (event << 1) | ((value >> position) & 1)
+            events[name] = event
+        for name, index in self._bytes:
+            events[name] = raw[index]
+        for name, unpack_from, offset, _ in self._structs:
+            events[name] = unpack_from(raw, offset)[0]
+        for name, indices, is_signed in self._byte_values:
+            events[name] = int.from_bytes(bytes([raw[x] for x in indices]), byteorder="little", signed=is_signed)
+        for name, indices, is_signed in self._byte_lists:
+            if is_signed:
+                events[name] = [raw[x] - 256 if raw[x] > 127 else raw[x] for x in indices]
+            else:
+                events[name] = [raw[x] for x in indices]
+        return events
+
+    def _record_typecode(self):
+        """
+        Returns the type code of the smallest signed array type that holds the values of all widgets.
+
+        :return: array type code.
+        :rtype: str
+        """
+        bits = [mask.bit_length() + 1 for _, _, mask in self._bit_fields]
+        bits += [len(positions) + 1 for _, positions in self._bit_lists]
+        bits += [9 for _ in self._bytes]
+        bits += [dtype.itemsize * 8 + (dtype.kind == "u") for _, _, _, dtype in self._structs]
+        bits += [len(indices) * 8 + (not is_signed) for _, indices, is_signed in self._byte_values]
+        bits += [8 + (not is_signed) for _, _, is_signed in self._byte_lists]
+        width = max(bits, default=1)
+        for typecode in ("b", "h", "i"):
+            if width <= array(typecode).itemsize * 8:
+                return typecode
+        return "q"
+
+    def decode_record(self, raw):
+        """
+        Parses a raw data packet into a compact WidgetFrame, which stores the widget values in an integer array of type
+        record_typecode instead of a dictionary. The raw data must be at least min_length bytes long.
+
+        :param bytes raw: raw binary data from the serial port.
+        :return: frame with the widget values parsed from the raw data.
+        :rtype: WidgetFrame
+        """
+        values = self._record_template[:]
+        value = int.from_bytes(raw, byteorder="little")
+        for index, shift, mask in self._record_bit_fields:
+            values[index] = (value >> shift) & mask
+        for index, positions in self._record_bit_lists:
+            event = 0
+            for position in positions:
+                event = (event << 1) | ((value >> position) & 1)
+            values[index] = event
+        for index, byte_index in self._record_bytes:
+            values[index] = raw[byte_index]
+        for index, unpack_from, offset in self._record_structs:
+            values[index] = unpack_from(raw, offset)[0]
+        for index, indices, is_signed in self._record_byte_values:
+            values[index] = int.from_bytes(bytes([raw[x] for x in indices]), byteorder="little", signed=is_signed)
+        for index, indices, is_signed in self._record_byte_lists:
+            if is_signed:
+                values[index] = [raw[x] - 256 if raw[x] > 127 else raw[x] for x in indices]
+            else:
+                values[index] = [raw[x] for x in indices]
+        return WidgetFrame(array(self.record_typecode, values), self.layout)
+
+    def decode_batch(self, buf, n, stride=None, offset=0):
+        """
+        Parses many raw data packets stored in a contiguous buffer at once.
+        Each widget is decoded for all packets into a single NumPy column.
+
+        :param buf: bytes-like object containing the raw data packets.
+        :param int n: number of data packets to be parsed.
+        :param int stride: distance in bytes between the start of consecutive packets. By default, min_length.
+        :param int offset: position in bytes of the first packet in the buffer.
+        :return: dictionary with an array of n values per widget name. Widgets defined as byte lists are returned
+                as arrays of shape (n, number of bytes).
+        """
+        if stride is None:
+            stride = self.min_length
+        if stride < self.min_length:
+            raise Exception("Packet stride {} is shorter than the data structure ({} bytes)".format(stride, self.min_length))
+        if n > 0 and len(memoryview(buf).cast("B")) < offset + (n - 1) * stride + self.min_length:
+            raise Exception("Buffer is too short for {} packets".format(n))
+
+        frames = np.ndarray(shape=(n, self.min_length), dtype=np.uint8, buffer=buf, offset=offset, strides=(stride, 1))
+        columns = self._template.copy()
+        for name, shift, mask in self._bit_fields:
+            width = mask.bit_length()
+            first_byte = shift // 8
+            last_byte = (shift + width - 1) // 8
+            value = frames[:, first_byte].astype(np.uint64)
+            for i in range(1, last_byte - first_byte + 1):
+                value |= frames[:, first_byte + i].astype(np.uint64) << np.uint64(8 * i)
+            value = (value >> np.uint64(shift - 8 * first_byte)) & np.uint64(mask)
+            columns[name] = value.astype(_unsigned_dtype(width))
+        for name, positions in self._bit_lists:
+            value = np.zeros(n, dtype=_unsigned_dtype(len(positions)))
+            for position in positions:
+                value <<= 1
+                value |= (frames[:, position // 8] >> (position % 8)) & 1
+            columns[name] = value
+        for name, index in self._bytes:
+            columns[name] = frames[:, index].copy()
+        for name, _, index, dtype in self._structs:
+            columns[name] = np.ascontiguousarray(frames[:, index:index + dtype.itemsize]).view(dtype).reshape(n)
+        for name, indices, is_signed in self._byte_values:
+            value = np.zeros(n, dtype=np.int64)
+            for i, index in enumerate(indices):
+                value |= frames[:, index].astype(np.int64) << (8 * i)
+            if is_signed:
+                sign_bit = 1 << (8 * len(indices) - 1)
+                value = (value ^ sign_bit) - sign_bit
+            columns[name] = value
+        for name, indices, is_signed in self._byte_lists:
+            value = frames[:, list(indices)]
+            columns[name] = value.view(np.int8) if is_signed else value
+        return columns
+
+
+def _unsigned_dtype(width):
+    """
+    Returns the smallest unsigned integer NumPy dtype that holds the given number of bits.
+
+    :param int width: number of bits.
+    :return: NumPy dtype.
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if width <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
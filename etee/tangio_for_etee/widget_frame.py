@@ -0,0 +1,82 @@
+"""
+License:
+--------
+Copyright 2022 Tangi0 Ltd. (trading as TG0)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+File description:
+-----------------
+Compact, array-backed representation of a parsed TG0 device data packet.
+
+"""
+
+from collections.abc import Mapping
+
+
+class WidgetFrame(Mapping):
+    """
+    This class holds the widget values parsed from a single data packet in a fixed-layout integer array, instead of a
+    dictionary per packet. The layout, which maps each widget name to its position in the array, is shared by all the
+    frames parsed with the same decoder.
+
+    Widget values are read by name like in a dictionary, or by position from the record array. A dictionary with the
+    widget values is only created when requested with to_dict().
+    """
+    __slots__ = ("record", "layout")
+
+    def __init__(self, record, layout):
+        """
+        Initializes the WidgetFrame class with the given parameters.
+
+        :param array.array record: widget values, in layout order.
+        :param dict layout: position of each widget in the record. Widgets with several values (byte lists) map to a
+                            slice of the record.
+        """
+        self.record = record
+        self.layout = layout
+
+    def __getitem__(self, name):
+        """
+        Returns the value of a widget.
+
+        :param str name: widget name, as defined in the data structure.
+        :return: widget value, or list of values for byte list widgets.
+        """
+        index = self.layout[name]
+        if index.__class__ is int:
+            return self.record[index]
+        return self.record[index].tolist()
+
+    def __iter__(self):
+        return iter(self.layout)
+
+    def __len__(self):
+        return len(self.layout)
+
+    def __repr__(self):
+        return "WidgetFrame({})".format(self.to_dict())
+
+    def to_dict(self):
+        """
+        Returns the widget values as a dictionary, in the same format as the data structure parsed by
+        SerialReader.raw2data.
+
+        :return: dictionary with the value of each widget.
+        """
+        record = self.record
+        values = dict()
+        for name, index in self.layout.items():
+            values[name] = record[index] if index.__class__ is int else record[index].tolist()
+        return values
@@ -1,6 +1,7 @@
 import time
 from datetime import datetime
 from typing import Dict, List, Any, Tuple, Optional
+from etee import select, Selector
 from pythonosc import udp_client
 from pythonosc import osc_message_builder
 
@@ -83,110 +84,65 @@ def send_osc_data(client, data: Dict[str, Dict[str, Any]], variables: List[str])
                 
                 client.send_message(osc_address, formatted_value)
 
-def process_finger_data(etee, hand: str, finger: str) -> Dict[str, Any]:
-    """Process all data for a specific finger"""
-    return {
-        f"{finger}_pull": getattr(etee, f"get_{finger}_pull")(hand),
-        f"{finger}_force": getattr(etee, f"get_{finger}_force")(hand),
-        f"{finger}_touched": getattr(etee, f"get_{finger}_touched")(hand),
-        f"{finger}_clicked": getattr(etee, f"get_{finger}_clicked")(hand)
-    }
-
-def process_trackpad_data(etee, hand: str) -> Dict[str, Any]:
-    """Process all trackpad-related data"""
-    return {
-        "trackpad_x": etee.get_trackpad_x(hand),
-        "trackpad_y": etee.get_trackpad_y(hand),
-        "trackpad_pull": etee.get_trackpad_pull(hand),
-        "trackpad_force": etee.get_trackpad_force(hand),
-        "trackpad_touched": etee.get_trackpad_touched(hand),
-        "trackpad_clicked": etee.get_trackpad_clicked(hand)
-    }
-
-def process_slider_data(etee, hand: str) -> Dict[str, Any]:
-    """Process all slider-related data"""
-    return {
-        "slider_value": etee.get_slider_value(hand),
-        "slider_touched": etee.get_slider_touched(hand),
-        "slider_up": etee.get_slider_up_button(hand),
-        "slider_down": etee.get_slider_down_button(hand)
-    }
+FINGERS = ['thumb', 'index', 'middle', 'ring', 'pinky']
 
-def process_gesture_data(etee, hand: str) -> Dict[str, Any]:
-    """Process all gesture-related data"""
-    return {
-        "grip_pull": etee.get_grip_pull(hand),
-        "grip_force": etee.get_grip_force(hand),
-        "grip_touched": etee.get_grip_touched(hand),
-        "grip_clicked": etee.get_grip_clicked(hand),
-        "pinch_trackpad_pull": etee.get_pinch_trackpad_pull(hand),
-        "pinch_trackpad_clicked": etee.get_pinch_trackpad_clicked(hand),
-        "pinch_thumbfinger_pull": etee.get_pinch_thumbfinger_pull(hand),
-        "pinch_thumbfinger_clicked": etee.get_pinch_thumbfinger_clicked(hand),
-        "point_independent_clicked": etee.get_point_independent_clicked(hand),
-        "point_excl_tp_clicked": etee.get_point_excl_tp_clicked(hand)
-    }
+# Output names of each data category, read with etee.select
+CATEGORY_FIELDS = {
+    'fingers': [f"{finger}_{value}" for finger in FINGERS for value in ("pull", "force", "touched", "clicked")],
+    'trackpad': ["trackpad_x", "trackpad_y", "trackpad_pull", "trackpad_force", "trackpad_touched",
+                 "trackpad_clicked"],
+    'slider': ["slider_value", "slider_touched", "slider_up", "slider_down"],
+    'gestures': ["grip_pull", "grip_force", "grip_touched", "grip_clicked",
+                 "pinch_trackpad_pull", "pinch_trackpad_clicked",
+                 "pinch_thumbfinger_pull", "pinch_thumbfinger_clicked",
+                 "point_independent_clicked", "point_excl_tp_clicked"],
+    'imu': ["quaternion", "euler", "accel", "gyro", "mag"],
+    'system': ["battery_level", "charging", "charging_complete", "system_button", "tracker_connected",
+               "proximity", "proximity_touched", "proximity_clicked"]
+}
 
-def process_imu_data(etee, hand: str) -> Dict[str, Any]:
-    """Process all IMU-related data"""
-    return {
-        "quaternion": etee.get_quaternion(hand),
-        "euler": etee.get_euler(hand),
-        "accel": etee.get_accel(hand),
-        "gyro": etee.get_gyro(hand),
-        "mag": etee.get_mag(hand)
-    }
+# Widgets read for the output names which differ from the widget names
+FIELD_ALIASES = {
+    "slider_up": "slider_up_touched",
+    "slider_down": "slider_down_touched",
+    "point_excl_tp_clicked": "point_exclude_trackpad_clicked",
+    "charging": "battery_charging",
+    "charging_complete": "battery_charging_complete",
+    "tracker_connected": "tracker_on",
+    "proximity": "proximity_value",
+}
 
-def process_system_data(etee, hand: str) -> Dict[str, Any]:
-    """Process all system-related data"""
-    return {
-        "battery_level": etee.get_battery_level(hand),
-        "charging": etee.get_charging_in_progress_status(hand),
-        "charging_complete": etee.get_charging_complete_status(hand),
-        "system_button": etee.get_system_button_pressed(hand),
-        "tracker_connected": etee.get_tracker_connection(hand),
-        "proximity": etee.get_proximity(hand),
-        "proximity_touched": etee.get_proximity_touched(hand),
-        "proximity_clicked": etee.get_proximity_clicked(hand)
-    }
-
-def process_all_data(etee, selected_inputs: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+def create_selector(selected_inputs: Optional[List[str]] = None) -> Selector:
     """
-    Process all or selected etee controller data.
+    Create a selector for all or selected etee controller data.
+    Field names are resolved once, so the selector can be read on every loop iteration.
     
     Args:
-        etee: EteeController instance
         selected_inputs: Optional list of data categories to process. 
                         Options: ['fingers', 'trackpad', 'slider', 'gestures', 'imu', 'system']
                         If None, processes all data.
     
     Returns:
-        Dictionary containing all processed data for both hands
+        Selector for the fields of the selected categories
     """
-    all_categories = {
-        'fingers': ['thumb', 'index', 'middle', 'ring', 'pinky'],
-        'trackpad': [process_trackpad_data],
-        'slider': [process_slider_data],
-        'gestures': [process_gesture_data],
-        'imu': [process_imu_data],
-        'system': [process_system_data]
-    }
-    
     if selected_inputs is None:
-        selected_inputs = list(all_categories.keys())
-        
-    data = {'left': {}, 'right': {}}
+        selected_inputs = list(CATEGORY_FIELDS.keys())
+    return select([field for category in selected_inputs for field in CATEGORY_FIELDS[category]],
+                  aliases=FIELD_ALIASES)
+
+def process_all_data(etee, selector: Selector) -> Dict[str, Dict[str, Any]]:
+    """
+    Process the selected etee controller data.
     
-    for hand in ['left', 'right']:
-        for category in selected_inputs:
-            if category == 'fingers':
-                for finger in all_categories['fingers']:
-                    data[hand].update(process_finger_data(etee, hand, finger))
-            else:
-                for processor in all_categories[category]:
-                    data[hand].update(processor(etee, hand))
+    Args:
+        etee: EteeController instance
+        selector: Selector created with create_selector or etee.select
     
-    return data
+    Returns:
+        Dictionary containing all processed data for both hands.
+        It is the selector's values dictionary, which is updated in place on every call.
+    """
+    return selector.read(etee)
 
 def format_data_line(data: Dict[str, Dict[str, Any]], variables: List[str]) -> str:
     parts = []
@@ -247,6 +203,7 @@ if __name__ == "__main__":
     # ]
 
     variables_to_monitor = ["trackpad_x"]
+    selector = select(variables_to_monitor)
     
     print(f"Sending OSC data to {osc_ip}:{osc_port}")
     print("OSC addresses format: /<hand>/<sensor>")
@@ -255,7 +212,7 @@ if __name__ == "__main__":
     try:
         while True:
             if etee.get_number_available_etee_ports() > 0:
-                data = process_all_data(etee)
+                data = process_all_data(etee, selector)
                 send_osc_data(osc_client, data, variables_to_monitor)
                 print(format_data_line(data, variables_to_monitor))
                 time.sleep(0.1)
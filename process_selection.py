@@ -2,32 +2,31 @@ import time
 from datetime import datetime
 from typing import Dict, List, Any, Tuple
 
-def process_sensor(etee, hand: str, sensor: str) -> Tuple[int, int]:
+from etee import select, Selector
+
+def create_sensor_selector(sensors: List[str]) -> Selector:
     """
-    Process pull and force data for a given sensor
-    Returns: (pull_value, force_value)
+    Create a selector for the pull and force data of the given sensors.
+    Field names are resolved once, so it can be read on every loop iteration.
     """
-    pull = getattr(etee, f"get_{sensor}_pull")(hand)
-    force = getattr(etee, f"get_{sensor}_force")(hand)
-    return pull, force
+    return select([f"{sensor}_{value}" for sensor in sensors for value in ("pull", "force")])
 
-def process_all_sensors(etee, sensors: List[str]) -> Dict[str, Dict[str, Tuple[int, int]]]:
+def process_all_sensors(etee, selector: Selector) -> Dict[str, Dict[str, Any]]:
     """
     Process multiple sensors for both hands
+    Returns: the selector's values for each hand, which are updated in place on every call
     """
-    data = {'left': {}, 'right': {}}
-    for hand in ['left', 'right']:
-        for sensor in sensors:
-            pull, force = process_sensor(etee, hand, sensor)
-            data[hand][sensor] = (pull, force)
-    return data
+    return selector.read(etee)
 
-def format_data_line(data: Dict[str, Dict[str, Tuple[int, int]]]) -> str:
+def format_data_line(data: Dict[str, Dict[str, Any]], sensors: List[str]) -> str:
     """Format sensor data into a single line with timestamp"""
     parts = [datetime.now().strftime("%H:%M:%S.%f")]
     
     for hand in ['left', 'right']:
-        for sensor, (pull, force) in data[hand].items():
+        values = data[hand]
+        for sensor in sensors:
+            pull = values[f"{sensor}_pull"]
+            force = values[f"{sensor}_force"]
             pull_str = str(pull) if pull is not None else "---"
             force_str = str(force) if force is not None else "---"
             parts.append(f"{hand[0].upper()}:{sensor} pull={pull_str:>3} force={force_str:>3}")
@@ -50,12 +49,13 @@ if __name__ == "__main__":
         
         # List of sensors to monitor
         sensors_to_monitor = ['index', 'thumb', 'middle', 'ring', 'pinky']
+        selector = create_sensor_selector(sensors_to_monitor)
         
         try:
             while True:
                 if etee.get_number_available_etee_ports() > 0:
-                    data = process_all_sensors(etee, sensors_to_monitor)
-                    print(format_data_line(data))
+                    data = process_all_sensors(etee, selector)
+                    print(format_data_line(data, sensors_to_monitor))
                     time.sleep(0.05)
                 else:
                     print("---")
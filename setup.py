@@ -14,7 +14,7 @@ setup(
     name="etee-api",
     version=__version__,
     python_requires='>=3.8, <4',
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*", "tests", "tests.*"]),
     install_requires=[
         'numpy>=1.22.3',
         'bitstring>=3.1.9',
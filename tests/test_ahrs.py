@@ -0,0 +1,144 @@
+import copy
+
+import numpy as np
+import pytest
+
+from etee.ahrs import Ahrs, AhrsBank, SAMPLE_PERIOD_WINDOW
+
+
+def sensor_stream(count, seed):
+    rng = np.random.default_rng(seed)
+    gyroscope = rng.integers(-2000, 2000, size=(count, 3))
+    accelerometer = rng.integers(-4000, 4000, size=(count, 3)) + [0, 0, 8192]
+    magnetometer = rng.integers(-500, 500, size=(count, 3))
+    # Samples with no acceleration, for which the filter step is skipped
+    accelerometer[::50] = 0
+    return gyroscope.tolist(), accelerometer.tolist(), magnetometer.tolist()
+
+
+@pytest.mark.filterwarnings("ignore:accelerometer is zero")
+@pytest.mark.parametrize("with_magnetometer", [False, True])
+def test_fast_filter_matches_numpy_filter(with_magnetometer):
+    gyroscope, accelerometer, magnetometer = sensor_stream(500, seed=int(with_magnetometer))
+    filters = [Ahrs(fast=True), Ahrs(fast=False)]
+    for ahrs in filters:
+        ahrs.set_gyro_offset([12.5, -3.0, 7.0])
+        ahrs.set_mag_offset([40.0, -25.0, 10.0])
+    for index in range(500):
+        timestamp = index / 97
+        quaternions = []
+        for ahrs in filters:
+            q = ahrs.get_quaternion(gyroscope[index], accelerometer[index],
+                                    magnetometer[index] if with_magnetometer else None, timestamp)
+            quaternions.append([q.w, q.x, q.y, q.z])
+        np.testing.assert_allclose(quaternions[0], quaternions[1], rtol=0, atol=1e-12)
+    assert filters[0].euler == pytest.approx(filters[1].euler, abs=1e-12)
+
+
+@pytest.mark.filterwarnings("ignore:accelerometer is zero")
+@pytest.mark.parametrize("with_magnetometer", [False, True])
+def test_process_batch_matches_steps(with_magnetometer):
+    gyroscope, accelerometer, magnetometer = sensor_stream(300, seed=2)
+    magnetometer = magnetometer if with_magnetometer else None
+    ahrs = Ahrs(beta=0.1)
+    ahrs.set_gyro_offset([12.5, -3.0, 7.0])
+    ahrs.set_mag_offset([40.0, -25.0, 10.0])
+    for index in range(20):
+        ahrs.get_quaternion(gyroscope[index], accelerometer[index], None, index / 97)
+    quaternion = ahrs.quaternion
+    values = quaternion.tolist()
+    state = copy.deepcopy({name: value for name, value in ahrs.__dict__.items() if name != "quaternion"})
+
+    timestamps = [(20 + index) / 97 for index in range(280)]
+    for batch_timestamps in (None, timestamps):
+        quaternions, euler = ahrs.process_batch(gyroscope[20:], accelerometer[20:],
+                                                magnetometer[20:] if with_magnetometer else None, batch_timestamps)
+        assert quaternions.shape == (280, 4)
+        assert euler.shape == (280, 3)
+
+        reference = copy.deepcopy(ahrs)
+        for index in range(280):
+            q = reference.get_quaternion(gyroscope[20 + index], accelerometer[20 + index],
+                                         magnetometer[20 + index] if with_magnetometer else None, timestamps[index])
+            np.testing.assert_allclose(quaternions[index], [q.w, q.x, q.y, q.z], rtol=0, atol=1e-9)
+            np.testing.assert_allclose(euler[index], reference.euler, rtol=0, atol=1e-9)
+
+    # The filter state is not modified
+    assert ahrs.quaternion is quaternion
+    assert quaternion.tolist() == values
+    for name, value in state.items():
+        assert ahrs.__dict__[name] == value, name
+
+
+@pytest.mark.filterwarnings("ignore:accelerometer is zero")
+@pytest.mark.parametrize("with_magnetometer", [False, True])
+def test_bank_matches_independent_filters(with_magnetometer):
+    devices = 3
+    bank = AhrsBank(devices)
+    filters = [Ahrs() for _ in range(devices)]
+    streams = [sensor_stream(400, seed=10 + device) for device in range(devices)]
+    for device, ahrs in enumerate(filters):
+        gyro_offset = [float(device), -2.0 * device, 0.5]
+        mag_offset = [10.0 * device, 5.0, -device]
+        beta = 0.02 + 0.03 * device
+        ahrs.set_gyro_offset(gyro_offset)
+        ahrs.set_mag_offset(mag_offset)
+        ahrs.beta = beta
+        bank.set_gyro_offset(device, gyro_offset)
+        bank.set_mag_offset(device, mag_offset)
+        bank.set_beta(device, beta)
+
+    steps = [0] * devices
+    for index in range(400):
+        # All the devices are updated at even steps, and only the first and last ones at odd steps
+        indices = list(range(devices)) if index % 2 == 0 else [0, devices - 1]
+        gyroscope = [streams[device][0][index] for device in indices]
+        accelerometer = [streams[device][1][index] for device in indices]
+        magnetometer = [streams[device][2][index] for device in indices] if with_magnetometer else None
+        quaternions = bank.step(indices, gyroscope, accelerometer, magnetometer)
+        for row, device in enumerate(indices):
+            # Samples 1/97 s apart for each filter, as the bank uses its 1/97 s sample period
+            q = filters[device].get_quaternion(gyroscope[row], accelerometer[row],
+                                               magnetometer[row] if with_magnetometer else None, steps[device] / 97)
+            steps[device] += 1
+            np.testing.assert_allclose(quaternions[row], [q.w, q.x, q.y, q.z], rtol=0, atol=1e-9)
+
+    for device, ahrs in enumerate(filters):
+        assert bank.get_quaternion(device).tolist() == pytest.approx(ahrs.quaternion.tolist(), abs=1e-9)
+    np.testing.assert_allclose(bank.get_euler(), [ahrs.euler for ahrs in filters], rtol=0, atol=1e-9)
+
+
+def test_sample_period_from_timestamps():
+    ahrs = Ahrs()
+    period = 1 / 194
+    # The initial sample period is kept until the window of sample times is full
+    for index in range(SAMPLE_PERIOD_WINDOW):
+        ahrs.update_sample_period(5 + index * period)
+        assert ahrs.samplePeriod == 1 / 97
+    ahrs.update_sample_period(5 + SAMPLE_PERIOD_WINDOW * period)
+    assert ahrs.samplePeriod == pytest.approx(period, rel=1e-9)
+
+    # A gap is averaged over the window, until it leaves the window
+    timestamp = 5 + SAMPLE_PERIOD_WINDOW * period + 0.5
+    ahrs.update_sample_period(timestamp)
+    assert ahrs.samplePeriod == pytest.approx(period + (0.5 - period) / SAMPLE_PERIOD_WINDOW, rel=1e-9)
+    for _ in range(SAMPLE_PERIOD_WINDOW):
+        timestamp += period
+        ahrs.update_sample_period(timestamp)
+    assert ahrs.samplePeriod == pytest.approx(period, rel=1e-9)
+
+    # Samples received in the same read share a timestamp, which averages out over the window
+    for index in range(SAMPLE_PERIOD_WINDOW):
+        if index % 2 == 0:
+            timestamp += 2 * period
+        ahrs.update_sample_period(timestamp)
+    assert ahrs.samplePeriod == pytest.approx(period, rel=1e-9)
+
+
+def test_sample_period_from_clock(monkeypatch):
+    times = iter([10 + index / 194 for index in range(SAMPLE_PERIOD_WINDOW + 1)])
+    monkeypatch.setattr(Ahrs, "_current_seconds_time", staticmethod(lambda: next(times)))
+    ahrs = Ahrs()
+    for _ in range(SAMPLE_PERIOD_WINDOW + 1):
+        ahrs.update_sample_period()
+    assert ahrs.samplePeriod == pytest.approx(1 / 194, rel=1e-9)
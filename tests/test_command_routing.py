@@ -0,0 +1,33 @@
+import threading
+
+from etee.tangio_for_etee import TG0Driver, CommandResponse
+
+
+def pending(driver, count):
+    command_responses = [CommandResponse() for _ in range(count)]
+    for command_response in command_responses:
+        command_response.event = threading.Event()
+    driver._pending_commands.extend(command_responses)
+    return command_responses
+
+
+def route(driver, lines):
+    for line in lines:
+        driver._route_command_line(line)
+
+
+def test_status_lines_are_not_routed_to_commands():
+    driver = TG0Driver()
+    command_response, = pending(driver, 1)
+    route(driver, [b"OK\r\n", b"L connection complete\r\n", b"X:1.0 Y:2.0 Z:3.0\r\n", b"R disconnected\r\n",
+                   b"END\r\n"])
+    assert command_response.event.is_set()
+    assert command_response.result() == b"OK\r\nX:1.0 Y:2.0 Z:3.0\r\nEND\r\n"
+
+
+def test_lines_are_routed_to_commands_in_order():
+    driver = TG0Driver()
+    first, second = pending(driver, 2)
+    route(driver, [b"OK\r\n", b"A\r\n", b"END\r\n", b"R connection complete\r\n", b"OK\r\n", b"B\r\n", b"END\r\n"])
+    assert first.result() == b"OK\r\nA\r\nEND\r\n"
+    assert second.result() == b"OK\r\nB\r\nEND\r\n"
@@ -0,0 +1,40 @@
+import random
+
+import numpy as np
+
+from etee.driver_eteecontroller import ETEE_CONTROLLER_DATA_CONFIG
+from etee.tangio_for_etee import SerialReader
+
+DATA_BYTES = 42
+
+
+def random_packets(count, seed=0):
+    rng = random.Random(seed)
+    packets = [bytes(DATA_BYTES), b"\xff" * DATA_BYTES]
+    packets += [rng.randbytes(DATA_BYTES) for _ in range(count)]
+    return packets
+
+
+def test_decode_plan_matches_unplanned_decoding():
+    serial_reader = SerialReader(ETEE_CONTROLLER_DATA_CONFIG)
+    for packet in random_packets(500):
+        assert serial_reader.raw2data(packet) == serial_reader._raw2data_unplanned(packet)
+
+
+def test_compact_frames_match_unplanned_decoding():
+    serial_reader = SerialReader(ETEE_CONTROLLER_DATA_CONFIG, compact_frames=True)
+    for packet in random_packets(500, seed=1):
+        frame = serial_reader.raw2data(packet)
+        assert frame.to_dict() == serial_reader._raw2data_unplanned(packet)
+
+
+def test_batch_decoding_matches_unplanned_decoding():
+    serial_reader = SerialReader(ETEE_CONTROLLER_DATA_CONFIG)
+    packets = random_packets(500, seed=2)
+    expected = [serial_reader._raw2data_unplanned(packet) for packet in packets]
+    for stride in (DATA_BYTES, DATA_BYTES + 2):
+        buffer = b"".join(packet + b"\xff\xff"[:stride - DATA_BYTES] for packet in packets)
+        columns = serial_reader.raw2data_batch(buffer, stride=stride)
+        assert set(columns) == set(expected[0])
+        for name, values in columns.items():
+            np.testing.assert_array_equal(values, np.array([events[name] for events in expected]), err_msg=name)
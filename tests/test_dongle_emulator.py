@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+from etee import synthetic_stream
+from etee.driver_eteecontroller import ETEE_CONTROLLER_DATA_CONFIG
+from etee.tangio_for_etee import TG0Driver, is_pseudo_terminal
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="pseudo-terminals require POSIX")
+
+
+def test_is_pseudo_terminal():
+    assert is_pseudo_terminal("/dev/pts/3")
+    assert is_pseudo_terminal("/dev/ttys012")
+    assert not is_pseudo_terminal("/dev/pts/ptmx")
+    assert not is_pseudo_terminal("/dev/ttyACM0")
+    assert not is_pseudo_terminal("COM3")
+
+
+@pytest.mark.parametrize("max_write", [None, 7])
+def test_driver_reads_emulator(monkeypatch, max_write):
+    from etee.dongle_emulator import DongleEmulator
+
+    emulator = DongleEmulator(synthetic_stream(count=50), speed=None)
+    if max_write is not None:
+        # Pseudo-terminal that takes only a few bytes per write
+        write = os.write
+        monkeypatch.setattr(os, "write", lambda fd, data: write(fd, data[:max_write] if fd == emulator._master
+                                                                 else data))
+    port = emulator.start()
+    assert is_pseudo_terminal(port)
+    driver = TG0Driver(ETEE_CONTROLLER_DATA_CONFIG)
+    try:
+        driver.connect(port, close_at_exit=False)
+        serial_reader = driver.serial_reader
+        serial_reader.serial.timeout = 0.05
+        response = serial_reader.send_command(b"BP+AB\r\n", timeout=2)
+        assert response == b"OK\r\nL:AB=etee-1.0.0\r\nR:AB=etee-1.0.0\r\nEND\r\n"
+
+        serial_reader.write(b"BP+AG\r\n")
+        frames = []
+        lines = []
+        deadline = time.monotonic() + 5
+        while b"R disconnected\r\n" not in lines and time.monotonic() < deadline:
+            reading = serial_reader.read_widgets_and_text(timeout=0.1)
+            if isinstance(reading, bytes):
+                lines.append(reading)
+            elif reading is not None:
+                frames.append(reading)
+    finally:
+        if driver.serial_reader is not None and driver.serial_reader.serial is not None:
+            driver.serial_reader.close_connection()
+        emulator.stop()
+    assert lines == [b"OK\r\n", b"END\r\n", b"L connection complete\r\n", b"R connection complete\r\n",
+                     b"L disconnected\r\n", b"R disconnected\r\n"]
+    assert [frame["hand"] for frame in frames] == [0, 1] * 25
+    assert [frame["index_pull"] for frame in frames[::2]] == list(range(25))
+    assert serial_reader.get_frame_counters()["resyncs"] == 0
@@ -0,0 +1,86 @@
+import time
+
+from etee import EteeController, FakeDongle, synthetic_stream
+
+
+def read_response(dongle, end=b"END\r\n", timeout=1):
+    response = b""
+    deadline = time.monotonic() + timeout
+    while not response.endswith(end) and time.monotonic() < deadline:
+        response += dongle.read(dongle.in_waiting or 1)
+    return response
+
+
+def test_version_commands():
+    dongle = FakeDongle(timeout=0.05)
+    dongle.write(b"AT+AB\r\n")
+    assert read_response(dongle) == b"OK\r\nNRF1.0.0\r\nEND\r\n"
+    dongle.write(b"BP+AB\r\n")
+    assert read_response(dongle) == b"OK\r\nL:AB=etee-1.0.0\r\nR:AB=etee-1.0.0\r\nEND\r\n"
+
+
+def test_imu_offset_commands():
+    dongle = FakeDongle(timeout=0.05)
+    dongle.gyro_offsets[b"L"] = (1.5, -2.0, 0.25)
+    dongle.write(b"BL+gf\r\n")
+    assert read_response(dongle) == b"OK\r\nX:1.5 Y:-2.0 Z:0.25\r\nEND\r\n"
+    dongle.write(b"BR+mf\r\nBX+zz\r\n")
+    assert read_response(dongle, end=b"ERROR\r\nEND\r\n") == b"OK\r\nX:0.0 Y:0.0 Z:0.0\r\nEND\r\nERROR\r\nEND\r\n"
+
+
+def test_disconnected_hand_does_not_answer():
+    dongle = FakeDongle(timeout=0.05)
+    dongle.connected_hands = {b"R"}
+    dongle.write(b"BL+gf\r\nBL+mf\r\n")
+    assert read_response(dongle, timeout=0.2) == b""
+    dongle.write(b"BP+AB\r\n")
+    assert read_response(dongle) == b"OK\r\nR:AB=etee-1.0.0\r\nEND\r\n"
+
+
+def test_stream_starts_with_command():
+    dongle = FakeDongle(synthetic_stream(count=4), speed=None, timeout=0.05)
+    assert dongle.read(64) == b""
+    dongle.write(b"BP+AG\r\n")
+    data = read_response(dongle, end=b"R disconnected\r\n")
+    assert data.startswith(b"OK\r\nEND\r\nL connection complete\r\nR connection complete\r\n")
+    assert data.count(b"\xff\xff") == 4
+
+
+def test_controller_reads_fake_dongle():
+    controller = EteeController()
+    controller.connect_port(FakeDongle(synthetic_stream(count=200), speed=None, timeout=0.05))
+    frames = []
+    controller.hand_received.connect(lambda: frames.append(controller.driver.frameno))
+    controller.run()
+    controller.start_data()
+    deadline = time.monotonic() + 5
+    while len(frames) < 200 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    controller.stop()
+    controller.driver.thread.join()
+    controller.disconnect()
+    assert len(frames) == 200
+    assert controller.get_index_pull("left") is None
+    assert controller.driver.get_frame_counters()["resyncs"] == 0
+
+
+def test_imu_offsets_with_one_controller_not_answering():
+    dongle = FakeDongle(synthetic_stream(hands=(1,)), speed=None, timeout=0.05)
+    dongle.connected_hands = {b"R"}
+    dongle.gyro_offsets[b"R"] = (1.0, 2.0, 3.0)
+    dongle.mag_offsets[b"R"] = (4.0, 5.0, 6.0)
+    controller = EteeController()
+    controller.connect_port(dongle)
+    left_gyro_offset = controller._ahrs_left.gyro_offset
+    controller.run()
+    controller.start_data()
+    try:
+        failed = controller.update_imu_offsets(timeout=0.3, settle_time=0)
+    finally:
+        controller.stop()
+        controller.driver.thread.join()
+        controller.disconnect()
+    assert failed == ["BL+gf", "BL+mf"]
+    assert controller._ahrs_left.gyro_offset == left_gyro_offset
+    assert controller._ahrs_right.gyro_offset == [1.0, 2.0, 3.0]
+    assert controller._ahrs_right.mag_offset == [4.0, 5.0, 6.0]
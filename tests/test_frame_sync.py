@@ -0,0 +1,157 @@
+import random
+
+from etee.tangio_for_etee.frame_sync import FrameSynchronizer, FRAME_DATA, FRAME_TEXT
+
+DATA_BYTES = 42
+END = b"\xff\xff"
+
+
+def drain(frame_sync, idle=False):
+    units = []
+    while True:
+        kind, data = frame_sync.pop(idle)
+        if kind is None:
+            return units
+        units.append((kind, data))
+
+
+def random_frames(rng, count):
+    frames = []
+    for i in range(count):
+        frame = bytearray(rng.randbytes(DATA_BYTES))
+        if i % 5 == 0:
+            frame[0:2] = b"OK"
+        if i % 7 == 0:
+            position = rng.randrange(0, DATA_BYTES - 1)
+            frame[position:position + 2] = b"\r\n"
+        if i % 11 == 0:
+            position = rng.randrange(0, DATA_BYTES - 1)
+            frame[position:position + 2] = END
+        frames.append(bytes(frame))
+    return frames
+
+
+def test_frame_with_crlf_in_payload():
+    # Clicked flags followed by thumb_pull and index_pull values that read as "(\r\n"
+    frame = bytes([0x28, 0x0d, 0x0a]) + bytes(range(3, DATA_BYTES))
+    following = bytes(range(100, 100 + DATA_BYTES))
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(frame + END + following + END)
+    assert drain(frame_sync) == [(FRAME_DATA, frame), (FRAME_DATA, following)]
+    assert frame_sync.counters() == {"frames": 2, "lines": 0, "resyncs": 0, "truncated_frames": 0,
+                                     "discarded_bytes": 0}
+
+
+def test_frame_with_crlf_in_payload_at_end_of_buffer():
+    frame = bytes([0x28, 0x0d, 0x0a]) + bytes(range(3, DATA_BYTES))
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(frame + END)
+    frame_sync.feed(frame + END)
+    assert drain(frame_sync, idle=True) == [(FRAME_DATA, frame), (FRAME_DATA, frame)]
+
+
+def test_frame_split_after_crlf_in_payload():
+    first = bytes(range(DATA_BYTES))
+    frame = b"OK\r\n" + bytes(range(4, DATA_BYTES))
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(first + END + frame[:4])
+    assert drain(frame_sync) == [(FRAME_DATA, first)]
+    frame_sync.feed(frame[4:] + END)
+    assert drain(frame_sync, idle=True) == [(FRAME_DATA, frame)]
+    assert frame_sync.resyncs == 0
+
+
+def test_frame_split_after_crlf_in_payload_following_text_line():
+    frame = b"OK\r\n" + bytes(range(4, DATA_BYTES))
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(b"OK\r\n" + frame[:4])
+    assert drain(frame_sync) == [(FRAME_TEXT, b"OK\r\n")]
+    frame_sync.feed(frame[4:] + END)
+    assert drain(frame_sync, idle=True) == [(FRAME_DATA, frame)]
+    assert frame_sync.resyncs == 0
+    assert frame_sync.truncated_frames == 0
+
+
+def test_frame_split_after_crlf_in_payload_at_start_of_stream():
+    frame = b"OK\r\n" + bytes(range(4, DATA_BYTES))
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(frame[:4])
+    assert drain(frame_sync) == []
+    frame_sync.feed(frame[4:] + END)
+    assert drain(frame_sync, idle=True) == [(FRAME_DATA, frame)]
+    assert frame_sync.resyncs == 0
+
+
+def test_text_line_before_frame_ending_in_terminator_bytes():
+    frame = bytes(range(38)) + END + bytes(2)
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(b"OK\r\n" + frame + END + b"END\r\n")
+    assert drain(frame_sync, idle=True) == [(FRAME_TEXT, b"OK\r\n"), (FRAME_DATA, frame), (FRAME_TEXT, b"END\r\n")]
+
+
+def test_command_response_without_data():
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(b"OK\r\nEND\r\n")
+    # The last line may be the start of a data frame until more bytes are received or the stream is idle
+    assert drain(frame_sync) == [(FRAME_TEXT, b"OK\r\n")]
+    assert drain(frame_sync, idle=True) == [(FRAME_TEXT, b"END\r\n")]
+
+
+def test_clean_random_stream_in_chunks():
+    rng = random.Random(1)
+    frames = random_frames(rng, 5000)
+    stream = b"".join(frame + END for frame in frames)
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    units = []
+    position = 0
+    while position < len(stream):
+        size = rng.choice([1, 3, 44, 64, 100])
+        frame_sync.feed(stream[position:position + size])
+        position += size
+        units += drain(frame_sync)
+    units += drain(frame_sync, idle=True)
+    assert units == [(FRAME_DATA, frame) for frame in frames]
+    assert frame_sync.resyncs == 0
+    assert frame_sync.discarded_bytes == 0
+
+
+def test_random_stream_with_text_lines_in_chunks():
+    rng = random.Random(4)
+    units = []
+    for _ in range(300):
+        units.append((FRAME_TEXT, rng.choice([b"OK\r\n", b"END\r\n", b"L connection complete\r\n"])))
+        units += [(FRAME_DATA, frame) for frame in random_frames(rng, rng.randrange(1, 4))]
+    stream = b"".join(data + END if kind == FRAME_DATA else data for kind, data in units)
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    received = []
+    position = 0
+    while position < len(stream):
+        size = rng.choice([1, 3, 4, 44, 64, 100])
+        frame_sync.feed(stream[position:position + size])
+        position += size
+        received += drain(frame_sync)
+    received += drain(frame_sync, idle=True)
+    assert received == units
+    assert frame_sync.resyncs == 0
+
+
+def test_resync_after_corruption():
+    rng = random.Random(2)
+    frames = [bytes(rng.randrange(0, 255) for _ in range(DATA_BYTES)) for _ in range(4)]
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(frames[0] + END + b"\x01\x02\x03" + END + frames[1] + END + b"OK\r\n" + frames[2] + END)
+    assert drain(frame_sync, idle=True) == [(FRAME_DATA, frames[0]), (FRAME_DATA, frames[1]),
+                                            (FRAME_TEXT, b"OK\r\n"), (FRAME_DATA, frames[2])]
+    assert frame_sync.resyncs == 1
+    assert frame_sync.discarded_bytes == 5
+
+
+def test_truncated_frame():
+    rng = random.Random(3)
+    frames = [bytes(rng.randrange(0, 255) for _ in range(DATA_BYTES)) for _ in range(3)]
+    frame_sync = FrameSynchronizer(DATA_BYTES, 2)
+    frame_sync.feed(frames[0] + END + frames[1][20:] + END + frames[2] + END)
+    assert drain(frame_sync, idle=True) == [(FRAME_DATA, frames[0]), (FRAME_DATA, frames[2])]
+    assert frame_sync.resyncs == 1
+    assert frame_sync.truncated_frames == 1
+    assert frame_sync.discarded_bytes == DATA_BYTES - 20 + 2
@@ -0,0 +1,33 @@
+import time
+from types import SimpleNamespace
+
+from etee.tangio_for_etee import port_monitor
+
+
+def test_cache_expires_even_if_device_dir_is_not_modified(monkeypatch):
+    now = [100.0]
+    scans = []
+    monkeypatch.setattr(port_monitor, "time", SimpleNamespace(monotonic=lambda: now[0], sleep=time.sleep))
+    monkeypatch.setattr(port_monitor, "serial_ports", lambda vid, pid: scans.append(1) or [("COM3", vid)])
+    monkeypatch.setattr(port_monitor, "_get_device_dir_mtime", lambda: 1)
+    monitor = port_monitor.PortMonitor(ttl=10)
+    assert monitor.get_port_names() == ["COM3"]
+    now[0] += 9
+    monitor.get_port_names()
+    assert len(scans) == 1
+    now[0] += 1
+    monitor.get_port_names()
+    assert len(scans) == 2
+
+
+def test_cache_expires_when_device_dir_is_modified(monkeypatch):
+    mtime = [1]
+    scans = []
+    monkeypatch.setattr(port_monitor, "serial_ports", lambda vid, pid: scans.append(1) or [])
+    monkeypatch.setattr(port_monitor, "_get_device_dir_mtime", lambda: mtime[0])
+    monitor = port_monitor.PortMonitor(ttl=60)
+    monitor.get_ports()
+    monitor.get_ports()
+    mtime[0] = 2
+    monitor.get_ports()
+    assert len(scans) == 2
@@ -0,0 +1,122 @@
+import math
+
+import numpy as np
+import pytest
+
+from etee import Quaternion, QuaternionArray
+
+
+def random_quaternions(count, seed):
+    rng = np.random.default_rng(seed)
+    q = rng.normal(size=(count, 4))
+    q /= np.linalg.norm(q, axis=1)[:, None]
+    # Identity quaternion, for which the rotation axis is not defined
+    q[0] = (1, 0, 0, 0)
+    return q
+
+
+def values(q):
+    return [q.w, q.x, q.y, q.z]
+
+
+def test_quaternion_array_matches_quaternion():
+    q = random_quaternions(50, seed=0)
+    other = random_quaternions(50, seed=1)
+    array = QuaternionArray(q)
+    scalars = [Quaternion(row) for row in q]
+    other_scalars = [Quaternion(row) for row in other]
+
+    np.testing.assert_allclose(array.conj().q, [values(s.conj()) for s in scalars])
+    np.testing.assert_allclose((array * 2.5).norm(), [(s * 2.5).norm() for s in scalars])
+    np.testing.assert_allclose((array * 2.5).normalize().q, [values((s * 2.5).normalize_()) for s in scalars])
+    np.testing.assert_allclose(array.to_euler(), [s.to_euler() for s in scalars])
+    np.testing.assert_allclose((array * QuaternionArray(other)).q,
+                               [values(s * o) for s, o in zip(scalars, other_scalars)])
+    np.testing.assert_allclose((array * other_scalars[3]).q, [values(s * other_scalars[3]) for s in scalars])
+    np.testing.assert_allclose((other_scalars[3] * array).q, [values(other_scalars[3] * s) for s in scalars])
+
+    rad, axis = array.to_angle_axis()
+    for index, s in enumerate(scalars):
+        expected = s.to_angle_axis()
+        assert rad[index] == pytest.approx(expected[0])
+        np.testing.assert_allclose(axis[index], expected[1:], atol=1e-12)
+    np.testing.assert_allclose(QuaternionArray.from_angle_axis(rad, axis).q,
+                               [values(Quaternion.from_angle_axis(r, *a)) for r, a in zip(rad, axis)])
+    np.testing.assert_allclose(QuaternionArray.from_angle_axis(rad, axis).q, q, atol=1e-12)
+
+    assert isinstance(array[3], Quaternion)
+    assert values(array[3]) == q[3].tolist()
+    assert values(array[-1]) == q[-1].tolist()
+    np.testing.assert_array_equal(array[2:5].q, q[2:5])
+    np.testing.assert_array_equal(array[[1, 7]].q, q[[1, 7]])
+    assert len(array) == 50
+
+
+def test_rotate_matches_quaternion_product():
+    array = QuaternionArray(random_quaternions(20, seed=2))
+    vectors = np.random.default_rng(3).normal(size=(20, 3))
+    rotated = array.rotate(vectors)
+    for index in range(20):
+        q = array[index]
+        expected = q * Quaternion(0, *vectors[index]) * q.conj()
+        np.testing.assert_allclose(rotated[index], [expected.x, expected.y, expected.z], atol=1e-12)
+    np.testing.assert_allclose(array.rotate([1.0, 0.0, 0.0]), array.rotate(np.tile([1.0, 0.0, 0.0], (20, 1))))
+
+
+def test_slerp():
+    q0 = QuaternionArray(random_quaternions(20, seed=4))
+    q1 = QuaternionArray(random_quaternions(20, seed=5))
+    np.testing.assert_allclose(q0.slerp(q1, 0).q, q0.q, atol=1e-12)
+    t = np.linspace(0, 1, 20)
+    result = q0.slerp(q1, t)
+    np.testing.assert_allclose(result.norm(), 1)
+    # The first quaternions are both the identity, interpolated linearly below
+    for index in range(1, 20):
+        a, b = q0[index], q1[index]
+        dot = sum(x * y for x, y in zip(values(a), values(b)))
+        if dot < 0:
+            b, dot = b * -1, -dot
+        theta = math.acos(min(dot, 1.0))
+        expected = (a * (math.sin((1 - t[index]) * theta) / math.sin(theta))
+                    + b * (math.sin(t[index] * theta) / math.sin(theta)))
+        np.testing.assert_allclose(values(result[index]), values(expected), atol=1e-12)
+    # Interpolating a quaternion with itself is done linearly
+    np.testing.assert_allclose(q0.slerp(q0, 0.3).q, q0.q, atol=1e-12)
+
+
+def test_in_place_operations_match_operators():
+    a = Quaternion(0.5, -1.0, 2.0, 0.25)
+    b = Quaternion(-0.3, 0.8, 0.1, -1.5)
+    product = a * b
+    q = Quaternion(a)
+    assert q.imul(b) is q
+    assert values(q) == values(product)
+    scaled = a * 1.5
+    q = Quaternion(a)
+    assert q.imul(1.5) is q
+    assert values(q) == values(scaled)
+
+    q = Quaternion(a)
+    assert q.normalize_() is q
+    assert q.norm() == pytest.approx(1)
+    np.testing.assert_allclose(values(q), np.array(values(a)) / a.norm())
+    assert values(a) == [0.5, -1.0, 2.0, 0.25]
+
+
+def test_q_returns_a_copy():
+    a = Quaternion(1, 0, 0, 0)
+    q = a.q
+    q[1] = 5
+    assert values(a) == [1, 0, 0, 0]
+    a.q = [0, 1, 0, 0]
+    assert values(a) == [0, 1, 0, 0]
+
+
+def test_quaternion_type():
+    a = Quaternion(1, 2, 3, 4)
+    with pytest.raises(AttributeError):
+        a.extra = 1
+    assert a.__mul__("text") is NotImplemented
+    with pytest.raises(TypeError):
+        a * "text"
+    assert values(a * 2) == [2, 4, 6, 8]
@@ -0,0 +1,56 @@
+import numpy as np
+
+from etee import EteeController, FakeDongle, synthetic_stream, select
+from process_selection2 import create_selector
+
+
+def controller_with_frames(frames=10):
+    controller = EteeController()
+    controller.connect_port(FakeDongle(timeout=0.05))
+    packets = [data for _, data in synthetic_stream(count=frames) if data.endswith(b"\xff\xff")]
+    for frameno, packet in enumerate(packets):
+        controller.driver.current_timestamp = frameno / 194
+        controller._api_data_callback(frameno, controller.driver.serial_reader.raw2data(packet[:-2]))
+    return controller
+
+
+def test_read_matches_snapshot_and_getters():
+    controller = controller_with_frames()
+    try:
+        selector = select(["index_pull", "accel", "trackpad_xy", "quaternion", "euler"])
+        values = selector.read(controller)
+        for hand in ("left", "right"):
+            snapshot = controller.snapshot(hand)
+            assert values[hand]["index_pull"] == controller.get_index_pull(hand)
+            assert values[hand]["accel"] == controller.get_accel(hand)
+            assert values[hand]["trackpad_xy"] == controller.get_trackpad_xy(hand)
+            assert values[hand]["quaternion"] is snapshot.quaternion
+            assert values[hand]["euler"] == snapshot.euler
+        array = selector.read_array(controller)
+        assert selector.columns[:6] == ["index_pull", "accel_x", "accel_y", "accel_z", "trackpad_x", "trackpad_y"]
+        assert array[1, 0] == values["right"]["index_pull"]
+        assert np.allclose(array[1, 6:10], controller.snapshot("right").quaternion.tolist())
+    finally:
+        controller.disconnect()
+
+
+def test_missing_hand_reads_none():
+    controller = EteeController()
+    selector = select(["index_pull", "quaternion"])
+    assert selector.read(controller) == {"left": {"index_pull": None, "quaternion": None},
+                                         "right": {"index_pull": None, "quaternion": None}}
+    assert np.isnan(selector.read_array(controller)).all()
+
+
+def test_aliases_keep_output_names():
+    controller = controller_with_frames()
+    try:
+        values = create_selector(["slider", "system"]).read(controller)["right"]
+        assert list(values) == ["slider_value", "slider_touched", "slider_up", "slider_down", "battery_level",
+                                "charging", "charging_complete", "system_button", "tracker_connected", "proximity",
+                                "proximity_touched", "proximity_clicked"]
+        assert values["slider_up"] == controller.get_slider_up_button("right")
+        assert values["proximity"] == controller.get_proximity("right")
+        assert values["tracker_connected"] == controller.get_tracker_connection("right")
+    finally:
+        controller.disconnect()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from etee import synthetic_stream
+from etee.driver_eteecontroller import ETEE_CONTROLLER_DATA_CONFIG
+from etee.fake_dongle import session_stream
+from etee.tangio_for_etee import SessionRecorder, SessionReader, SerialReader, INDEX_FOOTER
+
+
+def record_session(path, frames=300):
+    packets = [data[:-2] for _, data in synthetic_stream(count=frames) if data.endswith(b"\xff\xff")]
+    recorder = SessionRecorder(str(path), flush_records=64)
+    recorder.start()
+    timestamps = []
+    for index, packet in enumerate(packets):
+        timestamp = 10 + index / 194
+        if index == 100:
+            recorder.record_line(b"OK\r\n", timestamp)
+        if index == 200:
+            # Shorter frame, as a different firmware would send, which starts a new run
+            recorder.record_frame(packet[:40], timestamp, packet[11] >> 3 & 1)
+        else:
+            recorder.record_frame(packet, timestamp, packet[11] >> 3 & 1)
+        timestamps.append(timestamp)
+    recorder.stop()
+    return packets, timestamps
+
+
+def open_session(path, truncate_index=False):
+    if truncate_index:
+        # As left by an interrupted recording, without the index written when the recorder stops
+        data = path.read_bytes()
+        index_offset = INDEX_FOOTER.unpack_from(data, len(data) - INDEX_FOOTER.size)[1]
+        path.write_bytes(data[:index_offset])
+    return SessionReader(str(path), ETEE_CONTROLLER_DATA_CONFIG)
+
+
+@pytest.mark.parametrize("truncate_index", [False, True])
+def test_round_trip(tmp_path, truncate_index):
+    path = tmp_path / "session.tg0"
+    packets, timestamps = record_session(path)
+    with open_session(path, truncate_index) as reader:
+        assert len(reader) == len(packets)
+        assert list(reader.runs["count"]) == [100, 100, 1, len(packets) - 201]
+        assert reader.lines() == [(timestamps[100], b"OK\r\n")]
+        assert bytes(reader.frame(5)) == packets[5]
+        assert bytes(reader.frame(200)) == packets[200][:40]
+        assert bytes(reader.frame(-1)) == packets[-1]
+        with pytest.raises(IndexError):
+            reader.frame(len(packets))
+        assert reader.get_timestamp(250) == timestamps[250]
+        np.testing.assert_array_equal(reader.get_timestamps(), timestamps)
+        np.testing.assert_array_equal(reader.get_hands(190, 210), [p[11] >> 3 & 1 for p in packets[190:210]])
+
+        serial_reader = SerialReader(ETEE_CONTROLLER_DATA_CONFIG)
+        columns = reader.decode(150, 260)
+        for index in (150, 199, 201, 259):
+            expected = serial_reader.raw2data(packets[index])
+            assert columns["index_pull"][index - 150] == expected["index_pull"]
+            assert columns["accel_z"][index - 150] == expected["accel_z"]
+        assert columns["timestamp"][0] == timestamps[150]
+        right = reader.decode(0, 100, hand=1)
+        assert list(right["hand"]) == [1] * 50
+
+
+def test_time_ranges(tmp_path):
+    path = tmp_path / "session.tg0"
+    packets, timestamps = record_session(path)
+    with open_session(path) as reader:
+        assert reader.index_range() == (0, len(packets))
+        assert reader.index_range(timestamps[42], timestamps[250]) == (42, 250)
+        assert reader.index_range(timestamps[42] + 1e-6, timestamps[200]) == (43, 200)
+        assert reader.index_range(0, 1) == (0, 0)
+        assert reader.index_range(100, None) == (len(packets), len(packets))
+        columns = reader.decode_time_range(timestamps[10], timestamps[20], hand=0)
+        np.testing.assert_array_equal(columns["timestamp"], timestamps[10:20:2])
+
+
+def test_session_stream(tmp_path):
+    path = tmp_path / "session.tg0"
+    packets, timestamps = record_session(path, frames=20)
+    with open_session(path) as reader:
+        stream = list(session_stream(reader))
+    assert [data for _, data in stream] == [packet + b"\xff\xff" for packet in packets]
+    assert [timestamp for timestamp, _ in stream] == timestamps
@@ -0,0 +1,45 @@
+import pytest
+
+from etee import EteeController, FakeDongle, synthetic_stream
+
+
+def feed_frames(controller, frames):
+    packets = [data for _, data in synthetic_stream(count=frames) if data.endswith(b"\xff\xff")]
+    for frameno, packet in enumerate(packets):
+        controller.driver.current_timestamp = 10 + frameno / 194
+        controller._api_data_callback(frameno, controller.driver.serial_reader.raw2data(packet[:-2]))
+
+
+@pytest.mark.parametrize("compact_frames", [False, True])
+def test_snapshot_is_not_changed_by_later_frames(compact_frames):
+    controller = EteeController(compact_frames=compact_frames)
+    controller.connect_port(FakeDongle(timeout=0.05))
+    try:
+        feed_frames(controller, 10)
+        snapshot = controller.snapshot("right")
+        assert snapshot.frameno == 5
+        assert snapshot.timestamp == 10 + 9 / 194
+        assert snapshot["hand"] == 1
+        index_pull = snapshot["index_pull"]
+        quaternion = snapshot.quaternion.tolist()
+        euler = snapshot.euler
+
+        feed_frames(controller, 4)
+        assert controller.snapshot("right").frameno == 7
+        assert snapshot.frameno == 5
+        assert snapshot["index_pull"] == index_pull
+        assert snapshot.quaternion.tolist() == quaternion
+        assert snapshot.quaternion is not controller._quaternion_right
+        assert snapshot.euler == euler
+
+        with pytest.raises(AttributeError):
+            snapshot.frameno = 0
+        with pytest.raises(TypeError):
+            snapshot.data["index_pull"] = 0
+        if compact_frames:
+            with pytest.raises(TypeError):
+                snapshot.data.record[0] = 0
+            with pytest.raises(TypeError):
+                snapshot.data.layout["index_pull"] = 0
+    finally:
+        controller.disconnect()